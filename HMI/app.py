@@ -1,58 +1,323 @@
-from flask import Flask, render_template, request, jsonify
-from core.gpio_singleton import gpio
-from hardware.motor_controller import TransportMotor
-from hardware.serial_reader import ArduinoSensorReader
-from hardware.encoder_state import EncoderState
-from hardware.homing2 import HomingController
+from flask import Blueprint, Flask, Response, current_app, render_template, request, jsonify, stream_with_context
+from core.config import ConfigError, ConfigRestartRequired, tunable_values
+from core.stations import StationError, check_stations, station_from_dict
+from core.store import get_store
+from HMI.history import SampleHistory, parse_window
+from HMI.metrics import HTTPMetrics, render_metrics
+from HMI.runtime import HardwareNotReady, HMIRuntime
+from HMI.telemetry import TelemetryHub
+import math
 import subprocess
+import time
 import logging
 
-# imports bovenaan
-from hardware.stepper_motor import TB6600Stepper
-
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
-app = Flask(__name__)
+bp = Blueprint("hmi", __name__)
+
+
+def create_app(config="config.yaml"):
+    """
+    Maak de HMI-app aan. De hardware (GPIO, stepper, reader, motor/homing)
+    wordt parallel op de achtergrond gestart; de app is direct bruikbaar en
+    /api/ready meldt wanneer alles klaar is (met init-tijden per subsysteem).
+    """
+    app = Flask(__name__)
+    runtime = HMIRuntime(config)
+    app.extensions["hmi_runtime"] = runtime
+
+    hmi_cfg = runtime.config.hmi
+    telemetry = TelemetryHub(runtime, rate_hz=hmi_cfg.telemetry_hz, heartbeat_s=hmi_cfg.heartbeat_s,
+                             max_streams=hmi_cfg.max_streams)
+    runtime.config_store.subscribe(lambda cfg: telemetry.apply_tuning(cfg.hmi))
+    app.extensions["hmi_telemetry"] = telemetry
+    # Grafiekhistorie (positie, snelheid, duty, potmeter) voor /api/timeseries
+    app.extensions["hmi_history"] = SampleHistory(runtime, rate_hz=hmi_cfg.history_hz,
+                                                  history_s=hmi_cfg.history_s).start()
+    # Stations, jobs en move-historie (SQLite)
+    app.extensions["hmi_store"] = get_store(config)
+    # Latency/fouten per route, zie /metrics
+    app.extensions["hmi_metrics"] = HTTPMetrics().install(app)
+    app.register_blueprint(bp)
+    runtime.start()
+    return app
+
+
+def _runtime():
+    return current_app.extensions["hmi_runtime"]
+
+
+def _telemetry():
+    return current_app.extensions["hmi_telemetry"]
+
+
+def _store():
+    return current_app.extensions["hmi_store"]
+
+
+def _hw(name):
+    """Subsysteem-object uit de runtime (HardwareNotReady -> 503)."""
+    return _runtime().require(name)
+
+
+def _finite(value, name):
+    """float(value) voor route-invoer; TypeError/ValueError als het geen eindig getal is."""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+def _shuttle_busy():
+    shuttle = _runtime().get("shuttle")
+    return shuttle is not None and shuttle.busy
+
+
+@bp.errorhandler(HardwareNotReady)
+def hardware_not_ready(e):
+    return jsonify(success=False, error=str(e)), 503
+
+
+@bp.route('/api/ready', methods=['GET'])
+def api_ready():
+    """Readiness: 200 als alle hardware klaar is, anders 503 (+ init-tijden)."""
+    status = _runtime().status()
+    return jsonify(success=True, **status), 200 if status["ready"] else 503
+
+
+@bp.route('/api/stream', methods=['GET'])
+def api_stream():
+    """
+    Server-Sent Events: gecombineerde state (X/Y-positie, sensor, potmeter,
+    homing, beweging). Alleen bij een verandering wordt een bericht gestuurd,
+    met hooguit hmi.telemetry_hz per seconde.
+    """
+    # Elke stream houdt een worker thread bezet (HMI/server.py); het slot wordt
+    # atomair gereserveerd en komt vrij als de response gesloten wordt
+    stream = _telemetry().open_stream()
+    if stream is None:
+        return jsonify(success=False, error="Te veel streams, gebruik /api/state"), 503
+
+    resp = Response(stream_with_context(stream), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@bp.route('/api/state', methods=['GET'])
+def api_state():
+    """
+    Alle telemetrie in één response, met volgnummer `seq` (ook als ETag).
+      ?after=<seq>&wait=<ms>  long-poll: antwoordt zodra er iets veranderd is
+                              (max 30 s), anders 304 zonder body
+      If-None-Match: <etag>   304 als er sinds die versie niets veranderd is
+    """
+    telemetry = _telemetry()
+    after = request.args.get("after", type=int)
+    wait_ms = min(max(request.args.get("wait", default=0, type=int), 0), 30000)
+
+    seq, state = telemetry.snapshot(after=after, wait_s=wait_ms / 1000.0)
+    etag = f"{telemetry.boot_id}-{seq}"
+
+    if (after is not None and seq == after) or etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = jsonify(success=True, seq=seq, boot=telemetry.boot_id, **state)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
-motor = TransportMotor()
 
-arduino_reader = ArduinoSensorReader(baudrate=115200)
-arduino_reader.start()
+@bp.route('/api/stream/stats', methods=['GET'])
+def api_stream_stats():
+    return jsonify(success=True, **_telemetry().stats())
 
-encoder_state = EncoderState(mm_per_rev=90.33, direction_sign=-1)
 
-homing = HomingController(
-    motor=motor,
-    gpio=gpio,
-    arduino_reader=arduino_reader,
-    encoder_state=encoder_state,
-    sensor_name="sensor_1",   # jouw inductiesensor
-    direction="forward",     # richting naar sensor
-    speed=0.4,
-    timeout_s=10.0
-)
+@bp.route('/api/timeseries', methods=['GET'])
+def api_timeseries():
+    """
+    Historie van één signaal voor de grafiek, altijd hooguit `points` punten:
+      ?signal=x_mm|v_mm_s|duty|pot|y_mm&window=600s&points=500&mode=lttb|minmax
+    """
+    history = current_app.extensions["hmi_history"]
+    try:
+        window_s = parse_window(request.args.get("window", "600s"))
+        series = history.series(request.args.get("signal", "x_mm"), window_s,
+                                points=request.args.get("points", default=500, type=int),
+                                mode=request.args.get("mode", "lttb"))
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
 
-PUL = 5
-DIR = 6
-ENA = 13
+    resp = jsonify(success=True, **series)
+    # Zelfde bucket = zelfde data: de browser mag hem zo lang bewaren
+    resp.headers["Cache-Control"] = f"max-age={max(1, int(window_s / series['points']))}"
+    return resp
 
-stepper = TB6600Stepper(pul_pin=PUL, dir_pin=DIR, ena_pin=ENA)
 
-@app.route('/')
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Tekst-export (Prometheus-formaat): latency-histogram, fouten en in-flight
+    per route, plus reader, ramp-jitter, GPIO-writes en stepper queue-diepte.
+    Werkt ook als de hardware (nog) niet gestart is.
+    """
+    text = render_metrics(_runtime(), current_app.extensions["hmi_metrics"], _telemetry())
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
+
+@bp.route('/api/config', methods=['GET'])
+def api_config():
+    """Huidige config-versie + de parameters die live aanpasbaar zijn."""
+    cfg = _runtime().config_store.current
+    return jsonify(success=True, version=cfg.version, path=cfg.path, tunable=tunable_values(cfg))
+
+
+@bp.route('/api/config/reload', methods=['POST'])
+def api_config_reload():
+    """
+    Lees config.yaml opnieuw in en pas afstelbare parameters live toe
+    (snelheden, acceleratie, eindstops, homing, debounce). Andere wijzigingen
+    worden geweigerd (409): daarvoor is een herstart nodig. Een onleesbare of
+    ongeldige config (YAML, validatie) geeft 400.
+    """
+    try:
+        result = _runtime().config_store.reload()
+    except ConfigRestartRequired as e:
+        return jsonify(success=False, error=str(e)), 409
+    except ConfigError as e:
+        return jsonify(success=False, error=str(e)), 400
+    return jsonify(success=True, **result)
+
+
+def _check_stations(stations):
+    """Regels uit de `stations` sectie van de config van deze app (live aanpasbaar)."""
+    check_stations(stations, _runtime().config_store.current.stations)
+
+
+def _stations_response(store, status=200, **extra):
+    return jsonify(success=True, version=store.stations_version(), **extra), status
+
+
+@bp.route('/api/stations', methods=['GET'])
+def api_stations():
+    """Alle stations + registry-versie (ook als ETag; If-None-Match geeft 304)."""
+    store = _store()
+    version = store.stations_version()
+    etag = f"stations-{version}"
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = jsonify(success=True, version=version,
+                       stations=[st.as_dict() for st in store.stations().values()])
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@bp.route('/api/stations/<int:station_id>', methods=['GET'])
+def api_station(station_id):
+    station = _store().station(station_id)
+    if station is None:
+        return jsonify(success=False, error=f"Station {station_id} bestaat niet"), 404
+    return jsonify(success=True, station=station.as_dict())
+
+
+@bp.route('/api/stations', methods=['POST'])
+def api_station_create():
+    """Nieuw station: { "id": 4, "naam": "Uitvoer", "positie": 500, "richting": "R" }"""
+    store = _store()
+    try:
+        station = station_from_dict(request.get_json(force=True))
+        store.add_station(station, check=_check_stations)
+    except StationError as e:
+        return jsonify(success=False, error=str(e), errors=e.errors), 400
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 409
+    return _stations_response(store, 201, station=station.as_dict())
+
+
+@bp.route('/api/stations/<int:station_id>', methods=['PUT'])
+def api_station_put(station_id):
+    """Station toevoegen of bijwerken."""
+    store = _store()
+    try:
+        station = station_from_dict(request.get_json(force=True), station_id=station_id)
+        store.upsert_stations([station], check=_check_stations)
+    except StationError as e:
+        return jsonify(success=False, error=str(e), errors=e.errors), 400
+    return _stations_response(store, station=station.as_dict())
+
+
+@bp.route('/api/stations/<int:station_id>', methods=['DELETE'])
+def api_station_delete(station_id):
+    store = _store()
+    if not store.remove_station(station_id):
+        return jsonify(success=False, error=f"Station {station_id} bestaat niet"), 404
+    return _stations_response(store)
+
+
+@bp.route('/api/stations/bulk', methods=['POST'])
+def api_stations_bulk():
+    """
+    Veel stations tegelijk (in bedrijf stellen), in één transactie:
+      { "stations": [{...}, ...], "replace": false }
+    replace=true vervangt de hele lijst. Eén validatieronde over de lijst
+    zoals die erna is; bij een fout wordt niets geschreven (400 + alle fouten).
+    De registry-versie gaat één keer omhoog.
+    """
+    store = _store()
+    data = request.get_json(force=True)
+    if isinstance(data, list):
+        data = {"stations": data}
+    items = data.get("stations") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return jsonify(success=False, error="Verwacht {\"stations\": [...]}"), 400
+
+    stations, errors, seen = [], [], set()
+    for i, item in enumerate(items):
+        try:
+            st = station_from_dict(item, where=f"stations[{i}]")
+        except StationError as e:
+            errors.extend(e.errors)
+            continue
+        if st.id in seen:
+            errors.append(f"stations[{i}].id: {st.id} komt dubbel voor")
+        seen.add(st.id)
+        stations.append(st)
+
+    replace = bool(data.get("replace"))
+    try:
+        if errors:
+            # Ook de lijstregels (eindstops, afstand) meteen melden
+            result = {} if replace else store.stations()
+            result.update((st.id, st) for st in stations)
+            try:
+                _check_stations(result.values())
+            except StationError as e:
+                errors.extend(e.errors)
+            raise StationError(errors)
+        version = store.write_stations(upsert=stations, replace=replace, check=_check_stations)
+    except StationError as e:
+        return jsonify(success=False, error=f"{len(e.errors)} fout(en)", errors=e.errors), 400
+    return jsonify(success=True, version=version, count=len(stations))
+
+
+@bp.route('/')
 def home():
     return render_template('index.html')
 
-@app.route('/automatic')
+@bp.route('/automatic')
 def automatic():
     return render_template('automatic.html')
 
-@app.route('/manual')
+@bp.route('/manual')
 def manual():
     return render_template('manual.html')
 
-@app.route('/api/automatic/led', methods=['POST'])
+@bp.route('/api/automatic/led', methods=['POST'])
 def automatic_led():
+    gpio = _hw("gpio")
     data = request.get_json(force=True)
     action = data.get('action')
 
@@ -65,53 +330,141 @@ def automatic_led():
 
     return jsonify(success=True)
 
-@app.route('/api/sensors/1', methods=['GET'])
+@bp.route('/api/sensors/1', methods=['GET'])
 def sensor_1_status():
+    gpio = _hw("gpio")
     active = gpio.is_active("sensor_1")
     return jsonify(active=active)
 
-@app.route('/api/manual/motor', methods=['POST'])
+@bp.route('/api/sensors/<name>/edges', methods=['GET'])
+def sensor_edges(name):
+    """
+    Flanken van een input met tijdstempel. ?after=<seq> geeft alleen nieuwere;
+    met &wait=<s> wordt gewacht op de eerstvolgende flank (long-poll).
+    """
+    gpio = _hw("gpio")
+    try:
+        edges = gpio.edges(name)
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 404
+
+    after = request.args.get("after", default=0, type=int)
+    wait_s = min(request.args.get("wait", default=0.0, type=float), 30.0)
+    if wait_s > 0 and edges.seq <= after:
+        edges.wait(timeout=wait_s, after=after)
+
+    # ts als perf_counter-tijd; age_ms is relatief t.o.v. nu
+    now = time.perf_counter()
+    events = [{"seq": e.seq, "active": e.active, "ts": e.ts, "age_ms": (now - e.ts) * 1e3}
+              for e in edges.since(after)]
+    return jsonify(success=True, level=edges.level, seq=edges.seq, edges=events,
+                   stats=edges.stats())
+
+@bp.route('/api/manual/motor', methods=['POST'])
 def manual_motor():
     """
     API endpoint om de motor in manual mode aan te sturen.
     Verwacht JSON zoals:
       { "direction": "forward", "action": "start", "speed": 0.6 }
+    Het commando gaat naar de mailbox (as "x", latest-wins) en wordt door de
+    actuator-thread uitgevoerd; de response komt direct, met command_id.
     """
+    _hw("motor")
     data = request.get_json(force=True) or {}
 
     direction = data.get('direction')
     action = data.get('action', 'start')
-    speed = float(data.get('speed', 0.6))  # default 60% duty
 
     try:
-        if direction == 'forward':
-            if action == 'start':
-                motor.forward(speed)
-            elif action == 'stop':
-                motor.stop(brake=False)
-            else:
-                return jsonify(success=False, error="Unknown action"), 400
-
-        elif direction == 'backward':
-            if action == 'start':
-                motor.backward(speed)
-            elif action == 'stop':
-                motor.stop(brake=False)
-            else:
-                return jsonify(success=False, error="Unknown action"), 400
+        speed = float(data.get('speed', 0.6))  # default 60% duty
 
-        else:
+        if direction not in ('forward', 'backward'):
             return jsonify(success=False, error="Unknown direction"), 400
+        if action == 'start':
+            cmd_id = _runtime().mailbox.post("x", direction, speed=speed)
+        elif action == 'stop':
+            cmd_id = _runtime().mailbox.post("x", "stop")
+        else:
+            return jsonify(success=False, error="Unknown action"), 400
 
-        return jsonify(success=True)
+        return jsonify(success=True, queued=True, command_id=cmd_id)
 
     except Exception as e:
         # Handige debug als er iets misgaat
         print("Error in manual_motor:", e)
         return jsonify(success=False, error=str(e)), 500
 
-@app.route('/api/encoder', methods=['GET'])
+@bp.route('/api/manual/motor/metrics', methods=['GET'])
+def manual_motor_metrics():
+    """Motorcommando's (overgeslagen/writes/latency), GPIO write-tellers en ramp-state."""
+    gpio = _hw("gpio")
+    motor = _hw("motor")
+    ramp = motor.state() if hasattr(motor, "state") else None
+    return jsonify(success=True, motor=motor.command_stats(), gpio=gpio.write_stats(), ramp=ramp)
+
+@bp.route('/api/manual/commands', methods=['GET'])
+def manual_commands():
+    """Mailbox per as: uitgevoerd, superseded (overgeslagen), geweigerd, latency."""
+    return jsonify(success=True, axes=_runtime().mailbox.stats())
+
+@bp.route('/api/manual/commands/<int:cmd_id>', methods=['GET'])
+def manual_command_status(cmd_id):
+    status = _runtime().mailbox.status(cmd_id)
+    if status is None:
+        return jsonify(success=False, error="Onbekend command_id"), 404
+    return jsonify(success=True, **status)
+
+@bp.route('/api/safety', methods=['GET'])
+def safety_status():
+    """Safety supervisor: reactietijden (max, gerealiseerde grens) en de laatste trips."""
+    safety = _hw("safety")
+    return jsonify(success=True, stats=safety.stats(), trips=safety.trips())
+
+@bp.route('/api/shuttle', methods=['GET'])
+def api_shuttle():
+    """Shuttle: lopende job, wachtrij en fase-tijden (gemiddelde/p95/max)."""
+    shuttle = _hw("shuttle")
+    return jsonify(success=True, **shuttle.status())
+
+
+@bp.route('/api/shuttle/jobs', methods=['POST'])
+def api_shuttle_submit():
+    """
+    Pick-and-place job in de wachtrij zetten. Verwacht JSON:
+      { "pickup": 1, "dropoff": 3 }
+    """
+    shuttle = _hw("shuttle")
+    data = request.get_json(force=True) or {}
+    try:
+        job_id = shuttle.submit(int(data["pickup"]), int(data["dropoff"]))
+    except KeyError as e:
+        return jsonify(success=False, error=f"Veld {e} ontbreekt"), 400
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
+    except RuntimeError as e:
+        return jsonify(success=False, error=str(e)), 409
+    return jsonify(success=True, job_id=job_id), 202
+
+
+@bp.route('/api/shuttle/jobs/<int:job_id>', methods=['GET'])
+def api_shuttle_job(job_id):
+    job = _hw("shuttle").job(job_id)
+    if job is None:
+        return jsonify(success=False, error="Job niet gevonden"), 404
+    return jsonify(success=True, job=job)
+
+
+@bp.route('/api/shuttle/cancel', methods=['POST'])
+def api_shuttle_cancel():
+    """Lopende job afbreken (assen stoppen) en de wachtrij leegmaken."""
+    cancelled = _hw("shuttle").cancel()
+    return jsonify(success=True, cancelled=cancelled)
+
+
+@bp.route('/api/encoder', methods=['GET'])
 def encoder_value():
+    arduino_reader = _hw("arduino_reader")
+    encoder_state = _hw("encoder_state")
     data = arduino_reader.get_latest()
 
     if not data.get("ok") or data.get("angle_deg") is None:
@@ -125,24 +478,31 @@ def encoder_value():
     return jsonify(success=True, position_mm=pos_mm, is_homed=encoder_state.is_homed())
 
     
-@app.route('/api/homing/start', methods=['POST'])
+@bp.route('/api/homing/start', methods=['POST'])
 def start_homing():
+    homing = _hw("homing")
+    if _shuttle_busy():
+        return jsonify(success=False, error="Shuttle-cyclus actief"), 409
     started = homing.start()
     if not started:
         return jsonify(success=False, error="Homing already running"), 409
     return jsonify(success=True)
 
-@app.route('/api/homing/status', methods=['GET'])
+@bp.route('/api/homing/status', methods=['GET'])
 def homing_status():
-    return jsonify(success=True, **homing.status())
+    homing = _hw("homing")
+    checkpoint = _runtime().get("home_checkpoint")
+    home_restore = None if checkpoint is None else checkpoint.status()["restore"]
+    return jsonify(success=True, home_restore=home_restore, **homing.status())
 
     
-@app.route('/api/potmeter', methods=['GET'])
+@bp.route('/api/potmeter', methods=['GET'])
 def potmeter_value():
     """
     Geeft potmeter raw (0-1023) terug:
     { success: true, value: 512 }
     """
+    arduino_reader = _hw("arduino_reader")
     data = arduino_reader.get_latest()
 
     if not data.get("ok") or data.get("pot_raw") is None:
@@ -150,14 +510,15 @@ def potmeter_value():
 
     return jsonify(success=True, value=int(data["pot_raw"]))
 
-@app.route('/api/homing/cancel', methods=['POST'])
+@bp.route('/api/homing/cancel', methods=['POST'])
 def cancel_homing():
+    homing = _hw("homing")
     ok = homing.cancel()
     if not ok:
         return jsonify(success=False, error="Homing not running"), 409
     return jsonify(success=True)
 
-@app.post("/api/restart")
+@bp.post("/api/restart")
 def api_restart():
     # Start restart asynchroon zodat we nog een response kunnen sturen
     subprocess.Popen(["sudo", "systemctl", "restart", "transport-hmi.service"])
@@ -166,29 +527,130 @@ def api_restart():
 # -------------------------------------------------
 # NIEUW: Stepper API endpoints
 # -------------------------------------------------
-@app.route('/api/manual/stepper/move', methods=['POST'])
+@bp.route('/api/manual/stepper/move', methods=['POST'])
 def manual_stepper_move():
     """
     Verwacht JSON:
       { "direction": "forward"|"backward", "steps": 2000, "delay": 0.001 }
+    Via de mailbox (as "y", latest-wins): een move die nog niet aan de
+    stepper is doorgegeven wordt door een nieuwere vervangen.
     """
+    _hw("stepper")
     data = request.get_json(force=True) or {}
     direction = data.get("direction", "forward")
-    steps = int(data.get("steps", 1))
-    delay = float(data.get("delay", 0.001))
 
     try:
-        stepper.move(direction=direction, steps=steps, delay_s=delay)
-        return jsonify(success=True, queued=True)
+        steps = int(data.get("steps", 1))
+        delay = float(data.get("delay", 0.001))
+        if direction not in ("forward", "backward"):
+            return jsonify(success=False, error="direction must be 'forward' or 'backward'"), 400
+
+        cmd_id = _runtime().mailbox.post("y", "move", direction=direction, steps=steps, delay_s=delay)
+        return jsonify(success=True, queued=True, command_id=cmd_id)
 
     except Exception as e:
         print("Error in manual_stepper_move:", e)
         return jsonify(success=False, error=str(e)), 500
 
 
-@app.route('/api/manual/stepper/stop', methods=['POST'])
+@bp.route('/api/manual/stepper/move_to', methods=['POST'])
+def manual_stepper_move_to():
+    """
+    Absolute Y-move. Verwacht JSON:
+      { "position_mm": 25.0, "delay": 0.001 }
+    of, om tot een softe eindstop te joggen:
+      { "limit": "max"|"min", "delay": 0.001 }
+    """
+    stepper = _hw("stepper")
+    if _shuttle_busy():
+        return jsonify(success=False, error="Shuttle-cyclus actief"), 409
+    data = request.get_json(force=True) or {}
+    if not isinstance(data, dict):
+        return jsonify(success=False, error="Expected a JSON object"), 400
+    limit = data.get("limit")
+
+    try:
+        delay = _finite(data.get("delay", 0.001), "delay")
+        if limit == "max":
+            target = stepper.max_mm
+        elif limit == "min":
+            target = stepper.min_mm
+        else:
+            target = _finite(data["position_mm"], "position_mm")
+    except KeyError:
+        return jsonify(success=False, error="position_mm or limit required"), 400
+    except (TypeError, ValueError) as e:
+        return jsonify(success=False, error=f"Invalid number: {e}"), 400
+
+    if target is None:
+        return jsonify(success=False, error="No travel limit configured"), 400
+
+    try:
+        stepper.move_to_mm(target, delay_s=delay)
+        return jsonify(success=True, queued=True, target_mm=stepper.clamp_mm(target))
+
+    except Exception as e:
+        print("Error in manual_stepper_move_to:", e)
+        return jsonify(success=False, error=str(e)), 500
+
+
+@bp.route('/api/manual/stepper/jog', methods=['POST'])
+def manual_stepper_jog():
+    """
+    Snelheidsmodus (deadman). Verwacht JSON:
+      { "velocity_mm_s": 6.0 }   (+ = forward, - = backward, 0 = afremmen)
+    Moet zolang de knop ingedrukt is herhaald worden (keepalive).
+    """
+    stepper = _hw("stepper")
+    if _shuttle_busy():
+        return jsonify(success=False, error="Shuttle-cyclus actief"), 409
+    data = request.get_json(force=True) or {}
+
+    try:
+        velocity = float(data.get("velocity_mm_s", 0.0))
+        stepper.jog(velocity)
+        return jsonify(success=True, keepalive_s=stepper.jog_keepalive_s)
+
+    except Exception as e:
+        print("Error in manual_stepper_jog:", e)
+        return jsonify(success=False, error=str(e)), 500
+
+
+@bp.route('/api/manual/stepper/position', methods=['GET'])
+def manual_stepper_position():
+    stepper = _hw("stepper")
+    return jsonify(success=True, position_mm=stepper.position_mm, steps=stepper.position_steps)
+
+
+@bp.route('/api/manual/stepper/metrics', methods=['GET'])
+def manual_stepper_metrics():
+    """Scheduler (queue-diepte, latency) + pulse timing van de Y-as."""
+    stepper = _hw("stepper")
+    return jsonify(success=True, commands=stepper.command_metrics(), timing=stepper.timing_stats())
+
+
+@bp.route('/api/manual/stepper/zero', methods=['POST'])
+def manual_stepper_zero():
+    stepper = _hw("stepper")
+    if _shuttle_busy():
+        return jsonify(success=False, error="Shuttle-cyclus actief"), 409
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify(success=False, error="Expected a JSON object"), 400
+    try:
+        position_mm = _finite(data.get("position_mm", 0.0), "position_mm")
+    except (TypeError, ValueError) as e:
+        return jsonify(success=False, error=f"Invalid number: {e}"), 400
+    stepper.set_position_mm(position_mm)
+    return jsonify(success=True, position_mm=stepper.position_mm)
+
+
+@bp.route('/api/manual/stepper/stop', methods=['POST'])
 def manual_stepper_stop():
+    stepper = _hw("stepper")
     try:
+        # Wachtende move uit de mailbox mag niet ná de stop nog starten
+        _runtime().mailbox.cancel("y")
         stepper.stop()
         return jsonify(success=True)
     except Exception as e:
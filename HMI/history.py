@@ -0,0 +1,237 @@
+# HMI/history.py
+"""
+Grafiekhistorie voor de automatic-pagina (/api/timeseries).
+
+SampleHistory legt met hmi.history_hz de signalen vast in ring buffers
+(numpy, vaste grootte: history_s * history_hz samples):
+
+  x_mm    - X-positie (encoder, mm; NaN zolang er geen geldige meting is)
+  v_mm_s  - X-snelheid, afgeleid uit opeenvolgende posities
+  duty    - signed duty van de X-motor (+ = forward)
+  pot     - potmeter (raw 0-1023)
+  y_mm    - Y-positie (stepper)
+
+series() geeft een venster terug, gedecimeerd tot een vast aantal punten
+(LTTB of min/max per bucket), zodat de response niet groeit met de lengte
+van het venster. Het eindtijdstip wordt afgerond op de bucketbreedte
+(venster / punten); binnen dezelfde bucket krijgen alle viewers het
+gecachte resultaat.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SIGNALS = {"x_mm": "mm", "v_mm_s": "mm/s", "duty": "", "pot": "raw", "y_mm": "mm"}
+MODES = ("lttb", "minmax")
+
+
+def lttb(t, y, n_out):
+    """Largest-Triangle-Three-Buckets: n_out punten die de vorm behouden."""
+    n = len(t)
+    if n_out >= n or n_out < 3:
+        return t, y
+
+    # n_out - 2 buckets tussen het eerste en laatste punt
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo = hi
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_t = t[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        # oppervlakte van de driehoek (vorig gekozen punt, kandidaat, gemiddelde volgende bucket)
+        area = np.abs((t[a] - avg_t) * (y[lo:hi] - y[a]) - (t[a] - t[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return t[idx], y[idx]
+
+
+def minmax(t, y, n_out):
+    """Per bucket het minimum en maximum (in tijdsvolgorde): pieken blijven zichtbaar."""
+    n = len(t)
+    buckets = max(1, n_out // 2)
+    if n <= n_out:
+        return t, y
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    idx = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        seg = y[lo:hi]
+        i_min, i_max = lo + int(seg.argmin()), lo + int(seg.argmax())
+        idx.extend(sorted({i_min, i_max}))
+    idx = np.asarray(idx)
+    return t[idx], y[idx]
+
+
+class SampleHistory:
+    def __init__(self, runtime, rate_hz=10.0, history_s=1800.0, cache_size=64):
+        self.runtime = runtime
+        self.period_s = 1.0 / float(rate_hz)
+        self.history_s = float(history_s)
+        size = max(2, int(math.ceil(self.history_s * float(rate_hz))))
+
+        self._lock = threading.Lock()
+        self._t = np.full(size, np.nan)
+        self._data = {name: np.full(size, np.nan) for name in SIGNALS}
+        self._next = 0          # volgende schrijfpositie
+        self._count = 0
+        self._last_x = None     # (t, x) voor de snelheid
+
+        self._cache = OrderedDict()
+        self._cache_size = int(cache_size)
+        self._cache_lock = threading.Lock()
+        self._stats = {"samples": 0, "requests": 0, "cache_hits": 0}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="hmi-history", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+
+    # ---------- vastleggen ----------
+    def _read(self):
+        rt = self.runtime
+        reader = rt.get("arduino_reader")
+        encoder_state = rt.get("encoder_state")
+        motor = rt.get("motor")
+        stepper = rt.get("stepper")
+        values = {}
+
+        if reader is not None:
+            data = reader.get_latest()
+            if data.get("ok"):
+                if data.get("angle_deg") is not None and encoder_state is not None:
+                    values["x_mm"] = encoder_state.get_position_mm(float(data["angle_deg"]),
+                                                                   clamp_min_zero=True)
+                if data.get("pot_raw") is not None:
+                    values["pot"] = int(data["pot_raw"])
+        if motor is not None and hasattr(motor, "state"):
+            values["duty"] = motor.state()["duty"]
+        if stepper is not None:
+            values["y_mm"] = stepper.position_mm
+        return values
+
+    def record(self, values, ts=None):
+        """Eén sample toevoegen (ontbrekende signalen worden NaN)."""
+        ts = time.time() if ts is None else ts
+        x = values.get("x_mm")
+        if x is not None and self._last_x is not None and ts > self._last_x[0]:
+            values = dict(values, v_mm_s=(x - self._last_x[1]) / (ts - self._last_x[0]))
+        self._last_x = None if x is None else (ts, x)
+
+        with self._lock:
+            i = self._next
+            self._t[i] = ts
+            for name, buf in self._data.items():
+                v = values.get(name)
+                buf[i] = np.nan if v is None else v
+            self._next = (i + 1) % len(self._t)
+            self._count = min(self._count + 1, len(self._t))
+            self._stats["samples"] += 1
+
+    def _run(self):
+        next_t = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self.record(self._read())
+            except Exception as e:
+                print("[history] sample fout:", e)
+            next_t += self.period_s
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.perf_counter()
+
+    def _window(self, name, t_start, t_end):
+        """Samples van één signaal met t_start <= t < t_end, oud naar nieuw."""
+        with self._lock:
+            n, size = self._count, len(self._t)
+            order = (np.arange(n) + (self._next - n)) % size
+            t = self._t[order]
+            y = self._data[name][order]
+        keep = (t >= t_start) & (t < t_end) & np.isfinite(y)
+        return t[keep], y[keep]
+
+    # ---------- opvragen ----------
+    def series(self, signal, window_s, points=500, mode="lttb", now=None):
+        """
+        Gedecimeerde reeks: dict met t (epoch s), v, en het aantal ruwe samples.
+        ValueError bij een onbekend signaal/mode of een te groot venster.
+        """
+        if signal not in SIGNALS:
+            raise ValueError(f"Onbekend signaal '{signal}' (kies uit {', '.join(SIGNALS)})")
+        if mode not in MODES:
+            raise ValueError(f"Onbekende mode '{mode}' (kies uit {', '.join(MODES)})")
+        if not 0 < window_s <= self.history_s:
+            raise ValueError(f"window moet in (0, {self.history_s:.0f}] s liggen")
+        points = int(points)
+        if not 10 <= points <= 2000:
+            raise ValueError("points moet tussen 10 en 2000 liggen")
+
+        # Eindtijd afronden op de bucketbreedte: zelfde bucket = zelfde resultaat
+        bucket_s = window_s / points
+        now = time.time() if now is None else now
+        bucket = math.floor(now / bucket_s)
+        key = (signal, window_s, points, mode, bucket)
+
+        with self._cache_lock:
+            self._stats["requests"] += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                return cached
+
+            # Onder de lock berekenen: gelijktijdige viewers wachten op één berekening
+            t_end = bucket * bucket_s
+            t, y = self._window(signal, t_end - window_s, t_end)
+            raw = len(t)
+            t, y = (lttb if mode == "lttb" else minmax)(t, y, points)
+            result = {
+                "signal": signal,
+                "unit": SIGNALS[signal],
+                "mode": mode,
+                "window_s": window_s,
+                "points": points,
+                "t_end": t_end,
+                "raw_samples": raw,
+                "t": np.round(t, 3).tolist(),
+                "v": np.round(y, 3).tolist(),
+            }
+            self._cache[key] = result
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+            return result
+
+    def stats(self):
+        with self._cache_lock:
+            out = dict(self._stats)
+        with self._lock:
+            out["buffered"] = self._count
+        out["capacity"] = len(self._t)
+        return out
+
+
+def parse_window(text):
+    """'600s', '10m', '1h' of '600' (seconden) -> seconden (ValueError bij onzin)."""
+    text = (text or "").strip().lower()
+    units = {"s": 1.0, "m": 60.0, "h": 3600.0}
+    factor = units.get(text[-1:], None)
+    number = text[:-1] if factor is not None else text
+    try:
+        return float(number) * (factor or 1.0)
+    except ValueError:
+        raise ValueError(f"Ongeldig window '{text}' (bv. 600s, 10m, 1h)") from None
@@ -0,0 +1,326 @@
+# HMI/metrics.py
+"""
+Latency van de HMI-routes en een /metrics export in tekstformaat
+(Prometheus exposition format, te scrapen zonder extra dependency).
+
+HTTPMetrics.install(app) hangt request-hooks aan de Flask-app en houdt per
+route (het url-patroon, dus /api/sensors/<name>/edges en niet per sensor)
+en methode bij:
+  - latency-histogram (tot en met after_request; bij SSE dus tot de headers)
+  - aantal requests per statuscode
+  - fouten: 5xx of een exception in de handler
+  - in-flight requests (inclusief open streams)
+
+render_metrics() voegt daar de interne tellers van de runtime aan toe:
+reader, motor-ramp tick-jitter en command-to-write latency, motorcommando's,
+GPIO-writes, flanken, stepper queue-diepte en pulse timing, telemetrie en de
+mailbox van de handbediening.
+"""
+import bisect
+import threading
+import time
+
+from flask import g, request
+
+# Histogram-grenzen in seconden
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HTTPMetrics:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._hist = {}         # (route, method) -> [bucket counts..., +Inf], sum, count
+        self._status = {}       # (route, method, status) -> n
+        self._errors = {}       # (route, method) -> n
+        self._in_flight = 0
+
+    def install(self, app):
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        return self
+
+    # ---------- hooks ----------
+    @staticmethod
+    def _route():
+        rule = request.url_rule
+        return rule.rule if rule is not None else "<unmatched>", request.method
+
+    def _before(self):
+        g.metrics_t0 = time.perf_counter()
+        g.metrics_done = False
+        with self._lock:
+            self._in_flight += 1
+
+    def _after(self, response):
+        t0 = g.get("metrics_t0")
+        if t0 is not None:
+            self.observe(*self._route(), response.status_code, time.perf_counter() - t0)
+            g.metrics_done = True
+        return response
+
+    def _teardown(self, exc):
+        t0 = g.get("metrics_t0")
+        if t0 is None:
+            return
+        if not g.get("metrics_done"):
+            # Exception in de handler: after_request is niet aangeroepen
+            self.observe(*self._route(), 500, time.perf_counter() - t0)
+        with self._lock:
+            self._in_flight -= 1
+
+    def observe(self, route, method, status, duration_s):
+        key = (route, method)
+        with self._lock:
+            h = self._hist.get(key)
+            if h is None:
+                h = self._hist[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            h[0][bisect.bisect_left(self.buckets, duration_s)] += 1
+            h[1] += duration_s
+            h[2] += 1
+            skey = (route, method, int(status))
+            self._status[skey] = self._status.get(skey, 0) + 1
+            if status >= 500:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            hist = {k: (list(v[0]), v[1], v[2]) for k, v in self._hist.items()}
+            return hist, dict(self._status), dict(self._errors), self._in_flight
+
+    # ---------- export ----------
+    def write(self, out):
+        hist, status, errors, in_flight = self.snapshot()
+
+        out.family("hmi_http_in_flight_requests", "gauge", "Requests in behandeling (incl. open streams)")
+        out.sample("hmi_http_in_flight_requests", {}, in_flight)
+
+        out.family("hmi_http_requests_total", "counter", "Afgehandelde requests per route en status")
+        for (route, method, code), n in sorted(status.items()):
+            out.sample("hmi_http_requests_total", {"route": route, "method": method, "status": code}, n)
+
+        out.family("hmi_http_request_errors_total", "counter", "Requests met 5xx of exception")
+        for (route, method), n in sorted(errors.items()):
+            out.sample("hmi_http_request_errors_total", {"route": route, "method": method}, n)
+
+        name = "hmi_http_request_duration_seconds"
+        out.family(name, "histogram", "Latency per route (tot de response headers)")
+        for (route, method), (counts, total, n) in sorted(hist.items()):
+            labels = {"route": route, "method": method}
+            cum = 0
+            for le, c in zip(self.buckets + ("+Inf",), counts):
+                cum += c
+                out.sample(name + "_bucket", dict(labels, le=le), cum)
+            out.sample(name + "_sum", labels, total)
+            out.sample(name + "_count", labels, n)
+
+
+class _Exposition:
+    """Bouwt de tekst-export op; elke metric-familie één keer HELP/TYPE."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, labels, value):
+        if value is None:
+            return
+        if labels:
+            body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            name = f"{name}{{{body}}}"
+        self.lines.append(f"{name} {_number(value)}")
+
+    def metric(self, name, kind, help_text, value, labels=None):
+        """Familie met één sample."""
+        if value is None:
+            return
+        self.family(name, kind, help_text)
+        self.sample(name, labels or {}, value)
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+# ---------- interne tellers ----------
+def _runtime_metrics(out, runtime):
+    status = runtime.status()
+    out.metric("hmi_ready", "gauge", "Alle hardware gestart", status["ready"])
+    out.family("hmi_subsystem_ready", "gauge", "Subsysteem gestart (1) of niet (0)")
+    for name, s in status["subsystems"].items():
+        out.sample("hmi_subsystem_ready", {"subsystem": name}, s["state"] == "ready")
+
+
+def _reader_metrics(out, reader):
+    if not hasattr(reader, "stats"):
+        return
+    s = reader.stats()
+    out.metric("hmi_reader_ok", "gauge", "Laatste regel van de Arduino was geldig", s["ok"])
+    out.metric("hmi_reader_sample_age_seconds", "gauge", "Leeftijd van de laatste geldige meting",
+               s["age_s"])
+    out.metric("hmi_reader_lines_total", "counter", "Ontvangen regels", s["lines"])
+    out.metric("hmi_reader_parse_errors_total", "counter", "Onleesbare regels", s["parse_errors"])
+    out.metric("hmi_reader_connects_total", "counter", "Seriële poort (her)geopend", s["connects"])
+    out.metric("hmi_reader_errors_total", "counter", "Seriële fouten", s["errors"])
+
+
+def _motor_metrics(out, motor):
+    if hasattr(motor, "state"):
+        ramp = motor.state()
+        out.metric("hmi_motor_duty", "gauge", "Actuele signed duty van de X-motor", ramp["duty"])
+        out.metric("hmi_motor_ramp_ticks_total", "counter", "Ramp ticks", ramp["ticks"])
+        out.metric("hmi_motor_ramp_tick_late_max_seconds", "gauge",
+                   "Grootste vertraging van een ramp tick (jitter)", ramp["tick_late_max_ms"] / 1e3)
+        name = "hmi_motor_command_to_write_seconds"
+        out.family(name, "summary", "Van nieuw motordoel tot de eerste pin-write")
+        out.sample(name + "_sum", {}, ramp["cmd_latency_total_s"])
+        out.sample(name + "_count", {}, ramp["cmd_writes"])
+        out.metric("hmi_motor_command_to_write_max_seconds", "gauge",
+                   "Grootste command-to-write latency", ramp["cmd_latency_max_ms"] / 1e3)
+
+    c = motor.command_stats()
+    out.metric("hmi_motor_commands_total", "counter", "Motorcommando's (TransportMotor)", c["commands"])
+    out.metric("hmi_motor_commands_skipped_total", "counter", "Identieke commando's overgeslagen",
+               c["skipped"])
+    out.metric("hmi_motor_pin_writes_total", "counter", "Pin-writes door motorcommando's", c["writes"])
+    out.metric("hmi_motor_command_latency_max_seconds", "gauge", "Grootste duur van een motorcommando",
+               c["latency_max_us"] / 1e6)
+
+
+def _gpio_metrics(out, gpio):
+    w = gpio.write_stats()
+    out.metric("hmi_gpio_writes_total", "counter", "Pin-writes", w["writes"])
+    out.metric("hmi_gpio_writes_skipped_total", "counter", "Writes overgeslagen (ongewijzigd)", w["skipped"])
+    out.metric("hmi_gpio_transactions_total", "counter", "apply()-aanroepen", w["transactions"])
+    out.metric("hmi_gpio_apply_latency_max_seconds", "gauge", "Grootste duur van apply()",
+               w["latency_max_us"] / 1e6)
+
+    out.family("hmi_gpio_edges_total", "counter", "Flanken per input (accepted/bounced/dropped)")
+    for name, s in sorted(gpio.edge_stats().items()):
+        for kind in ("accepted", "bounced", "dropped"):
+            out.sample("hmi_gpio_edges_total", {"input": name, "kind": kind}, s[kind])
+
+
+def _stepper_metrics(out, stepper):
+    m = stepper.command_metrics()
+    out.metric("hmi_stepper_queue_depth", "gauge", "Wachtende Y-commando's", m["depth"])
+    out.metric("hmi_stepper_queue_max_depth", "gauge", "Grootste queue-diepte", m["max_depth"])
+    out.family("hmi_stepper_commands_total", "counter", "Y-commando's per afhandeling")
+    for kind in ("submitted", "merged", "preempted", "stops", "flushed"):
+        out.sample("hmi_stepper_commands_total", {"kind": kind}, m[kind])
+    if "latency_p95_ms" in m:
+        out.metric("hmi_stepper_command_latency_p95_seconds", "gauge",
+                   "Command-to-motion latency (p95 laatste commando's)", m["latency_p95_ms"] / 1e3)
+
+    t = stepper.timing_stats()
+    out.metric("hmi_stepper_steps_total", "counter", "Gegeven steps", t["steps_total"])
+    out.metric("hmi_stepper_pulse_late_worst_seconds", "gauge", "Grootste step-timingfout",
+               t["worst_late_us"] / 1e6)
+    if "last_p99_us" in t:
+        out.metric("hmi_stepper_pulse_late_p99_seconds", "gauge", "Step-timingfout p99 (laatste run)",
+                   t["last_p99_us"] / 1e6)
+
+
+def _mailbox_metrics(out, mailbox):
+    stats = mailbox.stats()
+    out.family("hmi_manual_commands_total", "counter",
+               "Handbediening per as en afloop (superseded = door nieuwer commando vervangen)")
+    for axis, s in sorted(stats.items()):
+        for state in ("posted", "applied", "superseded", "cancelled", "rejected", "failed"):
+            out.sample("hmi_manual_commands_total", {"axis": axis, "state": state}, s[state])
+    out.family("hmi_manual_command_latency_p95_seconds", "gauge", "Van post tot uitgevoerd (p95)")
+    for axis, s in sorted(stats.items()):
+        if "latency_p95_ms" in s:
+            out.sample("hmi_manual_command_latency_p95_seconds", {"axis": axis},
+                       s["latency_p95_ms"] / 1e3)
+
+
+def _home_metrics(out, checkpoint):
+    s = checkpoint.status()
+    out.metric("hmi_home_restored", "gauge", "Home-referentie hersteld uit checkpoint (1) of niet (0)",
+               1 if s["restore"]["state"] == "restored" else 0)
+    out.metric("hmi_home_checkpoints_total", "counter", "Geschreven home-checkpoints", s["checkpoints"])
+    out.metric("hmi_home_checkpoint_write_max_seconds", "gauge", "Langste checkpoint-write",
+               s["write_ms_max"] / 1e3)
+
+
+def _safety_metrics(out, safety):
+    s = safety.stats()
+    out.family("hmi_safety_trips_total", "counter", "Safety-trips per reden")
+    for reason, n in sorted(s["trips"].items()):
+        out.sample("hmi_safety_trips_total", {"reason": reason}, n)
+    out.metric("hmi_safety_reaction_max_seconds", "gauge", "Grootste reactietijd (conditie tot stop)",
+               s["reaction_max_ms"] / 1e3)
+    out.metric("hmi_safety_reaction_bound_seconds", "gauge",
+               "Gerealiseerde bovengrens reactietijd (periode + lateness + check + stop)",
+               s["reaction_bound_ms"] / 1e3)
+    out.metric("hmi_safety_tick_late_max_seconds", "gauge", "Grootste lateness van de safety-loop",
+               s["late_max_ms"] / 1e3)
+
+
+def _shuttle_metrics(out, shuttle):
+    status = shuttle.status()
+    out.family("hmi_shuttle_jobs_total", "counter", "Afgeronde shuttle-jobs per uitkomst")
+    for state, n in sorted(status["jobs"].items()):
+        out.sample("hmi_shuttle_jobs_total", {"state": state}, n)
+    out.metric("hmi_shuttle_queued", "gauge", "Jobs in de wachtrij", len(status["queued"]))
+    stats = status["stats"]
+    if stats["phases"]:
+        out.family("hmi_shuttle_phase_p95_seconds", "gauge", "p95 van de faseduur (laatste jobs)")
+        for phase, s in stats["phases"].items():
+            out.sample("hmi_shuttle_phase_p95_seconds", {"phase": phase}, s["p95_s"])
+    if stats["cycle"]:
+        out.metric("hmi_shuttle_cycle_mean_seconds", "gauge", "Gemiddelde cyclustijd (laatste jobs)",
+                   stats["cycle"]["mean_s"])
+
+
+def _telemetry_metrics(out, telemetry):
+    s = telemetry.stats()
+    out.metric("hmi_telemetry_seq", "counter", "Gepubliceerde state-wijzigingen", s["seq"])
+    out.metric("hmi_telemetry_streams", "gauge", "Open SSE-streams", s["streams"])
+    out.metric("hmi_telemetry_streams_rejected_total", "counter",
+               "Streams geweigerd (max_streams bereikt)", s["streams_rejected"])
+    out.metric("hmi_telemetry_sample_max_seconds", "gauge", "Grootste duur van één sample",
+               s["sample_max_ms"] / 1e3)
+
+
+def render_metrics(runtime, http, telemetry=None):
+    """Volledige /metrics tekst. Niet-gestarte subsystemen worden overgeslagen."""
+    out = _Exposition()
+    http.write(out)
+
+    sources = [
+        (_runtime_metrics, runtime),
+        (_reader_metrics, runtime.get("arduino_reader")),
+        (_motor_metrics, runtime.get("motor")),
+        (_gpio_metrics, runtime.get("gpio")),
+        (_stepper_metrics, runtime.get("stepper")),
+        (_mailbox_metrics, runtime.mailbox),
+        (_home_metrics, runtime.get("home_checkpoint")),
+        (_safety_metrics, runtime.get("safety")),
+        (_shuttle_metrics, runtime.get("shuttle")),
+        (_telemetry_metrics, telemetry),
+    ]
+    for fn, obj in sources:
+        if obj is None:
+            continue
+        try:
+            fn(out, obj)
+        except Exception as e:
+            print(f"Error in metrics ({fn.__name__}):", e)
+    return out.text()
@@ -0,0 +1,311 @@
+# HMI/runtime.py
+"""
+Hardware van de HMI, parallel opgestart op de achtergrond.
+
+create_app() maakt één HMIRuntime aan en roept start() aan; die komt meteen
+terug. De subsystemen worden in een thread pool geïnitialiseerd:
+
+  gpio     - GPIOManager (alle gpiozero devices)
+  stepper  - TB6600Stepper (step backend + worker)
+  reader   - ArduinoSensorReader (of de gesimuleerde wagen bij `sim`)
+  motor    - TransportMotor, EncoderState en HomingController
+             (wacht op gpio en reader)
+
+Per subsysteem wordt de init-tijd bijgehouden (status()). Routes vragen een
+subsysteem op met require(); is het (nog) niet klaar, dan volgt
+HardwareNotReady en geeft de HMI een 503.
+
+Handbediening loopt via `mailbox` (hardware/command_mailbox.py): as "x"
+(motor) en "y" (stepper) worden geregistreerd zodra ze gestart zijn.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from core.config import get_config_store
+from core.gpio_singleton import close_gpio, get_gpio
+from core.hardware_backend import get_hardware_backend
+from hardware.command_mailbox import CommandMailbox, CommandRejected
+
+SUBSYSTEMS = ("gpio", "stepper", "reader", "motor", "safety", "shuttle")
+
+
+class HardwareNotReady(RuntimeError):
+    pass
+
+
+class HMIRuntime:
+    def __init__(self, config_path="config.yaml"):
+        self.config_path = config_path
+        # Eén keer geparsed + gevalideerd (ConfigError bij fouten)
+        self.config_store = get_config_store(config_path)
+        self.config = self.config_store.current
+        self.backend = get_hardware_backend(config_path)
+        # Latest-wins per as, één actuator-thread voor handbediening
+        self.mailbox = CommandMailbox()
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._objects = {}
+        self._status = {name: {"state": "pending", "duration_ms": None, "error": None}
+                        for name in SUBSYSTEMS}
+        self._t0 = None
+        self._total_ms = None
+        self._pool = None
+
+    # ---------- opstarten ----------
+    def start(self):
+        """Start de init op de achtergrond (niet-blokkerend, maar één keer)."""
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._t0 = time.perf_counter()
+            self._pool = ThreadPoolExecutor(max_workers=len(SUBSYSTEMS),
+                                            thread_name_prefix="hmi-init")
+
+        gpio_f = self._pool.submit(self._init, "gpio", self._init_gpio)
+        stepper_f = self._pool.submit(self._init, "stepper", self._init_stepper)
+        # De gesimuleerde wagen leest de motor-pinnen, de seriële reader niet
+        reader_deps = (gpio_f,) if self.backend == "sim" else ()
+        reader_f = self._pool.submit(self._init, "reader", self._init_reader, *reader_deps)
+        motor_f = self._pool.submit(self._init, "motor", self._init_motor, gpio_f, reader_f)
+        safety_f = self._pool.submit(self._init, "safety", self._init_safety, motor_f, stepper_f)
+        shuttle_f = self._pool.submit(self._init, "shuttle", self._init_shuttle, safety_f)
+
+        threading.Thread(target=self._finish,
+                         args=([gpio_f, stepper_f, reader_f, motor_f, safety_f, shuttle_f],),
+                         daemon=True).start()
+
+    def _finish(self, futures):
+        wait(futures)
+        self._pool.shutdown(wait=False)
+        with self._lock:
+            self._total_ms = (time.perf_counter() - self._t0) * 1e3
+        self._done.set()
+
+    def _init(self, name, fn, *deps):
+        for dep in deps:
+            if dep.result() is False:
+                self._set_status(name, "failed", 0.0, "afhankelijk subsysteem niet gestart")
+                return False
+
+        self._set_status(name, "starting", None, None)
+        t0 = time.perf_counter()
+        try:
+            objects = fn()
+        except Exception as e:
+            print(f"[HMI] init {name} mislukt:", e)
+            self._set_status(name, "failed", (time.perf_counter() - t0) * 1e3, str(e))
+            return False
+
+        with self._lock:
+            self._objects.update(objects)
+        self._set_status(name, "ready", (time.perf_counter() - t0) * 1e3, None)
+        return True
+
+    def _set_status(self, name, state, duration_ms, error):
+        with self._lock:
+            self._status[name] = {"state": state, "duration_ms": duration_ms, "error": error}
+
+    def _init_gpio(self):
+        return {"gpio": get_gpio(self.config_path)}
+
+    def _init_stepper(self):
+        from hardware.stepper_motor import TB6600Stepper, load_stepper_config
+
+        # Pinnen, backend en profiel komen uit steppers.y_axis in config.yaml
+        y_axis = load_stepper_config("y_axis", self.config_path)
+        stepper = TB6600Stepper.from_config(y_axis)
+        self.config_store.subscribe(lambda cfg: stepper.apply_tuning(cfg.steppers["y_axis"]))
+
+        def apply_y(cmd):
+            self._reject_if_shuttle_busy()
+            p = cmd.params
+            stepper.move(direction=p["direction"], steps=p["steps"], delay_s=p["delay_s"])
+
+        self.mailbox.register("y", apply_y)
+        return {"stepper": stepper}
+
+    def _init_reader(self):
+        objects = {}
+        if self.backend == "sim":
+            from hardware.simulation import SimulatedArduinoReader, SimulatedCarriage
+
+            # Zonder hardware: gesimuleerde wagen levert encoder + homing-sensor
+            objects["sim_carriage"] = SimulatedCarriage(self._objects["gpio"])
+            reader = SimulatedArduinoReader(objects["sim_carriage"],
+                                            mm_per_rev=self.config.x_axis.mm_per_rev)
+        else:
+            from hardware.serial_reader import ArduinoSensorReader
+
+            reader = ArduinoSensorReader(baudrate=115200)
+        reader.start()
+        objects["arduino_reader"] = reader
+        return objects
+
+    def _init_motor(self):
+        from hardware.encoder_state import EncoderState
+        from hardware.homing2 import HomingController
+        from hardware.motor_ramp import make_x_motor
+
+        x_axis = self.config.x_axis
+        # Met x_axis.motor_ramp.enabled: slew-rate begrensde duty (RampedMotor)
+        motor = make_x_motor(self.config_path)
+        encoder_state = EncoderState(mm_per_rev=x_axis.mm_per_rev,
+                                     direction_sign=x_axis.direction_sign)
+        homing = HomingController(
+            motor=motor,
+            gpio=self._objects["gpio"],
+            arduino_reader=self._objects["arduino_reader"],
+            encoder_state=encoder_state,
+            sensor_name=x_axis.homing.sensor,     # inductiesensor
+            direction=x_axis.homing.direction,    # richting naar sensor
+            speed=x_axis.homing.speed,
+            timeout_s=x_axis.homing.timeout_s,
+            settle_s=x_axis.homing.settle_s,
+            two_phase=x_axis.homing.two_phase,
+            backoff_speed=x_axis.homing.backoff_speed,
+            backoff_mm=x_axis.homing.backoff_mm,
+            slow_speed=x_axis.homing.slow_speed,
+            stats_runs=x_axis.homing.stats_runs,
+        )
+        self.config_store.subscribe(lambda cfg: homing.apply_tuning(cfg.x_axis.homing))
+
+        def apply_x(cmd):
+            # Homing stuurt dezelfde motor aan: stop breekt homing af,
+            # rijden tijdens homing wordt geweigerd
+            if cmd.action != "stop":
+                if homing.status()["running"]:
+                    raise CommandRejected("Homing actief")
+                self._reject_if_shuttle_busy()
+            safety = self.get("safety")
+            if safety is not None:
+                # Watchdog: een jog moet ververst worden zolang de knop vast is
+                safety.manual(cmd.action)
+            if cmd.action == "stop":
+                homing.cancel()
+                motor.stop(brake=False)
+            elif cmd.action == "forward":
+                motor.forward(cmd.params["speed"])
+            else:
+                motor.backward(cmd.params["speed"])
+
+        self.mailbox.register("x", apply_x)
+        objects = {"motor": motor, "encoder_state": encoder_state, "homing": homing}
+
+        if x_axis.home_persist.enabled:
+            from core.store import get_store
+            from hardware.home_persist import HomeCheckpointer
+
+            # Home-referentie van de vorige run terugzetten (als die plausibel is)
+            objects["home_checkpoint"] = HomeCheckpointer.from_config(
+                x_axis.home_persist, encoder_state, self._objects["arduino_reader"],
+                get_store(self.config_path), gpio=self._objects["gpio"],
+                sensor_name=x_axis.homing.sensor,
+            ).start()
+        return objects
+
+    def _init_safety(self):
+        from hardware.safety import SafetySupervisor
+
+        cfg = self.config.safety
+        if not cfg.enabled:
+            return {}
+        # Bewaakt X (encoder, eindstops, stall, jog-watchdog) en Y (eindstops)
+        safety = SafetySupervisor.from_config(
+            cfg, self._objects["motor"], reader=self._objects["arduino_reader"],
+            encoder_state=self._objects["encoder_state"], stepper=self._objects["stepper"],
+            homing=self._objects["homing"], toward_home=self.config.x_axis.homing.direction,
+        ).start()
+        self.config_store.subscribe(lambda c: safety.apply_tuning(c.safety))
+        return {"safety": safety}
+
+    def _init_shuttle(self):
+        from core.linearaxis import LinearAxisController, ReaderEncoderTracker
+        from core.shuttle import Shuttle
+        from core.store import get_store
+
+        encoder_state = self._objects["encoder_state"]
+        # X via dezelfde motor/encoder als de HMI; forward rijdt naar home als homing forward is
+        x_axis = LinearAxisController(
+            motor=self._objects["motor"],
+            encoder=ReaderEncoderTracker(self._objects["arduino_reader"], encoder_state),
+            homing=self._objects["homing"],
+            forward_increases=self.config.x_axis.homing.direction == "backward",
+        )
+        shuttle = Shuttle(x_axis, self._objects["stepper"], self.config.shuttle,
+                          gpio=self._objects["gpio"], store=get_store(self.config_path),
+                          safety=self._objects.get("safety"), is_homed=encoder_state.is_homed).start()
+        self.config_store.subscribe(lambda cfg: shuttle.apply_tuning(cfg.shuttle))
+        return {"x_axis": x_axis, "shuttle": shuttle}
+
+    def _reject_if_shuttle_busy(self):
+        shuttle = self.get("shuttle")
+        if shuttle is not None and shuttle.busy:
+            raise CommandRejected("Shuttle-cyclus actief")
+
+    # ---------- gebruik ----------
+    def require(self, name):
+        """Geef een subsysteem-object terug, of HardwareNotReady."""
+        with self._lock:
+            obj = self._objects.get(name)
+        if obj is None:
+            raise HardwareNotReady(f"{name} is niet beschikbaar (hardware start nog of is mislukt)")
+        return obj
+
+    def get(self, name, default=None):
+        with self._lock:
+            return self._objects.get(name, default)
+
+    @property
+    def ready(self):
+        with self._lock:
+            return all(s["state"] == "ready" for s in self._status.values())
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wacht tot de init klaar is (gelukt of niet). True = alles ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self):
+        with self._lock:
+            subsystems = {name: dict(s) for name, s in self._status.items()}
+            elapsed = None if self._t0 is None else (time.perf_counter() - self._t0) * 1e3
+            total = self._total_ms
+        return {
+            "ready": all(s["state"] == "ready" for s in subsystems.values()),
+            "done": self.done,
+            "backend": self.backend,
+            "elapsed_ms": total if total is not None else elapsed,
+            "subsystems": subsystems,
+        }
+
+    # ---------- afsluiten ----------
+    def shutdown(self):
+        self.mailbox.close()
+        shuttle = self.get("shuttle")
+        if shuttle is not None:
+            shuttle.close()
+        safety = self.get("safety")
+        if safety is not None:
+            safety.close()
+        motor = self.get("motor")
+        if motor is not None:
+            motor.stop(brake=False)
+            if hasattr(motor, "close"):
+                motor.close()
+        checkpoint = self.get("home_checkpoint")
+        if checkpoint is not None:
+            checkpoint.close()
+        stepper = self.get("stepper")
+        if stepper is not None:
+            stepper.shutdown()
+        reader = self.get("arduino_reader")
+        if reader is not None:
+            reader.stop()
+        if self.get("gpio") is not None:
+            close_gpio()
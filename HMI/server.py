@@ -0,0 +1,96 @@
+# HMI/server.py
+"""
+Serveren van de HMI-app.
+
+  waitress  - productie: pure-Python WSGI-server met een vaste pool worker
+              threads, keep-alive en een limiet op het aantal verbindingen
+  werkzeug  - Flask development server (debuggen)
+
+Keuze en instellingen via `hmi` in config.yaml (server, host, port, threads,
+connection_limit, channel_timeout_s). De control-threads (stepper, motor-ramp,
+reader) draaien los van de server; het begrensde aantal worker threads
+voorkomt dat een piek aan requests ze met GIL-werk verdringt.
+
+SSE-streams (/api/stream) houden elk een worker thread bezet; het aantal
+streams is daarom begrensd op hmi.max_streams (< threads).
+"""
+import logging
+import threading
+
+SERVERS = ("waitress", "werkzeug")
+
+
+class HMIServer:
+    """Draait een WSGI-server in een eigen thread; close() stopt hem."""
+
+    def __init__(self, app, *, server="waitress", host="0.0.0.0", port=5000,
+                 threads=8, connection_limit=100, channel_timeout_s=120.0):
+        self.app = app
+        self.kind = server
+        self.host = host
+        self.port = int(port)
+
+        if server == "waitress":
+            from waitress.server import create_server
+
+            self._server = create_server(
+                app, host=host, port=self.port,
+                threads=int(threads),
+                connection_limit=int(connection_limit),
+                channel_timeout=int(channel_timeout_s),
+                ident="transport-hmi",
+            )
+            self.port = self._server.effective_port
+            self._serve = self._run_waitress
+            self._stop = self._server.close
+            # "Task queue depth is N" komt bij elke request boven `threads`;
+            # bij een piek is dat normaal (requests wachten kort) en spamt het log
+            logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+        elif server == "werkzeug":
+            from werkzeug.serving import make_server
+
+            self._server = make_server(host, self.port, app, threaded=True)
+            self.port = self._server.server_port
+            self._serve = self._server.serve_forever
+            self._stop = self._server.shutdown
+        else:
+            raise ValueError(f"Onbekende server '{server}' (kies uit {SERVERS})")
+
+        self._thread = None
+        self._closing = False
+
+    def _run_waitress(self):
+        try:
+            self._server.run()
+        except OSError:
+            # close() vanuit een andere thread sluit de sockets onder select()
+            if not self._closing:
+                raise
+        finally:
+            self._server.task_dispatcher.shutdown()
+
+    @classmethod
+    def from_config(cls, app, cfg, **overrides):
+        """Bouw uit de `hmi` sectie (core/config.py HMIConfig)."""
+        kwargs = dict(server=cfg.server, host=cfg.host, port=cfg.port, threads=cfg.threads,
+                      connection_limit=cfg.connection_limit,
+                      channel_timeout_s=cfg.channel_timeout_s)
+        kwargs.update(overrides)
+        return cls(app, **kwargs)
+
+    @property
+    def url(self):
+        host = "localhost" if self.host in ("0.0.0.0", "") else self.host
+        return f"http://{host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name="hmi-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._closing = True
+        try:
+            self._stop()
+        except Exception as e:
+            print("[HMI] server stoppen mislukt:", e)
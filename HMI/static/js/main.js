@@ -8,13 +8,18 @@ let currentSpeedLevel = 6;  // default 6 → 0.6 PWM
 // Y-AS SPEED CONFIGURATIE
 // ==============================
 
-// Lagere delay = hogere snelheid
+// Jog-snelheid in mm/s (server begrenst op max_speed_mm_s)
 const Y_SPEEDS = {
-    1: 0.0007,   // langzaam
-    2: 0.0002,   // middel
-    3: 0.00001    // snel
+    1: 2,    // langzaam
+    2: 6,    // middel
+    3: 25    // snel
 };
 
+// Jog keepalive: moet ruim binnen jog_keepalive_s (config.yaml) vallen
+const Y_JOG_KEEPALIVE_MS = 150;
+// X-jog: start-commando herhalen zolang de knop vast is (safety watchdog op de server)
+const X_JOG_KEEPALIVE_MS = 250;
+
 
 // Wacht tot de DOM geladen is
 document.addEventListener('DOMContentLoaded', function() {
@@ -47,10 +52,49 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeYSpeedControl();
     initializeYStepperControls();
 
-    
+    // Live waarden via één stream (na de initialisaties: die melden zich aan)
+    initializeTelemetryStream();
 });
 
 
+// =====================
+// Telemetrie (Server-Sent Events)
+// =====================
+// Eén verbinding met /api/stream i.p.v. losse pollers per waarde. De server
+// stuurt alleen bij een verandering een bericht met de volledige state:
+// { seq, x_mm, x_homed, y_mm, sensor, pot, homing, motion, error }
+
+const telemetryHandlers = [];
+
+function onTelemetry(handler) {
+    telemetryHandlers.push(handler);
+}
+
+function initializeTelemetryStream() {
+    // Pagina zonder live velden: geen verbinding openen
+    if (telemetryHandlers.length === 0) return;
+
+    console.log('Telemetrie-stream openen...');
+    const source = new EventSource('/api/stream');
+
+    source.onmessage = (event) => {
+        let state;
+        try {
+            state = JSON.parse(event.data);
+        } catch (err) {
+            console.error('Ongeldig telemetrie-bericht:', err);
+            return;
+        }
+        telemetryHandlers.forEach(handler => handler(state));
+    };
+
+    // EventSource verbindt zelf opnieuw (bv. na /api/restart)
+    source.onerror = () => {
+        console.warn('Telemetrie-stream onderbroken, opnieuw verbinden...');
+    };
+}
+
+
 // Dropdown functionaliteit
 function initializeDropdowns() {
     // Zoek alle dropdown buttons
@@ -242,35 +286,19 @@ function initializeSensorIndicators() {
         return;
     }
 
-    console.log('Sensor indicator gevonden, start polling...');
+    console.log('Sensor indicator gevonden, volgt telemetrie-stream');
 
-    // Elke 250 ms status opvragen
-    setInterval(() => {
-        updateSensorIndicator(sensorDot);
-    }, 250);
+    onTelemetry(state => updateSensorIndicator(sensorDot, state.sensor));
 }
 
-async function updateSensorIndicator(sensorDot) {
-    try {
-        const response = await fetch('/api/sensors/1');
-        if (!response.ok) {
-            throw new Error('HTTP ' + response.status);
-        }
-
-        const data = await response.json();
-        const active = !!data.active; // true/false
-
-        // Tailwind classes togglen
-        if (active) {
-            sensorDot.classList.remove('bg-gray-300');
-            sensorDot.classList.add('bg-green-400');
-        } else {
-            sensorDot.classList.remove('bg-green-400');
-            sensorDot.classList.add('bg-gray-300');
-        }
-    } catch (err) {
-        console.error('Fout bij lezen sensor status:', err);
-        // hier zou je eventueel het bolletje op een error-kleur kunnen zetten
+function updateSensorIndicator(sensorDot, active) {
+    // Tailwind classes togglen
+    if (active) {
+        sensorDot.classList.remove('bg-gray-300');
+        sensorDot.classList.add('bg-green-400');
+    } else {
+        sensorDot.classList.remove('bg-green-400');
+        sensorDot.classList.add('bg-gray-300');
     }
 }
 
@@ -291,15 +319,28 @@ function initializeManualControls() {
     // helper om huidige snelheid als 0.0–1.0 te krijgen
     const getCurrentSpeed = () => currentSpeedLevel / 10.0;
 
-    // ===== FORWARD =====
-    const startForward = () => {
-        sendManualMotorCommand('forward', 'start', getCurrentSpeed());
+    // Zolang een knop vast is: start herhalen (keepalive voor de safety watchdog).
+    // Valt de verbinding of het stop-commando weg, dan stopt de server de motor.
+    let jogTimer = null;
+
+    const startJog = (direction) => {
+        sendManualMotorCommand(direction, 'start', getCurrentSpeed());
+        if (jogTimer) clearInterval(jogTimer);
+        jogTimer = setInterval(
+            () => sendManualMotorCommand(direction, 'start', getCurrentSpeed()),
+            X_JOG_KEEPALIVE_MS);
     };
 
-    const stopForward = () => {
-        sendManualMotorCommand('forward', 'stop', 0.0);
+    const stopJog = (direction) => {
+        if (jogTimer) clearInterval(jogTimer);
+        jogTimer = null;
+        sendManualMotorCommand(direction, 'stop', 0.0);
     };
 
+    // ===== FORWARD =====
+    const startForward = () => startJog('forward');
+    const stopForward = () => stopJog('forward');
+
     if (forwardBtn) {
         forwardBtn.addEventListener('mousedown', startForward);
         forwardBtn.addEventListener('mouseup', stopForward);
@@ -316,13 +357,8 @@ function initializeManualControls() {
     }
 
     // ===== BACKWARD =====
-    const startBackward = () => {
-        sendManualMotorCommand('backward', 'start', getCurrentSpeed());
-    };
-
-    const stopBackward = () => {
-        sendManualMotorCommand('backward', 'stop', 0.0);
-    };
+    const startBackward = () => startJog('backward');
+    const stopBackward = () => stopJog('backward');
 
     if (backwardBtn) {
         backwardBtn.addEventListener('mousedown', startBackward);
@@ -404,52 +440,30 @@ function initializeSpeedControl() {
 function initializeManualSensors() {
     const encoderEl = document.getElementById('encoder-value');
     const potEl = document.getElementById('potmeter-value');
+    const yPosEl = document.getElementById('y-position-value');
 
     // Als deze pagina geen sensorvelden heeft: niks doen
-    if (!encoderEl && !potEl) return;
+    if (!encoderEl && !potEl && !yPosEl) return;
 
-    console.log('Manual sensors gevonden, start polling...');
+    console.log('Manual sensors gevonden, volgt telemetrie-stream');
 
-    // Direct 1x updaten
-    updateManualSensors(encoderEl, potEl);
-
-    // Daarna elke 250ms
-    setInterval(() => {
-        updateManualSensors(encoderEl, potEl);
-    }, 250);
+    onTelemetry(state => updateManualSensors(encoderEl, potEl, yPosEl, state));
 }
 
-async function updateManualSensors(encoderEl, potEl) {
+function updateManualSensors(encoderEl, potEl, yPosEl, state) {
     if (encoderEl) {
-        try {
-            const response = await fetch('/api/encoder', { cache: 'no-store' });
-            if (!response.ok) throw new Error('HTTP ' + response.status);
-
-            const data = await response.json();
-            if (!data.success) throw new Error(data.error || 'Encoder API error');
-
-            const mm = Number(data.position_mm);
-            encoderEl.textContent = Number.isFinite(mm) ? mm.toFixed(1) + ' mm' : '–';
-        } catch (err) {
-            console.error('Fout bij lezen positie:', err);
-            encoderEl.textContent = '–';
-        }
+        const mm = state.x_mm;
+        encoderEl.textContent = Number.isFinite(mm) ? mm.toFixed(1) + ' mm' : '–';
     }
     // Potmeter
     if (potEl) {
-        try {
-            const response = await fetch('/api/potmeter', { cache: 'no-store' });
-            if (!response.ok) throw new Error('HTTP ' + response.status);
-
-            const data = await response.json();
-            if (!data.success) throw new Error(data.error || 'Potmeter API error');
-
-            const value = Number(data.value);
-            potEl.textContent = Number.isFinite(value) ? String(Math.round(value)) : '–';
-        } catch (err) {
-            console.error('Fout bij lezen potmeter waarde:', err);
-            potEl.textContent = '–'; // of '#'
-        }
+        const value = state.pot;
+        potEl.textContent = Number.isFinite(value) ? String(Math.round(value)) : '–';
+    }
+    // Y-as positie (stappenteller)
+    if (yPosEl) {
+        const mm = state.y_mm;
+        yPosEl.textContent = Number.isFinite(mm) ? mm.toFixed(1) : '–';
     }
 }
 
@@ -458,7 +472,6 @@ async function updateManualSensors(encoderEl, potEl) {
 // =====================
 
 let homingRunning = false;
-let homingPollTimer = null;
 
 function setHomeBtnActive(btn, active) {
   // Force override: dit wint altijd van classes/hover
@@ -467,36 +480,6 @@ function setHomeBtnActive(btn, active) {
   btn.style.borderColor = ''; // laat je border zoals die is
 }
 
-
-async function getHomingStatus() {
-  const res = await fetch('/api/homing/status', { cache: 'no-store' });
-  const data = await res.json();
-  if (!res.ok || !data.success) throw new Error(data.error || 'status failed');
-  return data; // {running: bool, last_result: ...}
-}
-
-function startHomingPolling(btn) {
-  if (homingPollTimer) clearInterval(homingPollTimer);
-
-  homingPollTimer = setInterval(async () => {
-    try {
-      const status = await getHomingStatus();
-
-      // status.running false => klaar/cancel/error
-      if (!status.running) {
-        homingRunning = false;
-        setHomeBtnActive(btn, false);
-
-        clearInterval(homingPollTimer);
-        homingPollTimer = null;
-      }
-    } catch (e) {
-      console.error('Homing status error:', e);
-      // We laten de knop in actieve state, want motor kan nog lopen.
-    }
-  }, 200);
-}
-
 async function startHoming() {
   const res = await fetch('/api/homing/start', {
     method: 'POST',
@@ -521,14 +504,15 @@ function initializeHomingButton() {
   const btn = document.getElementById('home-btn');
   if (!btn) return;
 
-  // Bij laden: check status zodat de kleur klopt als homing al bezig was
-  getHomingStatus()
-    .then(status => {
-      homingRunning = !!status.running;
-      setHomeBtnActive(btn, homingRunning);
-      if (homingRunning) startHomingPolling(btn);
-    })
-    .catch(() => { /* geen probleem */ });
+  // Knopkleur volgt de homing-status uit de telemetrie-stream
+  // (ook bij laden, als homing al bezig was)
+  onTelemetry(state => {
+    const running = !!(state.homing && state.homing.running);
+    if (running !== homingRunning) {
+      homingRunning = running;
+      setHomeBtnActive(btn, running);
+    }
+  });
 
   btn.addEventListener('click', async () => {
     try {
@@ -537,23 +521,14 @@ function initializeHomingButton() {
         await startHoming();
         homingRunning = true;
         setHomeBtnActive(btn, true);
-        startHomingPolling(btn);
       } else {
         // cancel
         await cancelHoming();
-        // knop blijft nog even donker tot polling ziet dat running=false is
+        // knop blijft nog even donker tot de stream running=false meldt
       }
     } catch (e) {
       console.error('Homing click error:', e);
       alert('Homing fout: ' + e.message);
-
-      // Veilig: status opnieuw ophalen zodat UI klopt
-      try {
-        const status = await getHomingStatus();
-        homingRunning = !!status.running;
-        setHomeBtnActive(btn, homingRunning);
-        if (homingRunning) startHomingPolling(btn);
-      } catch {}
     }
   });
 }
@@ -635,37 +610,44 @@ function initializeYStepperControls() {
 
   if (!btnFwd || !btnBwd) return;
 
-  // "Oneindige" move: groot getal, stop breekt ‘m af
-  const JOG_STEPS = 1000000000;
-
-  // Snelheid: kleiner = sneller (maar niet te klein)
-  const JOG_DELAY = 0.0005; // probeer 0.001, 0.0005, 0.002 etc.
-
-  async function startJog(direction) {
-    
-    const delay = Y_SPEEDS[ySpeedLevel];
+  // Jog = snelheidsmodus met deadman: zolang de knop ingedrukt is sturen we
+  // elke Y_JOG_KEEPALIVE_MS de (eventueel gewijzigde) snelheid opnieuw.
+  // Valt de verbinding weg, dan remt de server zelf af.
+  let jogDirection = null;
+  let jogTimer = null;
 
+  async function sendJog(velocity) {
     try {
-      await fetch("/api/manual/stepper/move", {
+      await fetch("/api/manual/stepper/jog", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          direction: direction,   // "forward" / "backward"
-          steps: JOG_STEPS,
-          delay: delay
-        })
+        body: JSON.stringify({ velocity_mm_s: velocity })
       });
     } catch (e) {
-      console.error("startJog error:", e);
+      console.error("jog error:", e);
     }
   }
 
-  async function stopJog() {
-    try {
-      await fetch("/api/manual/stepper/stop", { method: "POST" });
-    } catch (e) {
-      console.error("stopJog error:", e);
-    }
+  function jogVelocity() {
+    const speed = Y_SPEEDS[ySpeedLevel];
+    return jogDirection === "forward" ? speed : -speed;
+  }
+
+  function startJog(direction) {
+    jogDirection = direction;
+    sendJog(jogVelocity());
+
+    if (jogTimer) clearInterval(jogTimer);
+    jogTimer = setInterval(() => sendJog(jogVelocity()), Y_JOG_KEEPALIVE_MS);
+  }
+
+  function stopJog() {
+    if (!jogTimer && jogDirection === null) return;
+
+    if (jogTimer) clearInterval(jogTimer);
+    jogTimer = null;
+    jogDirection = null;
+    sendJog(0);
   }
 
   function bindHold(button, direction) {
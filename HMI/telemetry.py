@@ -0,0 +1,273 @@
+# HMI/telemetry.py
+"""
+Gecombineerde telemetrie voor de HMI.
+
+Eén sampler-thread leest met een vaste rate (hmi.telemetry_hz) alle waarden
+uit (X-positie, Y-positie, sensor, potmeter, homing, beweging) en bouwt daar
+een compacte state-dict van. Alleen als er iets veranderd is (na afronden)
+wordt het volgnummer `seq` verhoogd en worden wachtende clients gewekt;
+anders gebeurt er niets (change suppression).
+
+De sampler draait alleen zolang er clients luisteren (stream()); zonder
+clients kost de hub niets.
+
+Gebruikt door /api/stream (Server-Sent Events) en /api/state (snapshot
+met long-polling voor clients zonder streaming).
+
+Het aantal streams is begrensd (hmi.max_streams): open_stream() reserveert
+een slot atomair en de stream geeft het vrij bij close(). Een verdwenen
+client merkt de server pas bij de volgende write; daarom gaat er bij stilte
+elke STREAM_PROBE_S een leeg SSE-commentaar uit, zodat het slot binnen
+ongeveer een seconde vrijkomt (niet pas na heartbeat_s).
+"""
+import json
+import os
+import threading
+import time
+
+# Leeg SSE-commentaar bij stilte: detecteert een verdwenen client
+STREAM_PROBE_S = 1.0
+
+
+class TelemetryHub:
+    def __init__(self, runtime, rate_hz=20.0, heartbeat_s=10.0, max_streams=None):
+        self.runtime = runtime
+        self.period_s = 1.0 / float(rate_hz)
+        self.heartbeat_s = float(heartbeat_s)
+
+        self._cond = threading.Condition()
+        self._state = None
+        self._seq = 0
+        # Andere waarde na elke herstart: seq begint dan opnieuw bij 1
+        self.boot_id = os.urandom(4).hex()
+        self._clients = 0
+        self._streams = 0
+        # Stream-slots: reserveren is één acquire(), dus check en registratie in één stap
+        self.max_streams = max_streams
+        self._slots = threading.BoundedSemaphore(max_streams) if max_streams is not None else None
+        self._thread = None
+        self._stats = {"samples": 0, "changes": 0, "sample_max_s": 0.0, "streams_rejected": 0}
+
+    def apply_tuning(self, cfg):
+        """Hot reload van hmi.telemetry_hz."""
+        self.period_s = 1.0 / float(cfg.telemetry_hz)
+
+    # ---------- sampler ----------
+    def sample(self):
+        """Lees alle bronnen één keer uit en bouw de state (zonder seq/ts)."""
+        rt = self.runtime
+        reader = rt.get("arduino_reader")
+        encoder_state = rt.get("encoder_state")
+        gpio = rt.get("gpio")
+        motor = rt.get("motor")
+        homing = rt.get("homing")
+        stepper = rt.get("stepper")
+
+        state = {"x_mm": None, "x_homed": None, "y_mm": None, "sensor": None, "pot": None,
+                 "homing": None, "motion": {}, "error": None}
+
+        if reader is not None:
+            data = reader.get_latest()
+            if data.get("ok") and data.get("angle_deg") is not None and encoder_state is not None:
+                # clamp_min_zero=True omdat home bij eindstop zit
+                pos = encoder_state.get_position_mm(float(data["angle_deg"]), clamp_min_zero=True)
+                state["x_mm"] = None if pos is None else round(pos, 1)
+                state["x_homed"] = encoder_state.is_homed()
+            else:
+                state["error"] = data.get("error") or "No data"
+            if data.get("ok") and data.get("pot_raw") is not None:
+                state["pot"] = int(data["pot_raw"])
+
+        if gpio is not None:
+            state["sensor"] = gpio.is_active("sensor_1")
+        if homing is not None:
+            state["homing"] = homing.status()
+        if stepper is not None:
+            state["y_mm"] = round(stepper.position_mm, 2)
+            state["motion"]["y_moving"] = stepper.is_moving
+            state["motion"]["y_jogging"] = stepper.is_jogging
+        if motor is not None and hasattr(motor, "state"):
+            ramp = motor.state()
+            state["motion"]["x_duty"] = round(ramp["duty"], 2)
+            state["motion"]["x_mode"] = ramp["mode"]
+        return state
+
+    def _publish(self, state):
+        with self._cond:
+            self._stats["samples"] += 1
+            if state == self._state:
+                return False
+            self._state = state
+            self._seq += 1
+            self._stats["changes"] += 1
+            self._cond.notify_all()
+            return True
+
+    def _run(self):
+        next_t = time.perf_counter()
+        while True:
+            with self._cond:
+                if self._clients <= 0:
+                    self._thread = None
+                    return
+            t0 = time.perf_counter()
+            try:
+                self._publish(self.sample())
+            except Exception as e:
+                print("[telemetry] sample fout:", e)
+            dt = time.perf_counter() - t0
+            with self._cond:
+                if dt > self._stats["sample_max_s"]:
+                    self._stats["sample_max_s"] = dt
+
+            next_t += self.period_s
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.perf_counter()    # achter: niet inhalen
+
+    def _attach(self):
+        with self._cond:
+            self._clients += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _detach(self):
+        with self._cond:
+            self._clients -= 1
+
+    # ---------- clients ----------
+    def current(self):
+        """(seq, state) van de laatst gepubliceerde state."""
+        with self._cond:
+            return self._seq, self._state
+
+    def wait(self, after, timeout):
+        """Wacht tot seq > after (of timeout). Geeft (seq, state) terug."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= after:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self._seq, self._state
+
+    def snapshot(self, after=None, wait_s=0.0):
+        """
+        (seq, state) voor /api/state. Met `after` en `wait_s` wordt gewacht tot
+        er iets veranderd is t.o.v. volgnummer `after` (long-poll); de sampler
+        draait zolang er gewacht wordt. Zonder wachten wordt direct gesampled
+        als er geen sampler loopt, zodat de state nooit verouderd is.
+        """
+        with self._cond:
+            sampler_running = self._thread is not None
+            seq = self._seq
+        if after is not None and after > seq:
+            after = None    # client kent een seq van vóór een herstart
+
+        if after is not None and wait_s > 0:
+            self._attach()
+            try:
+                return self.wait(after, wait_s)
+            finally:
+                self._detach()
+
+        if not sampler_running:
+            self._publish(self.sample())
+        return self.current()
+
+    def open_stream(self):
+        """
+        Reserveer een stream-slot en geef de SSE-stream terug, of None als
+        alle max_streams slots bezet zijn. Het slot komt vrij bij close() van
+        de stream (de WSGI-server doet dat als de client weg is), ook als er
+        nog nooit een bericht uit is gegaan.
+        """
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            with self._cond:
+                self._stats["streams_rejected"] += 1
+            return None
+        with self._cond:
+            self._streams += 1
+        return _Stream(self._events(), self._release_stream)
+
+    def _release_stream(self):
+        with self._cond:
+            self._streams -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def _events(self):
+        """
+        Generator met SSE-berichten: één `data:` per veranderde state, een
+        commentaarregel als heartbeat (houdt proxies/browser verbonden) en bij
+        stilte een leeg commentaar als probe.
+        """
+        self._attach()
+        try:
+            # Eerste bericht direct met de volledige state (ook na reconnect)
+            seq, state = self.current()
+            if state is None:
+                self._publish(self.sample())
+                seq, state = self.current()
+            yield self._format(seq, state)
+            after = seq
+            last_beat = time.monotonic()
+
+            while True:
+                seq, state = self.wait(after, min(self.heartbeat_s, STREAM_PROBE_S))
+                if seq > after:
+                    yield self._format(seq, state)
+                    after = seq
+                elif time.monotonic() - last_beat >= self.heartbeat_s:
+                    yield ": heartbeat\n\n"
+                    last_beat = time.monotonic()
+                else:
+                    yield ":\n\n"
+        finally:
+            self._detach()
+
+    def stream_count(self):
+        with self._cond:
+            return self._streams
+
+    @staticmethod
+    def _format(seq, state):
+        payload = json.dumps(dict(state, seq=seq), separators=(",", ":"))
+        return f"id: {seq}\ndata: {payload}\n\n"
+
+    def stats(self):
+        with self._cond:
+            out = dict(self._stats)
+            out.update(seq=self._seq, clients=self._clients, streams=self._streams)
+        out["sample_max_ms"] = out.pop("sample_max_s") * 1e3
+        return out
+
+
+class _Stream:
+    """Iterator over de SSE-berichten die bij close() precies één keer zijn slot vrijgeeft."""
+
+    def __init__(self, events, release):
+        self._events = events
+        self._release = release
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self._events.close()    # GeneratorExit in _events: detach van de sampler
+        finally:
+            self._release()
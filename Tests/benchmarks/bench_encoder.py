@@ -0,0 +1,31 @@
+# Tests/benchmarks/bench_encoder.py
+"""Encoder-unwrap: EncoderState (HMI) en EncoderTracker (core/linearaxis.py)."""
+import core.linearaxis as linearaxis
+from hardware.encoder_state import EncoderState
+
+MM_PER_REV = 90.33
+
+
+def _homed_state():
+    state = EncoderState(mm_per_rev=MM_PER_REV, direction_sign=-1)
+    state.set_home_offset(0.0)
+    return state
+
+
+def bench_encoder_state_ingest_raw(benchmark, angle_sweep):
+    state = _homed_state()
+    benchmark(lambda: state.ingest_raw(next(angle_sweep), clamp_min_zero=True))
+    assert state.get_latest()["mm"] is not None
+
+
+def bench_encoder_state_get_position_mm(benchmark, angle_sweep):
+    state = _homed_state()
+    benchmark(lambda: state.get_position_mm(next(angle_sweep), clamp_min_zero=True))
+
+
+def bench_encoder_tracker_update_mm(benchmark, angle_sweep, monkeypatch):
+    # Hoek uit de reeks in plaats van de seriële reader
+    monkeypatch.setattr(linearaxis, "read_encoder_angle_deg", lambda: next(angle_sweep))
+    tracker = linearaxis.EncoderTracker(mm_per_rev=MM_PER_REV)
+    benchmark(tracker.update_mm)
+    assert tracker.update_mm() is not None
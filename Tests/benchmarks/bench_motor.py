@@ -0,0 +1,34 @@
+# Tests/benchmarks/bench_motor.py
+"""TransportMotor commando's op de mock GPIO (gpiozero MockFactory)."""
+import itertools
+
+import pytest
+
+from hardware.motor_controller import TransportMotor
+
+
+@pytest.fixture
+def motor():
+    motor = TransportMotor()
+    yield motor
+    motor.coast()
+
+
+def bench_motor_repeat_command(benchmark, motor):
+    """Zelfde commando opnieuw: state-diffing slaat de pin-writes over."""
+    motor.forward(0.5)
+    benchmark(motor.forward, 0.5)
+    assert motor.command_stats()["skipped"] > 0
+
+
+def bench_motor_speed_change(benchmark, motor):
+    """Andere duty per commando (ramp): één GPIO-transactie per aanroep."""
+    speeds = itertools.cycle([i / 100 for i in range(10, 100)])
+    benchmark(lambda: motor.forward(next(speeds)))
+
+
+def bench_motor_reverse(benchmark, motor):
+    """Richtingwissel en remmen: alle vier de pinnen veranderen."""
+    commands = itertools.cycle([lambda: motor.forward(0.6), lambda: motor.stop(brake=True),
+                                lambda: motor.backward(0.6), lambda: motor.stop()])
+    benchmark(lambda: next(commands)())
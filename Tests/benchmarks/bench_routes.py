@@ -0,0 +1,40 @@
+# Tests/benchmarks/bench_routes.py
+"""Latency van de Flask-routes via de test client (gesimuleerde hardware)."""
+import time
+
+import pytest
+
+ROUTES = [
+    "/api/ready",
+    "/api/state",
+    "/api/encoder",
+    "/api/potmeter",
+    "/api/homing/status",
+    "/api/stations",
+    "/api/timeseries?signal=x_mm&window=60s&points=200",
+    "/metrics",
+]
+
+
+@pytest.fixture(scope="module")
+def client(bench_config):
+    from core.gpio_singleton import close_gpio
+    from HMI.app import create_app
+
+    close_gpio()                                  # bench_motor gebruikte de GPIO met config.yaml
+    app = create_app(bench_config)
+    client = app.test_client()
+    deadline = time.monotonic() + 20.0
+    while client.get("/api/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            pytest.fail("HMI niet ready binnen 20 s")
+        time.sleep(0.1)
+    yield client
+    app.extensions["hmi_history"].close()
+    app.extensions["hmi_runtime"].shutdown()
+
+
+@pytest.mark.parametrize("path", ROUTES)
+def bench_route(benchmark, client, path):
+    resp = benchmark(client.get, path)
+    assert resp.status_code in (200, 304)
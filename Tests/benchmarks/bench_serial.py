@@ -0,0 +1,28 @@
+# Tests/benchmarks/bench_serial.py
+"""Parsen van seriële regels ("angle,pot") in ArduinoSensorReader."""
+import itertools
+
+from hardware.serial_reader import ArduinoSensorReader
+
+LINES = [f"{a / 10:.2f},{(a * 7) % 1024}" for a in range(0, 3600, 13)]
+
+
+def bench_parse_line(benchmark):
+    lines = itertools.cycle(LINES)
+    benchmark(lambda: ArduinoSensorReader.parse_line(next(lines)))
+
+
+def bench_handle_line(benchmark):
+    """Volledige verwerking: parsen + latest/tellers bijwerken onder de lock."""
+    reader = ArduinoSensorReader()
+    lines = itertools.cycle(LINES)
+    benchmark(lambda: reader._handle_line(next(lines)))
+    assert reader.stats()["parse_errors"] == 0
+
+
+def bench_handle_line_garbage(benchmark):
+    """Foute regels (half ontvangen na een reset van de Uno)."""
+    reader = ArduinoSensorReader()
+    lines = itertools.cycle(["", "12.5", "abc,def", "12.5,", ",512"])
+    benchmark(lambda: reader._handle_line(next(lines)))
+    assert not reader.get_latest()["ok"]
@@ -0,0 +1,23 @@
+# Tests/benchmarks/bench_stations.py
+"""Stations laden: uit de CSV en uit de store (SQLite)."""
+import core.stations as stations
+from core.linearaxis import load_station_positions
+
+from conftest import STATIONS_CSV
+
+
+def bench_load_station_positions_csv(benchmark):
+    positions = benchmark(load_station_positions, STATIONS_CSV)
+    assert positions
+
+
+def bench_load_stations_store(benchmark, bench_store, monkeypatch):
+    monkeypatch.setattr(stations, "_store", lambda: bench_store)
+    result = benchmark(stations.load_stations)
+    assert result
+
+
+def bench_load_station_positions_store(benchmark, bench_store, monkeypatch):
+    monkeypatch.setattr(stations, "_store", lambda: bench_store)
+    positions = benchmark(load_station_positions)
+    assert positions
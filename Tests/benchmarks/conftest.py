@@ -0,0 +1,74 @@
+# Tests/benchmarks/conftest.py
+"""
+Gedeelde fixtures voor de benchmarks. Alles draait zonder hardware: de
+backend staat op "sim" (gpiozero MockFactory + gesimuleerde wagen) en de
+store/config zijn tijdelijke kopieën, zodat data/transport.db niet
+aangeraakt wordt.
+
+Baseline vastleggen en later vergelijken (vanuit de projectmap):
+    pytest Tests/benchmarks --benchmark-save=baseline
+    pytest Tests/benchmarks --benchmark-compare
+Bij --benchmark-compare faalt de run als een benchmark meer dan
+REGRESSION_THRESHOLD trager is dan de laatst opgeslagen run (tenzij
+--benchmark-compare-fail zelf meegegeven is).
+"""
+import itertools
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("TRANSPORT_HW_BACKEND", "sim")
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+# config.yaml en data/ worden relatief aan de projectmap gelezen
+os.chdir(ROOT)
+
+import numpy as np
+import pytest
+import yaml
+
+STATIONS_CSV = ROOT / "data" / "stations.csv"
+REGRESSION_THRESHOLD = "median:25%"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Vóór pytest-benchmark zijn sessie aanmaakt; alleen zinvol met een vergelijking
+    if config.getoption("benchmark_compare", None) and not config.getoption("benchmark_compare_fail"):
+        from pytest_benchmark.utils import parse_compare_fail
+
+        config.option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_THRESHOLD)]
+
+
+@pytest.fixture(scope="session")
+def bench_config(tmp_path_factory):
+    """config.yaml met de store in een tijdelijke map."""
+    tmp = tmp_path_factory.mktemp("bench")
+    with open(ROOT / "config.yaml") as f:
+        raw = yaml.safe_load(f)
+    raw["store"]["path"] = str(tmp / "transport.db")
+    raw["store"]["stations_csv"] = str(STATIONS_CSV)
+    path = tmp / "config.yaml"
+    with open(path, "w") as f:
+        yaml.safe_dump(raw, f)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def bench_store(bench_config):
+    from core.store import get_store
+
+    store = get_store(bench_config)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def angle_sweep():
+    """
+    Oneindige reeks ruwe encoderhoeken (graden): heen en weer over een paar
+    omwentelingen, met 0/360-overgangen, in stappen zoals bij 100 Hz.
+    """
+    forward = np.arange(0.0, 3 * 360.0, 7.3) % 360.0
+    return itertools.cycle(np.concatenate([forward, forward[::-1]]).tolist())
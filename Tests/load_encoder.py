@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Loadtest voor /api/encoder: latency (p50/p99) met 1 en met 20 gelijktijdige
+clients, per server (waitress / werkzeug).
+
+De HMI wordt in dit proces gestart met de sim backend (geen hardware nodig),
+op een vrije poort. Elke client is een thread met één keep-alive verbinding
+die zo snel mogelijk /api/encoder opvraagt.
+
+Starten vanuit de projectmap:
+    python -m Tests.load_encoder
+    python -m Tests.load_encoder --server waitress --clients 1 20 --duration 5
+"""
+import argparse
+import http.client
+import os
+import threading
+import time
+
+os.environ.setdefault("TRANSPORT_HW_BACKEND", "sim")
+
+import numpy as np
+
+from core.config import get_config
+from HMI.app import create_app
+from HMI.server import HMIServer
+
+PATH = "/api/encoder"
+
+
+def run_clients(port, n_clients, duration_s):
+    """n_clients threads, elk met een keep-alive verbinding. Latencies in ms."""
+    latencies = [[] for _ in range(n_clients)]
+    errors = [0] * n_clients
+    start = threading.Barrier(n_clients + 1)
+    deadline = [0.0]
+
+    def client(i):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        out = latencies[i]
+        start.wait()
+        while time.perf_counter() < deadline[0]:
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", PATH)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    errors[i] += 1
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                continue
+            out.append((time.perf_counter() - t0) * 1e3)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(n_clients)]
+    for t in threads:
+        t.start()
+    deadline[0] = time.perf_counter() + duration_s
+    start.wait()
+    for t in threads:
+        t.join()
+
+    lat = np.concatenate([np.asarray(x) for x in latencies]) if any(latencies) else np.empty(0)
+    return lat, sum(errors)
+
+
+def summarize(lat, errors, duration_s):
+    if lat.size == 0:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": int(lat.size),
+        "errors": errors,
+        "rps": lat.size / duration_s,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("waitress", "werkzeug", "both"), default="both")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconden per meting")
+    parser.add_argument("--threads", type=int, default=None, help="worker threads (default: config)")
+    args = parser.parse_args()
+
+    app = create_app()
+    runtime = app.extensions["hmi_runtime"]
+    if not runtime.wait(10):
+        print("Hardware niet klaar:", runtime.status())
+        return 1
+
+    hmi_cfg = get_config().hmi
+    servers = ("waitress", "werkzeug") if args.server == "both" else (args.server,)
+    overrides = {"host": "127.0.0.1", "port": 0}
+    if args.threads:
+        overrides["threads"] = args.threads
+
+    print(f"{'server':<10} {'clients':>7} {'requests':>9} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}")
+    for kind in servers:
+        server = HMIServer.from_config(app, hmi_cfg, server=kind, **overrides).start()
+        time.sleep(0.2)
+        try:
+            run_clients(server.port, 1, 0.5)        # opwarmen
+            for n in args.clients:
+                lat, errors = run_clients(server.port, n, args.duration)
+                s = summarize(lat, errors, args.duration)
+                if not s["requests"]:
+                    print(f"{kind:<10} {n:>7} {'geen responses':>9} (errors: {errors})")
+                    continue
+                print(f"{kind:<10} {n:>7} {s['requests']:>9} {s['rps']:>8.0f} "
+                      f"{s['p50_ms']:>8.2f} {s['p99_ms']:>8.2f} {s['max_ms']:>8.2f} {s['errors']:>6}")
+        finally:
+            server.close()
+
+    runtime.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Loadtest van de HMI met gesimuleerde hardware: N browsersessies tegelijk,
+terwijl de wagen bestuurd wordt. Bedoeld als regressie-check vóór elke
+HMI-wijziging.
+
+Verkeer per sessie (elk een eigen keep-alive verbinding):
+  - viewers: pollen /api/encoder, /api/potmeter, /api/sensors/1 en
+    /api/homing/status, met af en toe een Y-jog (vasthouden met keepalive,
+    dubbele start zoals touch + mouse events)
+  - operator (sessie 0): homing-cycli, afgewisseld met X-jog bursts van de
+    homing-sensor af
+  - streams: open /api/stream verbindingen (kiosk-pagina's)
+
+Rapport: throughput, latency-percentielen per endpoint, fouten, homing-
+cycli en jitter van de control-loops (ramp tick, step-pulsen, mailbox uit
+/metrics, plus een 200 Hz probe-thread in hetzelfde proces).
+Exit code 1 als een drempel (--max-*) overschreden wordt.
+
+Starten vanuit de projectmap:
+    python -m Tests.load_hmi --clients 10 --duration 30
+    python -m Tests.load_hmi --clients 10 --json load.json
+    python -m Tests.load_hmi --url http://pi.local:5000 --clients 5   # draaiende HMI
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+
+os.environ.setdefault("TRANSPORT_HW_BACKEND", "sim")
+
+import numpy as np
+
+POLL_PATHS = ("/api/encoder", "/api/potmeter", "/api/sensors/1", "/api/homing/status")
+PROBE_HZ = 200.0
+
+# Uit /metrics: control-loop timing en mailbox
+CONTROL_METRICS = {
+    "hmi_motor_ramp_tick_late_max_seconds": "ramp_tick_late_max_ms",
+    "hmi_motor_command_to_write_max_seconds": "motor_cmd_to_write_max_ms",
+    "hmi_stepper_pulse_late_worst_seconds": "step_pulse_late_worst_ms",
+    "hmi_stepper_pulse_late_p99_seconds": "step_pulse_late_p99_ms",
+    "hmi_stepper_command_latency_p95_seconds": "stepper_cmd_latency_p95_ms",
+    "hmi_telemetry_sample_max_seconds": "telemetry_sample_max_ms",
+}
+
+
+class Session:
+    """Eén gesimuleerde browser: keep-alive verbinding + eigen meetwaarden."""
+
+    def __init__(self, host, port, rng):
+        self.host, self.port = host, port
+        self.rng = rng
+        self.conn = http.client.HTTPConnection(host, port, timeout=10)
+        self.latencies = {}     # label -> [ms]
+        self.errors = {}        # label -> n
+
+    def request(self, method, path, body=None):
+        label = f"{method} {path.split('?')[0]}"
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        payload = None if body is None else json.dumps(body)
+        t0 = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            data = resp.read()
+            status = resp.status
+        except (OSError, http.client.HTTPException):
+            self.errors[label] = self.errors.get(label, 0) + 1
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+            return None, None
+        self.latencies.setdefault(label, []).append((time.perf_counter() - t0) * 1e3)
+        if status >= 500:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def poll(self):
+        for path in POLL_PATHS:
+            self.request("GET", path)
+
+    def sleep(self, seconds):
+        time.sleep(seconds * self.rng.uniform(0.8, 1.2))
+
+    def close(self):
+        self.conn.close()
+
+
+def viewer(s, args, deadline):
+    next_jog = time.perf_counter() + s.rng.uniform(0, args.jog_every) if args.jog_every else None
+    while time.perf_counter() < deadline:
+        s.poll()
+        if next_jog is not None and time.perf_counter() >= next_jog:
+            y_jog_burst(s, args)
+            next_jog = time.perf_counter() + s.rng.expovariate(1.0 / args.jog_every)
+        s.sleep(args.poll_s)
+
+
+def y_jog_burst(s, args):
+    """Y-knop vasthouden: jog met keepalive, daarna loslaten (velocity 0)."""
+    velocity = s.rng.choice((-1, 1)) * args.y_jog_mm_s
+    hold_until = time.perf_counter() + s.rng.uniform(0.3, 1.0)
+    # touchstart + mousedown
+    s.request("POST", "/api/manual/stepper/jog", {"velocity_mm_s": velocity})
+    _, data = s.request("POST", "/api/manual/stepper/jog", {"velocity_mm_s": velocity})
+    keepalive = (data or {}).get("keepalive_s", 0.5)
+    while time.perf_counter() < hold_until:
+        time.sleep(keepalive / 2)
+        s.request("POST", "/api/manual/stepper/jog", {"velocity_mm_s": velocity})
+    s.request("POST", "/api/manual/stepper/jog", {"velocity_mm_s": 0.0})
+
+
+def x_jog_burst(s, args, deadline):
+    """X-knop: start-burst (touch + mouse), vasthouden met keepalive, stop (mouseup + mouseleave)."""
+    cmd = {"direction": args.x_away, "action": "start", "speed": args.x_jog_speed}
+    for _ in range(3):
+        s.request("POST", "/api/manual/motor", cmd)
+    hold_until = min(deadline, time.perf_counter() + args.x_jog_s)
+    while time.perf_counter() < hold_until:
+        s.poll()
+        s.sleep(args.poll_s)
+        # Keepalive zoals de HMI (safety watchdog)
+        s.request("POST", "/api/manual/motor", cmd)
+    stop = {"direction": args.x_away, "action": "stop"}
+    s.request("POST", "/api/manual/motor", stop)
+    s.request("POST", "/api/manual/motor", stop)
+
+
+def operator(s, args, deadline, cycles):
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        status, _ = s.request("POST", "/api/homing/start")
+        if status == 200:
+            result = None
+            while time.perf_counter() < deadline:
+                _, data = s.request("GET", "/api/homing/status")
+                if data and not data.get("running"):
+                    result = data.get("last_result") or {}
+                    break
+                s.poll()
+                s.sleep(args.poll_s)
+            if result is not None:
+                cycles.append({"success": bool(result.get("success")),
+                               "duration_s": time.perf_counter() - t0,
+                               "edge_to_stop_ms": result.get("edge_to_stop_ms"),
+                               "error": result.get("error")})
+        x_jog_burst(s, args, deadline)
+        s.sleep(args.poll_s)
+
+
+def stream_reader(host, port, deadline, counts, i):
+    """Open SSE-verbinding; telt berichten tot de deadline."""
+    try:
+        conn = http.client.HTTPConnection(host, port, timeout=2)
+        conn.request("GET", "/api/stream")
+        resp = conn.getresponse()
+        if resp.status != 200:
+            counts[i] = -resp.status
+            return
+        while time.perf_counter() < deadline:
+            try:
+                line = resp.fp.readline()
+            except OSError:
+                continue            # timeout: geen bericht binnen 2 s
+            if not line:
+                break
+            if line.startswith(b"data:"):
+                counts[i] += 1
+        conn.close()
+    except (OSError, http.client.HTTPException):
+        counts[i] = -1
+
+
+def jitter_probe(deadline, out):
+    """Slaapt met PROBE_HZ en meet hoeveel te laat hij wakker wordt (GIL/scheduler)."""
+    period = 1.0 / PROBE_HZ
+    next_t = time.perf_counter() + period
+    while next_t < deadline:
+        delay = next_t - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        out.append((time.perf_counter() - next_t) * 1e3)
+        next_t += period
+
+
+def read_metrics(host, port):
+    """/metrics als {naam{labels}: waarde}."""
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request("GET", "/metrics")
+        text = conn.getresponse().read().decode()
+    finally:
+        conn.close()
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            values[key] = float(value)
+    return values
+
+
+def percentiles(values):
+    a = np.asarray(values)
+    if a.size == 0:
+        return {"n": 0}
+    return {"n": int(a.size), "p50_ms": float(np.percentile(a, 50)),
+            "p95_ms": float(np.percentile(a, 95)), "p99_ms": float(np.percentile(a, 99)),
+            "max_ms": float(a.max())}
+
+
+def run(args, host, port):
+    rng = random.Random(args.seed)
+    sessions = [Session(host, port, random.Random(rng.random())) for _ in range(args.clients)]
+    cycles, probe = [], []
+    stream_counts = [0] * args.streams
+    before = read_metrics(host, port)
+
+    t_start = time.perf_counter()
+    deadline = t_start + args.duration
+    threads = []
+    for i, s in enumerate(sessions):
+        if i == 0 and args.homing:
+            threads.append(threading.Thread(target=operator, args=(s, args, deadline, cycles)))
+        else:
+            threads.append(threading.Thread(target=viewer, args=(s, args, deadline)))
+    for i in range(args.streams):
+        threads.append(threading.Thread(target=stream_reader,
+                                        args=(host, port, deadline, stream_counts, i)))
+    if args.probe:
+        threads.append(threading.Thread(target=jitter_probe, args=(deadline, probe)))
+
+    for t in threads:
+        t.daemon = True
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+    for s in sessions:
+        s.close()
+    after = read_metrics(host, port)
+
+    latencies, errors = {}, {}
+    for s in sessions:
+        for label, values in s.latencies.items():
+            latencies.setdefault(label, []).extend(values)
+        for label, n in s.errors.items():
+            errors[label] = errors.get(label, 0) + n
+
+    endpoints = {label: dict(percentiles(v), errors=errors.get(label, 0))
+                 for label, v in sorted(latencies.items())}
+    total = sum(len(v) for v in latencies.values())
+    polling = [x for p in POLL_PATHS for x in latencies.get(f"GET {p}", [])]
+
+    control = {out: after[name] * 1e3 for name, out in CONTROL_METRICS.items() if name in after}
+    for axis in ("x", "y"):
+        key = f'hmi_manual_commands_total{{axis="{axis}",state="superseded"}}'
+        if key in after:
+            control[f"{axis}_superseded"] = int(after[key] - before.get(key, 0.0))
+    # Safety-trips tijdens de run (normaal verkeer hoort er geen te geven)
+    trips = [k for k in after if k.startswith("hmi_safety_trips_total")]
+    if trips:
+        control["safety_trips"] = int(sum(after[k] - before.get(k, 0.0) for k in trips))
+    if probe:
+        control["probe"] = percentiles(probe)
+
+    return {
+        "clients": args.clients,
+        "streams": args.streams,
+        "duration_s": elapsed,
+        "requests": total,
+        "throughput_rps": total / elapsed,
+        "errors": sum(errors.values()),
+        "error_rate": sum(errors.values()) / max(total, 1),
+        "polling": percentiles(polling),
+        "endpoints": endpoints,
+        "stream_messages": stream_counts,
+        "homing": {"cycles": len(cycles), "success": sum(c["success"] for c in cycles),
+                   "durations_s": [round(c["duration_s"], 2) for c in cycles],
+                   "errors": sorted({c["error"] for c in cycles if c["error"]})},
+        "control": control,
+    }
+
+
+def check(report, args):
+    """Drempels voor de regressie-check; geeft de overschrijdingen terug."""
+    failures = []
+    p99 = report["polling"].get("p99_ms")
+    if p99 is not None and p99 > args.max_p99_ms:
+        failures.append(f"polling p99 {p99:.1f} ms > {args.max_p99_ms} ms")
+    if report["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.3%} > {args.max_error_rate:.3%}")
+    probe = report["control"].get("probe", {})
+    if probe.get("p99_ms") is not None and probe["p99_ms"] > args.max_jitter_ms:
+        failures.append(f"probe jitter p99 {probe['p99_ms']:.1f} ms > {args.max_jitter_ms} ms")
+    if args.homing and report["homing"]["cycles"] and not report["homing"]["success"]:
+        failures.append("geen enkele geslaagde homing-cyclus")
+    return failures
+
+
+def print_report(report):
+    print(f"\n{report['clients']} clients + {report['streams']} streams, "
+          f"{report['duration_s']:.1f} s: {report['requests']} requests, "
+          f"{report['throughput_rps']:.0f} req/s, {report['errors']} fouten")
+    print(f"\n{'endpoint':<34} {'n':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'err':>4}  (ms)")
+    rows = dict(report["endpoints"], **{"= polling totaal": dict(report["polling"], errors="")})
+    for label, s in rows.items():
+        if not s["n"]:
+            continue
+        print(f"{label:<34} {s['n']:>6} {s['p50_ms']:>7.2f} {s['p95_ms']:>7.2f} "
+              f"{s['p99_ms']:>7.2f} {s['max_ms']:>7.2f} {s['errors']:>4}")
+
+    h = report["homing"]
+    if h["cycles"]:
+        print(f"\nhoming: {h['success']}/{h['cycles']} geslaagd, duur {h['durations_s']} s"
+              + (f", fouten: {h['errors']}" if h["errors"] else ""))
+    if report["streams"]:
+        print(f"stream-berichten per verbinding: {report['stream_messages']}")
+
+    print("\ncontrol-loops:")
+    for key, value in report["control"].items():
+        if key == "probe":
+            print(f"  probe {PROBE_HZ:.0f} Hz te laat: p50 {value['p50_ms']:.2f} / "
+                  f"p99 {value['p99_ms']:.2f} / max {value['max_ms']:.2f} ms")
+        elif isinstance(value, int):
+            print(f"  {key}: {value}")
+        else:
+            print(f"  {key}: {value:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10, help="gesimuleerde browsersessies")
+    parser.add_argument("--streams", type=int, default=1, help="open /api/stream verbindingen")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconden")
+    parser.add_argument("--poll-s", type=float, default=0.2, help="poll-interval per sessie")
+    parser.add_argument("--jog-every", type=float, default=5.0, help="gem. s tussen Y-jogs per viewer (0 = uit)")
+    parser.add_argument("--y-jog-mm-s", type=float, default=6.0)
+    parser.add_argument("--x-jog-speed", type=float, default=0.6)
+    parser.add_argument("--x-jog-s", type=float, default=0.8, help="X-knop vasthouden (s)")
+    parser.add_argument("--no-homing", dest="homing", action="store_false", help="geen operator-sessie")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="tegen een draaiende HMI i.p.v. in-process (sim)")
+    parser.add_argument("--json", help="rapport als JSON wegschrijven")
+    parser.add_argument("--max-p99-ms", type=float, default=100.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-jitter-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    app = server = runtime = None
+    if args.url:
+        u = urllib.parse.urlsplit(args.url)
+        host, port = u.hostname, u.port or 80
+        args.probe = False                  # probe meet alleen in het HMI-proces iets
+        args.x_away = "backward"
+    else:
+        from core.config import get_config
+        from HMI.app import create_app
+        from HMI.server import HMIServer
+
+        app = create_app()
+        runtime = app.extensions["hmi_runtime"]
+        if not runtime.wait(10):
+            print("Hardware niet klaar:", runtime.status())
+            return 1
+        cfg = get_config()
+        server = HMIServer.from_config(app, cfg.hmi, host="127.0.0.1", port=0).start()
+        host, port = "127.0.0.1", server.port
+        args.probe = True
+        # X-jog van de homing-sensor af
+        args.x_away = "backward" if cfg.x_axis.homing.direction == "forward" else "forward"
+        time.sleep(0.2)
+
+    try:
+        report = run(args, host, port)
+    finally:
+        if server is not None:
+            server.close()
+            runtime.shutdown()
+
+    print_report(report)
+    failures = check(report, args)
+    report["failures"] = failures
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if failures:
+        print("\nFAIL:\n  " + "\n  ".join(failures))
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
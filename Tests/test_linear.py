@@ -1,14 +1,21 @@
 from time import sleep
-from core.linearaxis import LinearAxisController
+from HMI.runtime import HMIRuntime
 
 
 def main():
-    controller = LinearAxisController()
+    # Zelfde hardware-opbouw als de HMI: homing via hardware/homing2.py
+    runtime = HMIRuntime()
+    runtime.start()
+    if not runtime.wait(timeout=30.0):
+        print("Hardware niet klaar:", runtime.status())
+        runtime.shutdown()
+        return
+    controller = runtime.require("x_axis")
 
     try:
         print("Homing...")
         if not controller.home():
-            raise RuntimeError("Homing mislukt")
+            raise RuntimeError("Homing mislukt: %s" % runtime.require("homing").status()["last_result"])
 
         print("Homing OK")
 
@@ -18,12 +25,12 @@ def main():
             timeout_s=20.0,
         )
 
-        print("Goto 150 mm:", "OK" if success else "TIMEOUT")
+        print("Goto 10 mm:", "OK" if success else "TIMEOUT")
         sleep(1.0)
 
-        # Voorbeeld stations
-        # controller.move_between_station_ids(1, 3)
-        # print("Stations verplaatst")
+        # Voorbeeld stations: een transportcyclus loopt via de shuttle
+        # runtime.require("shuttle").submit(1, 3)
+        # print("Job ingediend")
 
     except Exception as e:
         print("Fout:", e)
@@ -31,6 +38,7 @@ def main():
     finally:
         controller.motor.stop(brake=True)
         print("Motor gestopt")
+        runtime.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+# Tests/unit/conftest.py
+"""
+Gedeelde fixtures voor de unit tests. Alles draait zonder hardware
+(backend "mock": gpiozero MockFactory + FakeStepBackend); databases en
+configs zijn tijdelijke bestanden.
+"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("TRANSPORT_HW_BACKEND", "mock")
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+# config.yaml en data/ worden relatief aan de projectmap gelezen
+os.chdir(ROOT)
+
+import pytest
+import yaml
+
+
+@pytest.fixture
+def raw_config():
+    """config.yaml als dict (om per test aan te passen)."""
+    with open(ROOT / "config.yaml") as f:
+        return yaml.safe_load(f)
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    """Schrijf een (aangepaste) config naar tmp_path en geef het pad terug."""
+    def write(raw, name="config.yaml"):
+        path = tmp_path / name
+        with open(path, "w") as f:
+            yaml.safe_dump(raw, f)
+        return str(path)
+    return write
+
+
+@pytest.fixture(scope="module")
+def hmi_app(tmp_path_factory):
+    """create_app() met een tijdelijke store; na de module netjes afgesloten."""
+    from core.gpio_singleton import close_gpio
+    from HMI.app import create_app
+
+    tmp = tmp_path_factory.mktemp("hmi")
+    with open(ROOT / "config.yaml") as f:
+        raw = yaml.safe_load(f)
+    raw["store"].update(path=str(tmp / "transport.db"), stations_csv=str(tmp / "stations.csv"))
+    path = tmp / "config.yaml"
+    with open(path, "w") as f:
+        yaml.safe_dump(raw, f)
+
+    close_gpio()                                  # app maakt de GPIOManager met deze config
+    app = create_app(str(path))
+    yield app
+    app.extensions["hmi_history"].close()
+    app.extensions["hmi_runtime"].shutdown()
+    app.extensions["hmi_store"].close()
@@ -0,0 +1,204 @@
+# Tests/unit/test_command_mailbox.py
+"""CommandMailbox: latest-wins, status per commando en weigeren (homing / shuttle)."""
+import threading
+import time
+
+import pytest
+
+from hardware.command_mailbox import CommandMailbox, CommandRejected
+
+
+class GatedHandler:
+    """Stub-handler: houdt de actuator-thread vast tot release(), en onthoudt de commando's."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.seen = []
+        self.entered = threading.Event()
+        self._gate = threading.Event()
+        self._gate.set()
+
+    def hold(self):
+        self._gate.clear()
+        self.entered.clear()
+
+    def release(self):
+        self._gate.set()
+
+    def __call__(self, cmd):
+        self.seen.append((cmd.axis, cmd.action, cmd.params))
+        self.entered.set()
+        self._gate.wait(2.0)
+        if self.error is not None:
+            raise self.error
+
+
+def _wait_done(mailbox, cmd_id, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while True:
+        status = mailbox.status(cmd_id)
+        if status["state"] != "pending":
+            return status
+        assert time.monotonic() < deadline, f"commando {cmd_id} blijft pending"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def mailbox():
+    mb = CommandMailbox()
+    yield mb
+    mb.close()
+
+
+def test_post_is_applied(mailbox):
+    handler = GatedHandler()
+    mailbox.register("x", handler)
+    cmd_id = mailbox.post("x", "forward", speed=0.5)
+    status = _wait_done(mailbox, cmd_id)
+    assert status["state"] == "applied" and status["latency_ms"] >= 0
+    assert handler.seen == [("x", "forward", {"speed": 0.5})]
+    assert mailbox.stats()["x"]["applied"] == 1
+
+
+def test_latest_wins_while_actuator_busy(mailbox):
+    handler = GatedHandler()
+    mailbox.register("x", handler)
+    handler.hold()
+    first = mailbox.post("x", "forward", speed=0.2)
+    assert handler.entered.wait(1.0)              # actuator zit vast in het eerste commando
+
+    second = mailbox.post("x", "forward", speed=0.4)
+    third = mailbox.post("x", "backward", speed=0.6)
+    # De eerdere aanroeper ziet direct dat zijn commando vervangen is
+    assert mailbox.status(second)["state"] == "superseded"
+    assert mailbox.status(third)["state"] == "pending"
+
+    handler.release()
+    assert _wait_done(mailbox, first)["state"] == "applied"
+    assert _wait_done(mailbox, third)["state"] == "applied"
+    assert [action for _, action, _ in handler.seen] == ["forward", "backward"]
+    stats = mailbox.stats()["x"]
+    assert (stats["posted"], stats["superseded"], stats["applied"]) == (3, 1, 2)
+
+
+def test_cancel_reports_cancelled(mailbox):
+    handler = GatedHandler()
+    mailbox.register("y", handler)
+    handler.hold()
+    mailbox.post("y", "move", steps=1)
+    assert handler.entered.wait(1.0)
+    waiting = mailbox.post("y", "move", steps=2)
+
+    assert mailbox.cancel("y") is True
+    assert mailbox.cancel("y") is False           # niets meer in het slot
+    handler.release()
+    assert mailbox.status(waiting)["state"] == "cancelled"
+    time.sleep(0.05)
+    assert len(handler.seen) == 1
+
+
+def test_oldest_axis_first(mailbox):
+    handler = GatedHandler()
+    mailbox.register("x", handler)
+    mailbox.register("y", handler)
+    handler.hold()
+    blocker = mailbox.post("x", "forward", speed=0.1)
+    assert handler.entered.wait(1.0)
+    y_id = mailbox.post("y", "move", steps=1)
+    x_id = mailbox.post("x", "stop")
+    handler.release()
+    _wait_done(mailbox, blocker)
+    _wait_done(mailbox, y_id)
+    _wait_done(mailbox, x_id)
+    assert [axis for axis, _, _ in handler.seen] == ["x", "y", "x"]
+
+
+def test_rejected_and_failed(mailbox):
+    mailbox.register("x", GatedHandler(error=CommandRejected("Homing actief")))
+    mailbox.register("y", GatedHandler(error=OSError("gpio weg")))
+    rejected = _wait_done(mailbox, mailbox.post("x", "forward", speed=0.5))
+    failed = _wait_done(mailbox, mailbox.post("y", "move", steps=1))
+    assert (rejected["state"], rejected["error"]) == ("rejected", "Homing actief")
+    assert (failed["state"], failed["error"]) == ("failed", "gpio weg")
+    assert mailbox.stats()["x"]["rejected"] == 1 and mailbox.stats()["y"]["failed"] == 1
+
+
+def test_unknown_axis_and_closed():
+    mb = CommandMailbox()
+    mb.register("x", GatedHandler())
+    with pytest.raises(ValueError):
+        mb.post("z", "forward")
+    mb.close()
+    with pytest.raises(RuntimeError):
+        mb.post("x", "forward")
+
+
+def test_close_cancels_pending():
+    mb = CommandMailbox()
+    handler = GatedHandler()
+    mb.register("x", handler)
+    handler.hold()
+    mb.post("x", "forward", speed=0.1)
+    assert handler.entered.wait(1.0)
+    waiting = mb.post("x", "forward", speed=0.2)
+    threading.Timer(0.05, handler.release).start()
+    mb.close()
+    assert mb.status(waiting)["state"] == "cancelled"
+
+
+# ---------- handlers van de HMI-runtime ----------
+class BusyShuttle:
+    busy = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def runtime(tmp_path_factory):
+    import yaml
+
+    from core.gpio_singleton import close_gpio
+    from HMI.runtime import HMIRuntime
+
+    tmp = tmp_path_factory.mktemp("runtime")
+    with open("config.yaml") as f:
+        raw = yaml.safe_load(f)
+    raw["hardware"]["backend"] = "sim"
+    raw["store"]["path"] = str(tmp / "transport.db")
+    path = tmp / "config.yaml"
+    with open(path, "w") as f:
+        yaml.safe_dump(raw, f)
+
+    close_gpio()                                  # runtime maakt de GPIOManager met deze config
+    rt = HMIRuntime(str(path))
+    rt.backend = "sim"
+    rt.start()
+    assert rt.wait(timeout=20.0), rt.status()
+    yield rt
+    rt.shutdown()
+
+
+def test_runtime_rejects_jog_while_homing(runtime, monkeypatch):
+    homing = runtime.get("homing")
+    monkeypatch.setattr(homing, "status", lambda: {"running": True})
+    cancelled = []
+    monkeypatch.setattr(homing, "cancel", lambda: cancelled.append(True) or True)
+
+    status = _wait_done(runtime.mailbox, runtime.mailbox.post("x", "forward", speed=0.5))
+    assert (status["state"], status["error"]) == ("rejected", "Homing actief")
+    assert runtime.get("motor").duty() == 0.0
+
+    # Stop mag altijd, en breekt de homing af
+    status = _wait_done(runtime.mailbox, runtime.mailbox.post("x", "stop"))
+    assert status["state"] == "applied" and cancelled
+
+
+def test_runtime_rejects_manual_while_shuttle_busy(runtime, monkeypatch):
+    monkeypatch.setitem(runtime._objects, "shuttle", BusyShuttle())
+    x = _wait_done(runtime.mailbox, runtime.mailbox.post("x", "backward", speed=0.5))
+    y = _wait_done(runtime.mailbox, runtime.mailbox.post("y", "move", direction="forward",
+                                                         steps=100, delay_s=0.001))
+    assert (x["state"], x["error"]) == ("rejected", "Shuttle-cyclus actief")
+    assert (y["state"], y["error"]) == ("rejected", "Shuttle-cyclus actief")
+    assert not runtime.get("stepper").is_moving
@@ -0,0 +1,177 @@
+# Tests/unit/test_config.py
+"""core/config.py: validatie, pin-controle en hot reload (alleen TUNABLE)."""
+import dataclasses
+
+import pytest
+import yaml
+
+from core.config import (ConfigError, ConfigRestartRequired, ConfigStore, is_tunable, load_config,
+                         parse_config)
+
+
+def test_repo_config_is_valid():
+    cfg = load_config("config.yaml")
+    assert cfg.gpio["sensor_1"].type == "button"
+    assert cfg.steppers["y_axis"].dir_pin == 6
+
+
+def test_unreadable_or_broken_yaml_is_config_error(tmp_path):
+    with pytest.raises(ConfigError, match="niet te lezen"):
+        load_config(str(tmp_path / "bestaat_niet.yaml"))
+    broken = tmp_path / "kapot.yaml"
+    broken.write_text("hmi:\n  port: [5000\n", encoding="utf-8")
+    with pytest.raises(ConfigError, match="ongeldige YAML"):
+        load_config(str(broken))
+
+
+def test_config_is_frozen(raw_config):
+    cfg = parse_config(raw_config)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cfg.x_axis.homing.speed = 1.0
+
+
+@pytest.mark.parametrize("edit, where", [
+    (lambda r: r["steppers"]["y_axis"].update(dir_pin="zes"), "steppers.y_axis.dir_pin"),
+    (lambda r: r["gpio"]["status_led"].update(pin=40), "gpio.status_led.pin"),
+    (lambda r: r["gpio"]["status_led"].update(type="lamp"), "gpio.status_led.type"),
+    (lambda r: r["shuttle"].update(x_speed=1.5), "shuttle.x_speed"),
+    (lambda r: r["x_axis"]["homing"].update(speed=0), "x_axis.homing.speed"),
+    (lambda r: r["hardware"].update(backend="arduino"), "hardware.backend"),
+    (lambda r: r["steppers"]["y_axis"].pop("step_pin"), "steppers.y_axis.step_pin"),
+])
+def test_validation_error_names_the_key(raw_config, edit, where):
+    edit(raw_config)
+    with pytest.raises(ConfigError, match=f"^{where}:"):
+        parse_config(raw_config)
+
+
+def test_unknown_section_and_key(raw_config):
+    raw_config["hmi"]["telemtry_hz"] = 10
+    with pytest.raises(ConfigError, match="onbekende sleutel"):
+        parse_config(raw_config)
+    del raw_config["hmi"]["telemtry_hz"]
+    raw_config["servo"] = {}
+    with pytest.raises(ConfigError, match="onbekende sectie"):
+        parse_config(raw_config)
+
+
+def test_pin_conflict_between_gpio_and_stepper(raw_config):
+    raw_config["steppers"]["y_axis"]["ena_pin"] = raw_config["gpio"]["motor_ren"]["pin"]
+    with pytest.raises(ConfigError, match="steppers.y_axis.ena_pin: GPIO 23 wordt ook gebruikt"):
+        parse_config(raw_config)
+
+
+def test_pin_conflict_within_gpio(raw_config):
+    raw_config["gpio"]["status_led"]["pin"] = raw_config["gpio"]["sensor_1"]["pin"]
+    with pytest.raises(ConfigError, match="wordt ook gebruikt door gpio.status_led.pin"):
+        parse_config(raw_config)
+
+
+def test_sensor_references_must_be_inputs(raw_config):
+    raw_config["x_axis"]["homing"]["sensor"] = "status_led"
+    with pytest.raises(ConfigError, match="^x_axis.homing.sensor:"):
+        parse_config(raw_config)
+    raw_config["x_axis"]["homing"]["sensor"] = "sensor_1"
+    raw_config["shuttle"]["grip_sensor"] = "bestaat_niet"
+    with pytest.raises(ConfigError, match="^shuttle.grip_sensor:"):
+        parse_config(raw_config)
+
+
+def test_is_tunable():
+    assert is_tunable("steppers.y_axis.max_speed_mm_s")
+    assert is_tunable("x_axis.homing.speed")
+    assert not is_tunable("steppers.y_axis.step_pin")
+    assert not is_tunable("hardware_backend")
+
+
+# ---------- hot reload ----------
+@pytest.fixture
+def config_store(raw_config, write_config):
+    path = write_config(raw_config)
+    return path, ConfigStore(path)
+
+
+def test_reload_applies_tunable_change(raw_config, write_config, config_store):
+    path, store = config_store
+    seen = []
+    store.subscribe(seen.append)
+
+    raw_config["steppers"]["y_axis"]["max_speed_mm_s"] = 12.5
+    raw_config["x_axis"]["homing"]["speed"] = 0.6
+    write_config(raw_config)
+    result = store.reload()
+
+    assert result["version"] == 2
+    assert result["changed"]["steppers.y_axis.max_speed_mm_s"][1] == 12.5
+    assert store.current.x_axis.homing.speed == 0.6
+    assert seen == [store.current]
+
+
+def test_reload_without_changes(config_store):
+    _, store = config_store
+    assert store.reload() == {"version": 1, "changed": {}}
+
+
+def test_reload_rejects_non_tunable_change(raw_config, write_config, config_store):
+    _, store = config_store
+    before = store.current
+    seen = []
+    store.subscribe(seen.append)
+
+    raw_config["steppers"]["y_axis"]["max_speed_mm_s"] = 12.5     # wel tunable
+    raw_config["steppers"]["y_axis"]["step_pin"] = 16              # niet tunable
+    write_config(raw_config)
+    with pytest.raises(ConfigRestartRequired, match="herstart nodig voor: steppers.y_axis.step_pin"):
+        store.reload()
+
+    assert store.current is before
+    assert seen == []
+
+
+def test_reload_rejects_invalid_file(raw_config, write_config, config_store):
+    _, store = config_store
+    before = store.current
+    raw_config["shuttle"]["x_speed"] = 2.0
+    write_config(raw_config)
+    with pytest.raises(ConfigError):
+        store.reload()
+    assert store.current is before
+
+
+def test_reload_invalid_is_not_restart(raw_config, write_config, config_store):
+    _, store = config_store
+    raw_config["shuttle"]["x_speed"] = 2.0
+    write_config(raw_config)
+    with pytest.raises(ConfigError) as info:
+        store.reload()
+    assert not isinstance(info.value, ConfigRestartRequired)
+
+
+# ---------- /api/config/reload ----------
+def test_reload_endpoint_status_codes(hmi_app):
+    client = hmi_app.test_client()
+    path = hmi_app.extensions["hmi_runtime"].config_store.path
+    with open(path) as f:
+        original = f.read()
+    raw = yaml.safe_load(original)
+    try:
+        with open(path, "w") as f:
+            f.write("hmi: [kapot\n")
+        resp = client.post("/api/config/reload")
+        assert resp.status_code == 400 and "ongeldige YAML" in resp.get_json()["error"]
+
+        raw["shuttle"]["x_speed"] = 2.0
+        with open(path, "w") as f:
+            yaml.safe_dump(raw, f)
+        assert client.post("/api/config/reload").status_code == 400
+
+        raw["shuttle"]["x_speed"] = 0.5
+        raw["steppers"]["y_axis"]["step_pin"] = 16
+        with open(path, "w") as f:
+            yaml.safe_dump(raw, f)
+        resp = client.post("/api/config/reload")
+        assert resp.status_code == 409 and "herstart nodig" in resp.get_json()["error"]
+    finally:
+        with open(path, "w") as f:
+            f.write(original)
+    assert client.post("/api/config/reload").status_code == 200
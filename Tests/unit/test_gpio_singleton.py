@@ -0,0 +1,46 @@
+# Tests/unit/test_gpio_singleton.py
+"""Gedeelde GPIOManager: config-pad wordt vastgelegd en een ander pad geweigerd."""
+import os
+
+import pytest
+
+from core.gpio_singleton import close_gpio, get_gpio, gpio, gpio_config_path
+
+
+@pytest.fixture(autouse=True)
+def fresh_gpio():
+    close_gpio()
+    yield
+    close_gpio()
+
+
+def test_path_is_recorded_and_reused(raw_config, write_config):
+    path = write_config(raw_config, "eigen.yaml")
+    manager = get_gpio(path)
+    assert gpio_config_path() == os.path.abspath(path)
+
+    assert get_gpio() is manager                       # zonder pad: bestaande config
+    assert get_gpio(os.path.relpath(path)) is manager  # zelfde bestand, andere schrijfwijze
+    assert gpio.shutdown.__self__ is manager           # proxy volgt dezelfde manager
+
+
+def test_other_path_is_refused(raw_config, write_config):
+    path = write_config(raw_config, "eigen.yaml")
+    get_gpio(path)
+    with pytest.raises(ValueError, match="al gemaakt met"):
+        get_gpio("config.yaml")
+    assert gpio_config_path() == os.path.abspath(path)
+
+
+def test_proxy_defaults_to_config_yaml():
+    assert gpio_config_path() is None
+    gpio.shutdown                                      # eerste gebruik maakt de manager
+    assert gpio_config_path() == os.path.abspath("config.yaml")
+
+
+def test_close_allows_new_path(raw_config, write_config):
+    first = get_gpio("config.yaml")
+    close_gpio()
+    assert gpio_config_path() is None
+    second = get_gpio(write_config(raw_config, "eigen.yaml"))
+    assert second is not first
@@ -0,0 +1,87 @@
+# Tests/unit/test_linearaxis.py
+"""LinearAxisController: homing loopt via de HomingController (hardware/homing2.py)."""
+import threading
+
+import pytest
+
+from core.linearaxis import LinearAxisController
+
+
+class FakeMotor:
+    def __init__(self):
+        self.calls = []
+
+    def forward(self, speed):
+        self.calls.append(("forward", speed))
+
+    def backward(self, speed):
+        self.calls.append(("backward", speed))
+
+    def stop(self, brake=False):
+        self.calls.append(("stop", brake))
+
+
+class FakeHoming:
+    """HomingController-achtig: start() draait een run die `result` oplevert na release()."""
+
+    def __init__(self, result=None):
+        self.result = result if result is not None else {"success": True, "error": None}
+        self.release = threading.Event()
+        self.starts = 0
+        self.cancelled = 0
+        self._running = False
+        self._last = None
+
+    def start(self):
+        if self._running:
+            return False
+        self.starts += 1
+        self._running = True
+        threading.Thread(target=self._run, daemon=True).start()
+        return True
+
+    def _run(self):
+        self.release.wait(2.0)
+        self._last, self._running = self.result, False
+
+    def cancel(self):
+        self.cancelled += 1
+        self._last = {"success": False, "error": "Homing cancelled by user"}
+        self.release.set()
+        return True
+
+    def status(self):
+        return {"running": self._running, "last_result": self._last}
+
+
+def _axis(homing):
+    return LinearAxisController(motor=FakeMotor(), encoder=object(), homing=homing)
+
+
+def test_home_waits_for_homing_controller():
+    homing = FakeHoming()
+    threading.Timer(0.05, homing.release.set).start()
+    assert _axis(homing).home(poll_s=0.005) is True
+    assert homing.starts == 1
+
+
+def test_home_reports_failure():
+    homing = FakeHoming(result={"success": False, "error": "Homing timeout after 10s (approach)"})
+    homing.release.set()
+    assert _axis(homing).home(poll_s=0.005) is False
+
+
+def test_home_timeout_cancels():
+    homing = FakeHoming()
+    assert _axis(homing).home(timeout_s=0.05, poll_s=0.005) is False
+    assert homing.cancelled == 1 and not homing.status()["running"]
+
+
+def test_home_without_controller_or_while_running():
+    with pytest.raises(RuntimeError, match="Geen HomingController"):
+        _axis(None).home()
+    homing = FakeHoming()
+    homing.start()
+    with pytest.raises(RuntimeError, match="loopt al"):
+        _axis(homing).home()
+    homing.release.set()
@@ -0,0 +1,51 @@
+# Tests/unit/test_pulse_engine.py
+"""Step-backends: abstracte interface en pinniveaus volgens signals_active_low."""
+import dataclasses
+
+import pytest
+
+from core.config import parse_config
+from hardware.pulse_engine import FakeStepBackend, StepBackend, make_step_backend
+
+
+def _levels(backend):
+    backend.set_enable(True)
+    backend.set_direction(True)
+    backend.step_high()
+    backend.step_low()
+    backend.set_direction(False)
+    backend.set_enable(False)
+    return [(name, level) for _, name, level in backend.events]
+
+
+def test_step_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StepBackend()
+
+    class Partial(StepBackend):
+        def set_enable(self, on):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_active_low_keeps_existing_levels():
+    assert _levels(FakeStepBackend()) == [
+        ("ena", 1), ("dir", 0), ("pul", 1), ("pul", 0), ("dir", 1), ("ena", 0)]
+
+
+def test_active_high_inverts_every_pin():
+    backend = FakeStepBackend(active_low=False)
+    assert _levels(backend) == [
+        ("ena", 0), ("dir", 1), ("pul", 0), ("pul", 1), ("dir", 0), ("ena", 1)]
+    assert len(backend.step_times()) == 1
+
+
+@pytest.mark.parametrize("active_low", [True, False])
+def test_make_step_backend_passes_signals_active_low(raw_config, active_low):
+    cfg = next(iter(parse_config(raw_config).steppers.values()))
+    backend = make_step_backend(dataclasses.replace(cfg, signals_active_low=active_low))
+    assert isinstance(backend, FakeStepBackend)
+    backend.step_high()
+    assert backend.events[-1][1:] == ("pul", 1 if active_low else 0)
@@ -0,0 +1,266 @@
+# Tests/unit/test_safety.py
+"""SafetySupervisor: elke trip-reden via tick() met nep-motor/reader/stepper."""
+import time
+
+import pytest
+
+from hardware.encoder_state import EncoderState
+from hardware.safety import SafetySupervisor
+
+
+class FakeMotor:
+    """TransportMotor-achtig: alleen duty() en stop()."""
+
+    def __init__(self, duty=0.0):
+        self._duty = duty
+        self.stops = []
+
+    def duty(self):
+        return self._duty
+
+    def stop(self, brake=False):
+        self.stops.append({"brake": brake})
+        self._duty = 0.0
+
+
+class FakeRampedMotor(FakeMotor):
+    """RampedMotor-achtig: ramp-doel via state(), stop met immediate."""
+
+    def __init__(self, duty=0.0, target=0.0):
+        super().__init__(duty)
+        self.target = target
+
+    def state(self):
+        return {"target": self.target, "duty": self._duty}
+
+    def stop(self, brake=False, immediate=False):
+        self.stops.append({"brake": brake, "immediate": immediate})
+        self._duty = self.target = 0.0
+
+
+class FakeReader:
+    def __init__(self, angle=10.0, ok=True, age_s=0.0):
+        self.angle, self.ok, self.age_s = angle, ok, age_s
+
+    def get_latest(self):
+        return {"ok": self.ok, "angle_deg": self.angle if self.ok else None,
+                "ts": time.time() - self.age_s, "error": None if self.ok else "No data"}
+
+
+class FakeStepper:
+    def __init__(self, position_mm=0.0, moving=False, min_mm=-150.0, max_mm=150.0):
+        self.position_mm, self.is_moving = position_mm, moving
+        self.min_mm, self.max_mm = min_mm, max_mm
+        self.stops = []
+
+    def stop(self, immediate=False):
+        self.stops.append(immediate)
+        self.is_moving = False
+
+
+class FakeHoming:
+    def __init__(self, running=False):
+        self.running = running
+        self.cancelled = 0
+
+    def status(self):
+        return {"running": self.running}
+
+    def cancel(self):
+        self.cancelled += 1
+        self.running = False
+        return True
+
+
+def _supervisor(motor, reader=None, stepper=None, homing=None, encoder_state=None, **kwargs):
+    es = encoder_state or EncoderState(mm_per_rev=90.0, direction_sign=+1)
+    kwargs.setdefault("max_sample_age_s", 0.25)
+    return SafetySupervisor(motor, reader or FakeReader(), es, stepper or FakeStepper(), homing,
+                            **kwargs)
+
+
+def _assert_tripped(sup, motor, stepper, reason):
+    assert motor.stops, "motor niet gestopt"
+    assert motor.stops[-1]["brake"] is True
+    assert stepper.stops == [True]
+    trip = sup.trips()[-1]
+    assert trip["reason"] == reason
+    assert trip["reaction_ms"] >= trip["stop_ms"] >= 0.0
+    stats = sup.stats()
+    assert stats["trips"][reason] == 1
+    assert stats["reaction_max_ms"] == trip["reaction_ms"]
+    assert sup.trip_count() == 1
+    return trip
+
+
+def test_stale_sample_trips():
+    motor, stepper = FakeMotor(0.5), FakeStepper()
+    sup = _supervisor(motor, FakeReader(age_s=0.5), stepper)
+
+    reason, _, _ = sup.tick()
+
+    assert reason == "stale"
+    trip = _assert_tripped(sup, motor, stepper, "stale")
+    # Conditie begon ~0.25 s geleden (leeftijd - max_sample_age_s)
+    assert trip["detect_ms"] == pytest.approx(250.0, abs=50.0)
+
+
+def test_reader_error_trips_as_stale():
+    motor, stepper = FakeMotor(0.5), FakeStepper()
+    sup = _supervisor(motor, FakeReader(ok=False), stepper)
+    assert sup.tick()[0] == "stale"
+    trip = _assert_tripped(sup, motor, stepper, "stale")
+    # Begin onbekend: één periode als bovengrens
+    assert trip["detect_ms"] is None
+    assert trip["reaction_ms"] >= sup.period_s * 1e3
+
+
+def test_stale_sample_ignored_without_duty():
+    motor, stepper = FakeMotor(0.0), FakeStepper()
+    sup = _supervisor(motor, FakeReader(age_s=5.0), stepper)
+    assert sup.tick() is None
+    assert motor.stops == [] and sup.trip_count() == 0
+
+
+def test_limit_trips_only_outward():
+    es = EncoderState(mm_per_rev=90.0, direction_sign=+1)
+    es.set_home_offset(100.0)
+    reader = FakeReader(angle=20.0)               # -80° = -20 mm: voorbij x_min_mm
+
+    # backward rijdt van home af (toward_home=forward): geen trip
+    motor, stepper = FakeMotor(-0.5), FakeStepper()
+    sup = _supervisor(motor, reader, stepper, encoder_state=es, x_min_mm=-10.0,
+                      toward_home="forward")
+    assert sup.tick() is None
+
+    motor._duty = 0.5
+    assert sup.tick()[0] == "limit"
+    _assert_tripped(sup, motor, stepper, "limit")
+
+
+def test_limit_ignored_while_homing():
+    es = EncoderState(mm_per_rev=90.0, direction_sign=+1)
+    es.set_home_offset(100.0)
+    motor, homing = FakeMotor(0.5), FakeHoming(running=True)
+    sup = _supervisor(motor, FakeReader(angle=20.0), homing=homing, encoder_state=es,
+                      x_min_mm=-10.0)
+    assert sup.tick() is None
+
+
+def test_stall_trips_after_stall_s():
+    motor, stepper, homing = FakeMotor(0.5), FakeStepper(), FakeHoming()
+    sup = _supervisor(motor, FakeReader(angle=10.0), stepper, homing=homing, stall_s=0.02)
+
+    assert sup.tick() is None                     # venster start
+    time.sleep(0.04)
+    assert sup.tick()[0] == "stall"
+    trip = _assert_tripped(sup, motor, stepper, "stall")
+    assert homing.cancelled == 1
+    assert trip["detect_ms"] is not None
+
+
+def test_stall_window_resets_on_motion():
+    motor, reader = FakeMotor(0.5), FakeReader(angle=10.0)
+    sup = _supervisor(motor, reader, stall_s=0.02, stall_min_mm=1.0)
+    sup.tick()
+    time.sleep(0.03)
+    reader.angle = 20.0                           # 2.5 mm bewogen
+    assert sup.tick() is None
+
+
+def test_stall_uses_applied_duty_during_ramp():
+    """Ramp-doel hoog maar nog (bijna) geen duty toegepast: geen stall."""
+    motor, stepper = FakeRampedMotor(duty=0.05, target=1.0), FakeStepper()
+    sup = _supervisor(motor, FakeReader(angle=10.0), stepper, stall_s=0.02)
+    sup.tick()
+    time.sleep(0.04)
+    assert sup.tick() is None
+
+    motor._duty = 0.5                             # nu wel vermogen, nog steeds geen beweging
+    sup.tick()
+    time.sleep(0.04)
+    assert sup.tick()[0] == "stall"
+    assert motor.stops[-1] == {"brake": True, "immediate": True}
+
+
+def test_watchdog_trips_without_keepalive():
+    motor, stepper = FakeMotor(0.5), FakeStepper()
+    sup = _supervisor(motor, stepper=stepper, command_timeout_s=0.02)
+
+    sup.manual("forward")
+    assert sup.tick() is None
+    time.sleep(0.04)
+    assert sup.tick()[0] == "watchdog"
+    trip = _assert_tripped(sup, motor, stepper, "watchdog")
+    assert trip["detect_ms"] == pytest.approx(20.0, abs=30.0)
+
+
+def test_watchdog_keepalive_and_stop():
+    motor = FakeMotor(0.5)
+    sup = _supervisor(motor, command_timeout_s=0.05)
+    for _ in range(4):
+        sup.manual("forward")
+        time.sleep(0.02)
+        assert sup.tick() is None
+    sup.manual("stop")
+    time.sleep(0.06)
+    assert sup.tick() is None
+
+
+def test_watchdog_released_by_homing():
+    motor, homing = FakeMotor(0.5), FakeHoming(running=True)
+    sup = _supervisor(motor, homing=homing, command_timeout_s=0.01)
+    sup.manual("backward")
+    time.sleep(0.03)
+    assert sup.tick() is None
+
+
+def test_y_limit_trips_without_x_duty():
+    motor, stepper = FakeMotor(0.0), FakeStepper(position_mm=153.0, moving=True)
+    sup = _supervisor(motor, stepper=stepper, y_margin_mm=2.0)
+    assert sup.tick()[0] == "y_limit"
+    _assert_tripped(sup, motor, stepper, "y_limit")
+
+
+def test_y_within_margin_ok():
+    stepper = FakeStepper(position_mm=151.0, moving=True)
+    sup = _supervisor(FakeMotor(0.0), stepper=stepper, y_margin_mm=2.0)
+    assert sup.tick() is None
+
+
+def test_stop_all_survives_motor_error():
+    class BrokenMotor(FakeMotor):
+        def stop(self, brake=False):
+            raise RuntimeError("gpio weg")
+
+    stepper = FakeStepper()
+    sup = _supervisor(BrokenMotor(0.5), FakeReader(ok=False), stepper)
+    assert sup.tick()[0] == "stale"
+    assert stepper.stops == [True]
+    assert sup.trip_count() == 1
+
+
+def test_reaction_bound_covers_measured_reaction():
+    motor, stepper = FakeMotor(0.5), FakeStepper()
+    sup = _supervisor(motor, FakeReader(ok=False), stepper)
+    sup.tick()
+    stats = sup.stats()
+    assert stats["stop_max_ms"] <= stats["reaction_bound_ms"]
+    assert stats["period_ms"] == pytest.approx(5.0)
+
+
+def test_transport_motor_duty_on_mock_gpio():
+    """Supervisor leest de duty via de publieke accessor, ook zonder ramp."""
+    from hardware.motor_controller import TransportMotor
+
+    motor = TransportMotor()
+    try:
+        motor.backward(0.4)
+        sup = _supervisor(motor)
+        assert sup._duty() == (-0.4, -0.4)
+        motor.forward(0.7)
+        assert motor.duty() == 0.7
+        motor.stop(brake=True)
+        assert motor.duty() == 0.0
+    finally:
+        motor.coast()
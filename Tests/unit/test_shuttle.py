@@ -0,0 +1,46 @@
+# Tests/unit/test_shuttle.py
+"""Shuttle: hot reload van shuttle.stats_jobs past het statistiekvenster aan."""
+import dataclasses
+import time
+
+import pytest
+
+from core.config import parse_config
+from core.shuttle import PHASES, Shuttle, ShuttleJob
+
+
+@pytest.fixture
+def shuttle(raw_config):
+    cfg = dataclasses.replace(parse_config(raw_config).shuttle, stats_jobs=5)
+    return Shuttle(x_axis=None, stepper=None, cfg=cfg)
+
+
+def _done(shuttle, job_id, cycle_s):
+    # _finish zet finished op nu: start zo kiezen dat de cyclus cycle_s duurt
+    job = ShuttleJob(id=job_id, pickup=1, dropoff=2, started=time.time() - cycle_s)
+    job.phases = {name: cycle_s / len(PHASES) for name in PHASES}
+    shuttle._finish(job, "done", None)
+
+
+def test_stats_jobs_reload_resizes_window(shuttle):
+    for i in range(5):
+        _done(shuttle, i, 10.0 + i)
+    assert shuttle.stats()["cycle"]["n"] == 5
+
+    shuttle.apply_tuning(dataclasses.replace(shuttle.cfg, stats_jobs=3))
+    stats = shuttle.stats()
+    assert stats["cycle"]["n"] == 3
+    assert stats["cycle"]["max_s"] == 14.0 and stats["cycle"]["mean_s"] == 13.0   # laatste 3
+    assert all(p["n"] == 3 for p in stats["phases"].values())
+
+    shuttle.apply_tuning(dataclasses.replace(shuttle.cfg, stats_jobs=8))
+    for i in range(4):
+        _done(shuttle, 10 + i, 20.0)
+    assert shuttle.stats()["cycle"]["n"] == 7
+
+
+def test_other_tuning_keeps_samples(shuttle):
+    _done(shuttle, 1, 12.0)
+    shuttle.apply_tuning(dataclasses.replace(shuttle.cfg, x_speed=0.3))
+    assert shuttle.cfg.x_speed == 0.3
+    assert shuttle.stats()["cycle"]["n"] == 1
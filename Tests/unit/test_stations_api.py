@@ -0,0 +1,94 @@
+# Tests/unit/test_stations_api.py
+"""/api/stations via de Flask test client: bulk in één transactie, versie en ETag."""
+import pytest
+
+from core.store import TransportStore
+
+ROWS = [
+    {"id": 1, "naam": "Invoer", "positie": 50, "richting": "L"},
+    {"id": 2, "naam": "Buffer", "positie": 200, "richting": "R"},
+    {"id": 3, "naam": "Uitvoer", "positie": 350, "richting": "R"},
+]
+
+
+@pytest.fixture
+def client(hmi_app, tmp_path, monkeypatch):
+    # Elke test een eigen, lege store
+    store = TransportStore(str(tmp_path / "transport.db"))
+    monkeypatch.setitem(hmi_app.extensions, "hmi_store", store)
+    yield hmi_app.test_client()
+    store.close()
+
+
+def _stations(client):
+    resp = client.get("/api/stations")
+    assert resp.status_code == 200
+    return {st["id"]: st for st in resp.get_json()["stations"]}, resp.get_json()["version"]
+
+
+def test_bulk_writes_all_rows_once(client):
+    resp = client.post("/api/stations/bulk", json={"stations": ROWS})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"success": True, "version": 1, "count": 3}
+    stations, version = _stations(client)
+    assert sorted(stations) == [1, 2, 3] and version == 1
+
+
+def test_invalid_row_rejects_whole_batch(client):
+    client.post("/api/stations/bulk", json={"stations": ROWS[:1]})
+    rows = [dict(ROWS[1]), dict(ROWS[2], positie="ver")]
+    resp = client.post("/api/stations/bulk", json={"stations": rows})
+    assert resp.status_code == 400
+    body = resp.get_json()
+    assert body["success"] is False
+    assert any(err.startswith("stations[1].positie") for err in body["errors"])
+
+    stations, version = _stations(client)
+    assert list(stations) == [1] and version == 1     # geldige rij ook niet geschreven
+
+
+@pytest.mark.parametrize("rows, fragment", [
+    ([ROWS[0], dict(ROWS[1], id=1)], "komt dubbel voor"),
+    ([ROWS[0], dict(ROWS[1], positie=60)], "uit elkaar"),
+    ([dict(ROWS[0], positie=-5)], "< min_mm"),
+])
+def test_batch_rules_reject_everything(client, rows, fragment):
+    resp = client.post("/api/stations/bulk", json={"stations": rows})
+    assert resp.status_code == 400
+    assert any(fragment in err for err in resp.get_json()["errors"])
+    assert _stations(client) == ({}, 0)
+
+
+def test_bulk_rejects_wrong_shape(client):
+    assert client.post("/api/stations/bulk", json={"rijen": ROWS}).status_code == 400
+
+
+def test_replace_and_list_body(client):
+    client.post("/api/stations/bulk", json=ROWS)
+    resp = client.post("/api/stations/bulk", json={"stations": [ROWS[2]], "replace": True})
+    assert resp.get_json()["version"] == 2
+    stations, _ = _stations(client)
+    assert list(stations) == [3]
+
+
+def test_version_and_etag_follow_upsert_and_delete(client):
+    first = client.get("/api/stations")
+    etag0 = first.headers["ETag"]
+    assert client.get("/api/stations", headers={"If-None-Match": etag0}).status_code == 304
+
+    resp = client.put("/api/stations/4", json={"naam": "Extra", "positie": 500, "richting": "L"})
+    assert resp.status_code == 200 and resp.get_json()["version"] == 1
+    after_put = client.get("/api/stations", headers={"If-None-Match": etag0})
+    assert after_put.status_code == 200
+    etag1 = after_put.headers["ETag"]
+    assert etag1 != etag0
+
+    resp = client.delete("/api/stations/4")
+    assert resp.status_code == 200 and resp.get_json()["version"] == 2
+    after_delete = client.get("/api/stations", headers={"If-None-Match": etag1})
+    assert after_delete.status_code == 200
+    assert after_delete.headers["ETag"] not in (etag0, etag1)
+    assert after_delete.get_json()["stations"] == []
+
+    assert client.delete("/api/stations/4").status_code == 404
+    assert _stations(client)[1] == 2                 # mislukte delete verhoogt niets
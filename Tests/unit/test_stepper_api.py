@@ -0,0 +1,50 @@
+# Tests/unit/test_stepper_api.py
+"""/api/manual/stepper/*: ongeldige invoer geeft 400, geen 500."""
+import time
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client(hmi_app):
+    runtime = hmi_app.extensions["hmi_runtime"]
+    deadline = time.monotonic() + 20.0
+    while runtime.get("stepper") is None:
+        assert time.monotonic() < deadline, runtime.status()
+        time.sleep(0.05)
+    return hmi_app.test_client()
+
+
+@pytest.mark.parametrize("body", [
+    {"position_mm": 10.0, "delay": "snel"},
+    {"position_mm": 10.0, "delay": None},
+    {"position_mm": "ver"},
+    {"position_mm": "inf"},
+    {"position_mm": [1]},
+    {},
+    [10.0],
+])
+def test_move_to_rejects_bad_input(client, body):
+    resp = client.post("/api/manual/stepper/move_to", json=body)
+    assert resp.status_code == 400
+    assert resp.get_json()["success"] is False
+
+
+def test_move_to_accepts_valid_input(client):
+    resp = client.post("/api/manual/stepper/move_to", json={"position_mm": 1.0, "delay": 0.001})
+    assert resp.status_code == 200 and resp.get_json()["target_mm"] == 1.0
+    client.post("/api/manual/stepper/stop")
+
+
+@pytest.mark.parametrize("body", [{"position_mm": "nul"}, {"position_mm": None},
+                                  {"position_mm": "nan"}, [0.0]])
+def test_zero_rejects_bad_input(client, body):
+    resp = client.post("/api/manual/stepper/zero", json=body)
+    assert resp.status_code == 400
+
+
+def test_zero_sets_position(client):
+    client.post("/api/manual/stepper/stop")
+    resp = client.post("/api/manual/stepper/zero", json={"position_mm": 12.5})
+    assert resp.status_code == 200 and resp.get_json()["position_mm"] == 12.5
+    assert client.post("/api/manual/stepper/zero").get_json()["position_mm"] == 0.0
@@ -0,0 +1,167 @@
+# Tests/unit/test_stepper_scheduler.py
+"""CommandScheduler (voorrang, preempt, merge) en TB6600Stepper op de FakeStepBackend."""
+import time
+
+import pytest
+
+from hardware.pulse_engine import FakeStepBackend
+from hardware.stepper_motor import TB6600Stepper
+from hardware.stepper_scheduler import CommandScheduler, StepperCommand
+
+STEPS_PER_MM = 100.0
+
+
+def _move(forward=True, steps=100, rate=1000.0):
+    return StepperCommand(kind="move", forward=forward, steps=steps, rate=rate)
+
+
+# ---------- scheduler ----------
+def test_same_direction_moves_merge():
+    sched = CommandScheduler()
+    sched.submit(_move(steps=100, rate=500.0))
+    sched.submit(_move(steps=50, rate=800.0))
+    assert sched.depth() == 1
+    cmd = sched.get()
+    assert (cmd.steps, cmd.rate) == (150, 800.0)
+    assert sched.metrics()["merged"] == 1
+
+
+def test_opposite_direction_moves_do_not_merge():
+    sched = CommandScheduler()
+    sched.submit(_move(forward=True))
+    sched.submit(_move(forward=False))
+    assert sched.depth() == 2
+
+
+def test_move_to_flushes_pending_moves_but_keeps_home():
+    sched = CommandScheduler()
+    sched.submit(StepperCommand(kind="home", sensor=lambda: True))
+    sched.submit(_move())
+    sched.submit(StepperCommand(kind="move_to", target=500))
+    assert [c.kind for c in (sched.get(), sched.get())] == ["home", "move_to"]
+    assert sched.metrics()["flushed"] == 1
+
+
+def test_stop_has_priority_and_flushes():
+    sched = CommandScheduler()
+    sched.submit(_move())
+    sched.submit(StepperCommand(kind="move_to", target=10))
+    flushed = sched.stop()
+    assert len(flushed) == 1
+    assert sched.get() == "stop"
+    assert sched.depth() == 0 and not sched.stop_event.is_set()
+
+
+def test_take_preempt_during_motion():
+    sched = CommandScheduler()
+    sched.submit(_move(forward=False))
+    assert sched.take_preempt(forward=True) is None          # andere richting: wacht
+    assert sched.take_preempt(forward=False).kind == "move"  # zelfde richting: erbij
+    sched.submit(StepperCommand(kind="move_to", target=0))
+    assert sched.take_preempt(forward=True).kind == "move_to"
+    assert sched.metrics()["preempted"] == 1
+
+
+def test_immediate_stop_after_dequeue_is_not_lost():
+    """Directe stop tussen get() en het begin van de beweging blijft staan."""
+    sched = CommandScheduler()
+    sched.submit(_move())
+    cmd = sched.get()
+    assert cmd.kind == "move" and not sched.abort_event.is_set()
+
+    sched.stop(immediate=True)
+    assert sched.abort_event.is_set()
+    # Pas het volgende get() (de stop zelf) wist de abort
+    assert sched.get() == "stop"
+    assert not sched.abort_event.is_set()
+
+
+def test_close_unblocks_get():
+    sched = CommandScheduler()
+    sched.close()
+    assert sched.get() is None
+
+
+# ---------- stepper op de fake backend ----------
+@pytest.fixture
+def stepper():
+    st = TB6600Stepper(backend=FakeStepBackend(), steps_per_mm=STEPS_PER_MM,
+                       max_speed_mm_s=50.0, accel_mm_s2=500.0, min_pulse_us=2.0, setup_us=1.0)
+    yield st
+    st.shutdown()
+
+
+def _wait_idle(st, timeout_s=5.0):
+    """Wacht tot de worker klaar is (is_moving kan even achterlopen op submit)."""
+    time.sleep(0.05)
+    deadline = time.monotonic() + timeout_s
+    while st.is_moving or st.command_metrics()["depth"]:
+        assert time.monotonic() < deadline, "stepper niet klaar binnen timeout"
+        time.sleep(0.01)
+
+
+def _wait_moving(st, timeout_s=1.0):
+    deadline = time.monotonic() + timeout_s
+    while not st.is_moving:
+        assert time.monotonic() < deadline, "stepper start niet"
+        time.sleep(0.002)
+
+
+def test_move_to_reaches_target(stepper):
+    stepper.move_to_mm(5.0)
+    _wait_idle(stepper)
+    assert stepper.position_steps == 500
+
+
+def test_stop_while_moving(stepper):
+    stepper.move_to_mm(100.0)                    # ~2 s
+    _wait_moving(stepper)
+    time.sleep(0.2)
+    stepper.stop(immediate=True)
+    _wait_idle(stepper)
+    stopped_at = stepper.position_steps
+    assert 0 < stopped_at < 10000
+
+    pulses = len(stepper.backend.step_times())
+    time.sleep(0.1)
+    assert len(stepper.backend.step_times()) == pulses   # geen pulsen meer na de stop
+    assert stepper.position_steps == stopped_at
+
+
+def test_decelerating_stop_ends_short_of_target(stepper):
+    stepper.move_to_mm(100.0)
+    _wait_moving(stepper)
+    time.sleep(0.2)
+    stepper.stop()
+    _wait_idle(stepper)
+    assert 0 < stepper.position_steps < 10000
+
+
+def test_immediate_stop_right_after_submit(stepper):
+    stepper.move_to_mm(100.0)
+    stepper.stop(immediate=True)
+    _wait_idle(stepper)
+    # Hooguit het begin van de beweging, nooit het doel
+    assert stepper.position_steps < 1000
+
+    stepper.move_to_mm(1.0)                      # volgende beweging loopt gewoon
+    _wait_idle(stepper)
+    assert stepper.position_steps == 100
+
+
+def test_move_to_preempts_move(stepper):
+    stepper.move(direction="forward", steps=20000, delay_s=0.0001)
+    _wait_moving(stepper)
+    time.sleep(0.1)
+    stepper.move_to_mm(2.0)
+    _wait_idle(stepper)
+    assert stepper.position_steps == 200
+    assert stepper.command_metrics()["preempted"] >= 1
+
+
+def test_same_direction_moves_add_up(stepper):
+    for _ in range(3):
+        stepper.move(direction="forward", steps=300, delay_s=0.0001)
+    _wait_idle(stepper)
+    assert stepper.position_steps == 900
+    assert stepper.command_metrics()["merged"] >= 1
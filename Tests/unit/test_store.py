@@ -0,0 +1,210 @@
+# Tests/unit/test_store.py
+"""TransportStore op een tijdelijke database: stations, jobs, move-batches en migratie."""
+import sqlite3
+import time
+
+import pytest
+
+from core.stations import Station
+from core.store import SCHEMA_VERSION, TransportStore, get_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    st = TransportStore(str(tmp_path / "transport.db"), batch_size=3, flush_interval_s=0.05)
+    yield st
+    st.close()
+
+
+def _count_moves(store):
+    # Rechtstreeks in de database: moves() flusht zelf eerst
+    return store._query("SELECT COUNT(*) AS n FROM moves")[0]["n"]
+
+
+# ---------- stations ----------
+def test_upsert_remove_and_version(store):
+    assert store.stations_version() == 0
+    v1 = store.upsert_stations([Station(1, "A", 50, "L"), Station(2, "B", 200, "r")])
+    assert v1 == 1
+    assert store.station(2).richting == "R"
+
+    assert store.upsert_stations([Station(2, "B2", 210, "R")]) == 2
+    assert store.station(2).positie == 210
+    assert store.remove_station(1) is True
+    assert store.remove_station(1) is False
+    assert list(store.stations()) == [2]
+    assert store.stations_version() == 3
+    assert store.get_meta("stations_version") == 3     # JSON zoals de andere meta
+
+
+def test_add_existing_station_rejected(store):
+    store.add_station(Station(1, "A", 50, "L"))
+    with pytest.raises(ValueError):
+        store.add_station(Station(1, "A", 60, "L"))
+
+
+def test_failed_check_writes_nothing(store):
+    store.upsert_stations([Station(1, "A", 50, "L")])
+
+    def check(stations):
+        raise ValueError("afgekeurd")
+
+    with pytest.raises(ValueError):
+        store.upsert_stations([Station(2, "B", 200, "R")], check=check)
+    assert list(store.stations()) == [1]
+    assert store.stations_version() == 1
+
+
+def test_csv_roundtrip(store, tmp_path):
+    store.upsert_stations([Station(1, "A", 50, "L"), Station(3, "C", 350, "R")])
+    path = tmp_path / "stations.csv"
+    assert store.export_stations_csv(str(path)) == 2
+
+    other = TransportStore(str(tmp_path / "other.db"))
+    try:
+        assert other.import_stations_csv(str(path)) == 2
+        assert other.stations() == store.stations()
+    finally:
+        other.close()
+
+
+def test_csv_bad_row_rejects_or_skips(store, tmp_path):
+    path = tmp_path / "stations.csv"
+    path.write_text("id,naam,positie,richting\n1,A,50,L\n2,B,abc,R\n3,C,350,X\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="regel 3"):
+        store.import_stations_csv(str(path))
+    assert store.stations() == {}
+
+    assert store.import_stations_csv(str(path), skip_errors=True) == 1
+    assert list(store.stations()) == [1]
+
+
+def test_get_store_survives_bad_legacy_csv(tmp_path, raw_config, write_config):
+    csv_path = tmp_path / "stations.csv"
+    csv_path.write_text("id,naam,positie,richting\n1,A,50,L\nkapot\n", encoding="utf-8")
+    raw_config["store"].update(path=str(tmp_path / "a.db"), stations_csv=str(csv_path))
+    store = get_store(write_config(raw_config, "a.yaml"))
+    try:
+        assert list(store.stations()) == [1]
+    finally:
+        store.close()
+
+    # Onleesbaar (een map i.p.v. een bestand): store start leeg
+    unreadable = tmp_path / "stations_dir.csv"
+    unreadable.mkdir()
+    raw_config["store"].update(path=str(tmp_path / "b.db"), stations_csv=str(unreadable))
+    store = get_store(write_config(raw_config, "b.yaml"))
+    try:
+        assert store.stations() == {}
+    finally:
+        store.close()
+
+
+# ---------- jobs ----------
+def test_jobs(store):
+    job = store.create_job(source=1, target=3)
+    assert store.job(job)["state"] == "queued"
+    assert store.update_job(job, state="done", finished_at=123.0) is True
+    assert store.job(job)["state"] == "done"
+    assert [j["id"] for j in store.jobs(state="done")] == [job]
+
+    with pytest.raises(ValueError):
+        store.update_job(job, state="kwijt")
+    with pytest.raises(ValueError):
+        store.update_job(job, colour="rood")
+    assert store.update_job(9999, state="done") is False
+
+
+# ---------- moves ----------
+def test_moves_flush_per_batch(store):
+    store.record_move(axis="x", success=True)
+    store.record_move(axis="x", success=True)
+    assert _count_moves(store) == 0           # nog gebufferd
+    store.record_move(axis="y", success=False, error="timeout")
+    assert _count_moves(store) == 3           # batch vol: direct geschreven
+
+
+def test_moves_flush_after_interval(store):
+    store.record_move(axis="x", success=True)
+    deadline = time.monotonic() + 2.0
+    while _count_moves(store) == 0:
+        assert time.monotonic() < deadline, "niet geflusht na flush_interval_s"
+        time.sleep(0.02)
+
+
+def test_moves_query_and_close_flushes(tmp_path):
+    path = str(tmp_path / "transport.db")
+    store = TransportStore(path, batch_size=100, flush_interval_s=60.0)
+    job = store.create_job(source=1, target=2)
+    store.record_move(axis="x", success=True, job_id=job, start_mm=0, target_mm=50, end_mm=49.8)
+    store.record_move(axis="y", success=True, job_id=job)
+    store.record_move(axis="x", success=False)
+    assert sorted(m["axis"] for m in store.moves(job_id=job)) == ["x", "y"]
+    assert sorted(m["success"] for m in store.moves(axis="x")) == [False, True]
+
+    store.record_move(axis="x", success=True)
+    store.close()
+    reopened = TransportStore(path)
+    try:
+        assert _count_moves(reopened) == 4
+    finally:
+        reopened.close()
+
+
+# ---------- meta / migratie ----------
+def test_meta_roundtrip(store):
+    assert store.get_meta("home_x") is None
+    store.set_meta("home_x", {"turns": 3, "last_raw": 12.5})
+    store.set_meta("home_x", {"turns": 4, "last_raw": 1.0})
+    assert store.get_meta("home_x") == {"turns": 4, "last_raw": 1.0}
+
+
+def test_migrate_from_v1_keeps_data(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE stations (id INTEGER PRIMARY KEY, naam TEXT NOT NULL, positie INTEGER NOT NULL,
+                               richting TEXT NOT NULL, updated_at REAL NOT NULL);
+        INSERT INTO stations VALUES (7, 'Oud', 120, 'L', 0);
+        PRAGMA user_version = 1;
+    """)
+    db.close()
+
+    store = TransportStore(path)
+    try:
+        assert store._query("PRAGMA user_version")[0][0] == SCHEMA_VERSION
+        assert store.station(7).naam == "Oud"
+        store.set_meta("k", 1)                # meta-tabel aangemaakt
+        assert store.create_job() > 0         # jobs-tabel aangemaakt
+    finally:
+        store.close()
+
+
+def test_migrate_from_v2_converts_stations_version(tmp_path):
+    path = str(tmp_path / "v2.db")
+    store = TransportStore(path)
+    store.close()
+    db = sqlite3.connect(path)
+    # Zoals v2 het schreef: kaal getal in plaats van JSON-tekst
+    db.executescript("""
+        INSERT INTO meta (key, value) VALUES ('stations_version', 7);
+        PRAGMA user_version = 2;
+    """)
+    db.close()
+
+    store = TransportStore(path)
+    try:
+        assert store.get_meta("stations_version") == 7
+        assert store.upsert_stations([Station(1, "A", 50, "L")]) == 8
+    finally:
+        store.close()
+
+
+def test_newer_schema_refused(tmp_path):
+    path = str(tmp_path / "new.db")
+    db = sqlite3.connect(path)
+    db.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    db.close()
+    with pytest.raises(RuntimeError, match="nieuwer"):
+        TransportStore(path)
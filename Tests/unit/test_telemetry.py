@@ -0,0 +1,114 @@
+# Tests/unit/test_telemetry.py
+"""TelemetryHub: stream-slots atomair reserveren en vrijgeven bij close()."""
+import threading
+
+import pytest
+
+from HMI import telemetry as telemetry_mod
+from HMI.telemetry import TelemetryHub
+
+
+class EmptyRuntime:
+    """Runtime zonder subsystemen: sample() geeft een state met alleen None."""
+
+    def get(self, name):
+        return None
+
+
+@pytest.fixture
+def hub():
+    return TelemetryHub(EmptyRuntime(), rate_hz=200.0, heartbeat_s=10.0, max_streams=2)
+
+
+def test_slots_are_limited_and_freed(hub):
+    a, b = hub.open_stream(), hub.open_stream()
+    assert a is not None and b is not None
+    assert hub.open_stream() is None
+    assert hub.stats()["streams_rejected"] == 1
+
+    a.close()
+    c = hub.open_stream()
+    assert c is not None and hub.stream_count() == 2
+    b.close()
+    c.close()
+    assert hub.stream_count() == 0
+
+
+def test_concurrent_open_never_exceeds_max(hub):
+    barrier = threading.Barrier(16)
+    opened = []
+
+    def client():
+        barrier.wait()
+        opened.append(hub.open_stream())
+
+    threads = [threading.Thread(target=client) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    streams = [s for s in opened if s is not None]
+    assert len(streams) == 2 and hub.stream_count() == 2
+    assert hub.stats()["streams_rejected"] == 14
+    for s in streams:
+        s.close()
+
+
+def test_close_without_iterating_and_twice(hub):
+    stream = hub.open_stream()
+    stream.close()
+    stream.close()                                # geen dubbele release (BoundedSemaphore)
+    assert hub.stream_count() == 0
+    assert [hub.open_stream() is not None for _ in range(3)] == [True, True, False]
+
+
+def test_close_detaches_running_stream(hub):
+    stream = hub.open_stream()
+    first = next(stream)
+    assert first.startswith("id: 1\ndata: ")
+    assert hub.stats()["clients"] == 1
+
+    stream.close()                                # GeneratorExit in de generator
+    stats = hub.stats()
+    assert (stats["clients"], stats["streams"]) == (0, 0)
+
+
+def test_probe_and_heartbeat_when_idle(hub, monkeypatch):
+    monkeypatch.setattr(telemetry_mod, "STREAM_PROBE_S", 0.01)
+    stream = hub.open_stream()
+    try:
+        next(stream)
+        assert next(stream) == ":\n\n"            # probe: merkt een verdwenen client snel
+        hub.heartbeat_s = 0.01
+        assert next(stream) == ": heartbeat\n\n"
+    finally:
+        stream.close()
+
+
+def test_unlimited_without_max_streams():
+    hub = TelemetryHub(EmptyRuntime())
+    streams = [hub.open_stream() for _ in range(5)]
+    assert all(s is not None for s in streams)
+    for s in streams:
+        s.close()
+    assert hub.stream_count() == 0
+
+
+def test_api_stream_releases_slot_on_close(hmi_app):
+    client = hmi_app.test_client()
+    hub = hmi_app.extensions["hmi_telemetry"]
+    max_streams = hmi_app.extensions["hmi_runtime"].config.hmi.max_streams
+
+    responses = [client.get("/api/stream", buffered=False) for _ in range(max_streams)]
+    assert all(r.status_code == 200 for r in responses)
+    full = client.get("/api/stream")
+    assert full.status_code == 503
+
+    responses.pop().close()                       # client weg
+    assert hub.stream_count() == max_streams - 1
+    again = client.get("/api/stream", buffered=False)
+    assert again.status_code == 200
+    # Test client: request contexts van de streams in omgekeerde volgorde sluiten
+    for r in reversed(responses + [again]):
+        r.close()
+    assert hub.stream_count() == 0
@@ -0,0 +1,581 @@
+# core/config.py
+"""
+Centrale configuratie.
+
+config.yaml wordt één keer ingelezen naar frozen dataclasses (met __slots__),
+gevalideerd (types, bereik, onbekende sleutels) en gecontroleerd op
+pin-conflicten tussen `gpio` en `steppers`. Fouten geven een ConfigError met
+het pad van de sleutel, bv. "steppers.y_axis.dir_pin".
+
+  cfg = get_config()                    # gedeeld, per bestand gecached
+  cfg.gpio["sensor_1"].pin
+  cfg.steppers["y_axis"].max_speed_mm_s
+  cfg.x_axis.mm_per_rev
+
+Hot reload (reload_config()): alleen de parameters in TUNABLE mogen
+veranderen (snelheden, acceleratie, softe eindstops, homing, debounce).
+Verandert er iets anders (pinnen, backend, ...), dan wordt de reload
+geweigerd; daarvoor is een herstart nodig. Na een geslaagde reload krijgen
+de subscribers de nieuwe config (zie ConfigStore.subscribe).
+"""
+import fnmatch
+import os
+import threading
+import typing
+from dataclasses import MISSING, dataclass, fields, is_dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+import yaml
+
+from core.hardware_backend import VALID_BACKENDS
+
+GPIO_TYPES = ("led", "output", "pwm", "button")
+STEPPER_BACKENDS = ("rpi", "gpiod", "fake")
+HMI_SERVERS = ("waitress", "werkzeug")
+
+# Parameters die zonder herstart aangepast mogen worden (reload_config)
+TUNABLE = (
+    "gpio.*.debounce_ms",
+    "steppers.*.max_speed_mm_s",
+    "steppers.*.accel_mm_s2",
+    "steppers.*.min_mm",
+    "steppers.*.max_mm",
+    "steppers.*.jog_keepalive_s",
+    "x_axis.homing.speed",
+    "x_axis.homing.timeout_s",
+    "x_axis.homing.settle_s",
+    "x_axis.homing.two_phase",
+    "x_axis.homing.backoff_speed",
+    "x_axis.homing.backoff_mm",
+    "x_axis.homing.slow_speed",
+    "x_axis.motor_ramp.accel_per_s",
+    "x_axis.motor_ramp.decel_per_s",
+    "x_axis.motor_ramp.brake_per_s",
+    "hmi.telemetry_hz",
+    "stations.*",
+    "safety.max_sample_age_s",
+    "safety.x_min_mm",
+    "safety.x_max_mm",
+    "safety.stall_duty",
+    "safety.stall_s",
+    "safety.stall_min_mm",
+    "safety.command_timeout_s",
+    "safety.y_margin_mm",
+    "shuttle.*",
+)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+class ConfigRestartRequired(ConfigError):
+    """Reload met wijzigingen in niet-afstelbare parameters."""
+
+
+def _require(ok, where, msg):
+    if not ok:
+        raise ConfigError(f"{where}: {msg}")
+
+
+def _check_pin(pin, where):
+    # BCM-nummering, header van de Raspberry Pi
+    _require(0 <= pin <= 27, where, f"ongeldige BCM-pin {pin}")
+
+
+# ---------- secties ----------
+@dataclass(frozen=True, slots=True)
+class GPIODeviceConfig:
+    name: str
+    type: str
+    pin: int
+    pull_up: bool = True            # button
+    active_high: bool = True        # output
+    frequency: float = 1000.0       # pwm (Hz)
+    debounce_ms: float = 0.0        # button (zie core/gpio_events.py)
+    edge_buffer: int = 256          # button
+
+    def _check(self, where):
+        _require(self.type in GPIO_TYPES, f"{where}.type", f"onbekend type '{self.type}'")
+        _check_pin(self.pin, f"{where}.pin")
+        _require(self.frequency > 0, f"{where}.frequency", "moet > 0 zijn")
+        _require(self.debounce_ms >= 0, f"{where}.debounce_ms", "moet >= 0 zijn")
+        _require(self.edge_buffer >= 1, f"{where}.edge_buffer", "moet >= 1 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class StepperConfig:
+    name: str
+    step_pin: int
+    dir_pin: int
+    ena_pin: int
+    backend: str = "rpi"
+    chip: str = "/dev/gpiochip0"
+    signals_active_low: bool = True
+    steps_per_mm: float = 400.0
+    min_pulse_us: float = 8.0
+    max_speed_mm_s: float = 25.0
+    accel_mm_s2: float = 150.0
+    min_mm: Optional[float] = None
+    max_mm: Optional[float] = None
+    setup_us: float = 10.0
+    jog_keepalive_s: float = 0.5
+
+    @property
+    def pins(self):
+        return {"step_pin": self.step_pin, "dir_pin": self.dir_pin, "ena_pin": self.ena_pin}
+
+    def _check(self, where):
+        for key, pin in self.pins.items():
+            _check_pin(pin, f"{where}.{key}")
+        _require(len(set(self.pins.values())) == 3, where, "step/dir/ena pinnen moeten verschillen")
+        _require(self.backend in STEPPER_BACKENDS, f"{where}.backend",
+                 f"onbekende backend '{self.backend}' (kies uit {STEPPER_BACKENDS})")
+        for key in ("steps_per_mm", "min_pulse_us", "max_speed_mm_s", "accel_mm_s2", "jog_keepalive_s"):
+            _require(getattr(self, key) > 0, f"{where}.{key}", "moet > 0 zijn")
+        _require(self.setup_us >= 0, f"{where}.setup_us", "moet >= 0 zijn")
+        if self.min_mm is not None and self.max_mm is not None:
+            _require(self.min_mm < self.max_mm, where, "min_mm moet kleiner zijn dan max_mm")
+
+
+@dataclass(frozen=True, slots=True)
+class EncoderConfig:
+    name: str
+    type: str = "as5600"
+    bus: int = 1
+    address: int = 0x36
+    zero_offset_deg: float = 0.0
+
+    def _check(self, where):
+        _require(0 <= self.address <= 0x7F, f"{where}.address", "ongeldig I2C-adres")
+
+
+@dataclass(frozen=True, slots=True)
+class HomingConfig:
+    sensor: str = "sensor_1"
+    direction: str = "forward"      # richting naar de sensor
+    speed: float = 0.4              # duty cycle (snelle nadering)
+    timeout_s: float = 10.0         # per fase
+    settle_s: float = 0.15
+    two_phase: bool = True          # terugrijden + langzaam opnieuw naderen
+    backoff_speed: float = 0.3
+    backoff_mm: float = 5.0         # extra afstand nadat de sensor vrij is
+    slow_speed: float = 0.15        # duty bij het opnieuw naderen (hierop wordt home gezet)
+    stats_runs: int = 20            # runs voor de spreidingsstatistiek
+
+    def _check(self, where):
+        _require(self.direction in ("forward", "backward"), f"{where}.direction",
+                 "moet forward of backward zijn")
+        for key in ("speed", "backoff_speed", "slow_speed"):
+            _require(0 < getattr(self, key) <= 1, f"{where}.{key}", "moet in (0, 1] liggen")
+        _require(self.backoff_mm >= 0, f"{where}.backoff_mm", "moet >= 0 zijn")
+        _require(self.stats_runs >= 2, f"{where}.stats_runs", "moet >= 2 zijn")
+        _require(self.timeout_s > 0, f"{where}.timeout_s", "moet > 0 zijn")
+        _require(self.settle_s >= 0, f"{where}.settle_s", "moet >= 0 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class MotorRampConfig:
+    enabled: bool = True
+    accel_per_s: float = 2.0        # duty per seconde (optrekken)
+    decel_per_s: float = 3.0        # duty per seconde (afremmen / omkeren)
+    brake_per_s: float = 6.0        # duty per seconde bij stop(brake=True)
+    tick_hz: float = 200.0
+
+    def _check(self, where):
+        for key in ("accel_per_s", "decel_per_s", "brake_per_s", "tick_hz"):
+            _require(getattr(self, key) > 0, f"{where}.{key}", "moet > 0 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class HomePersistConfig:
+    enabled: bool = True
+    checkpoint_s: float = 1.0           # interval van de checkpoints (alleen bij wijziging)
+    raw_tolerance_deg: float = 3.0      # max verschil ruwe hoek checkpoint <-> bij opstarten
+    max_age_s: Optional[float] = None   # ouder checkpoint = opnieuw homen (None = geen limiet)
+    sensor_check: bool = True           # homing-sensor moet kloppen met de herstelde positie
+    sensor_window_mm: float = 10.0      # binnen deze afstand van home mag de sensor actief zijn
+
+    def _check(self, where):
+        _require(self.checkpoint_s > 0, f"{where}.checkpoint_s", "moet > 0 zijn")
+        _require(0 < self.raw_tolerance_deg < 180, f"{where}.raw_tolerance_deg",
+                 "moet in (0, 180) liggen")
+        if self.max_age_s is not None:
+            _require(self.max_age_s > 0, f"{where}.max_age_s", "moet > 0 zijn")
+        _require(self.sensor_window_mm >= 0, f"{where}.sensor_window_mm", "moet >= 0 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class XAxisConfig:
+    mm_per_rev: float = 90.33       # mm per encoder-omwenteling
+    direction_sign: int = -1        # encoder telt af richting sensor
+    homing: HomingConfig = HomingConfig()
+    motor_ramp: MotorRampConfig = MotorRampConfig()
+    home_persist: HomePersistConfig = HomePersistConfig()
+
+    def _check(self, where):
+        _require(self.mm_per_rev > 0, f"{where}.mm_per_rev", "moet > 0 zijn")
+        _require(self.direction_sign in (-1, 1), f"{where}.direction_sign", "moet -1 of 1 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class HMIConfig:
+    server: str = "waitress"        # waitress (productie) | werkzeug (development)
+    host: str = "0.0.0.0"
+    port: int = 5000
+    threads: int = 8                # worker threads (waitress)
+    connection_limit: int = 100
+    channel_timeout_s: float = 120.0
+    max_streams: int = 4            # gelijktijdige /api/stream verbindingen
+    telemetry_hz: float = 20.0      # sample-rate van de telemetrie-stream
+    heartbeat_s: float = 10.0       # SSE heartbeat als er niets verandert
+    history_hz: float = 10.0        # sample-rate van de grafiekhistorie (/api/timeseries)
+    history_s: float = 1800.0       # hoe ver de historie terugkijkt
+
+    def _check(self, where):
+        _require(self.server in HMI_SERVERS, f"{where}.server",
+                 f"onbekende server '{self.server}' (kies uit {HMI_SERVERS})")
+        _require(0 < self.port < 65536, f"{where}.port", "ongeldige poort")
+        _require(self.threads >= 2, f"{where}.threads", "moet >= 2 zijn")
+        _require(self.connection_limit >= 1, f"{where}.connection_limit", "moet >= 1 zijn")
+        _require(self.channel_timeout_s > 0, f"{where}.channel_timeout_s", "moet > 0 zijn")
+        # Elke stream houdt een worker thread bezet: laat er minstens één vrij
+        _require(0 <= self.max_streams < self.threads, f"{where}.max_streams",
+                 "moet kleiner zijn dan threads")
+        _require(0 < self.telemetry_hz <= 200, f"{where}.telemetry_hz", "moet in (0, 200] liggen")
+        _require(self.heartbeat_s > 0, f"{where}.heartbeat_s", "moet > 0 zijn")
+        _require(0 < self.history_hz <= 100, f"{where}.history_hz", "moet in (0, 100] liggen")
+        _require(self.history_s > 0, f"{where}.history_s", "moet > 0 zijn")
+        _require(self.history_s * self.history_hz <= 1_000_000, f"{where}.history_s",
+                 "te veel samples (history_s * history_hz > 1e6)")
+
+
+@dataclass(frozen=True, slots=True)
+class StationsConfig:
+    # Regels voor de stationslijst (core/stations.py check_stations)
+    min_mm: float = 0.0                     # X-positie van een station binnen de baan
+    max_mm: Optional[float] = None          # None = geen bovengrens
+    min_spacing_mm: float = 20.0            # minimale afstand tussen twee stations
+
+    def _check(self, where):
+        _require(self.min_spacing_mm >= 0, f"{where}.min_spacing_mm", "moet >= 0 zijn")
+        if self.max_mm is not None:
+            _require(self.min_mm < self.max_mm, where, "min_mm moet kleiner zijn dan max_mm")
+
+
+@dataclass(frozen=True, slots=True)
+class StoreConfig:
+    path: str = "data/transport.db"         # SQLite (WAL), zie core/store.py
+    stations_csv: str = "data/stations.csv" # import bij een lege database / export
+    batch_size: int = 50                    # move-records per transactie
+    flush_interval_s: float = 1.0           # uiterlijk zo lang wachten met schrijven
+
+    def _check(self, where):
+        _require(bool(self.path), f"{where}.path", "mag niet leeg zijn")
+        _require(self.batch_size >= 1, f"{where}.batch_size", "moet >= 1 zijn")
+        _require(self.flush_interval_s > 0, f"{where}.flush_interval_s", "moet > 0 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class SafetyConfig:
+    # Safety supervisor (hardware/safety.py)
+    enabled: bool = True
+    rate_hz: float = 200.0                  # controle-frequentie
+    max_sample_age_s: float = 0.25          # oudere encodermeting tijdens rijden = trip
+    x_min_mm: Optional[float] = -20.0       # softe eindstops X (alleen gehomed)
+    x_max_mm: Optional[float] = None
+    stall_duty: float = 0.2                 # vanaf deze duty wordt stall bewaakt
+    stall_s: float = 0.5
+    stall_min_mm: float = 1.0               # minder beweging in stall_s = stall
+    command_timeout_s: float = 1.0          # handmatige X-jog zonder verversing
+    y_margin_mm: float = 2.0                # marge voorbij de softe eindstops van Y
+    history: int = 100                      # bewaarde trips
+
+    def _check(self, where):
+        for key in ("rate_hz", "max_sample_age_s", "stall_duty", "stall_s", "stall_min_mm",
+                    "command_timeout_s"):
+            _require(getattr(self, key) > 0, f"{where}.{key}", "moet > 0 zijn")
+        _require(self.rate_hz <= 2000, f"{where}.rate_hz", "moet <= 2000 zijn")
+        _require(self.y_margin_mm >= 0, f"{where}.y_margin_mm", "moet >= 0 zijn")
+        _require(self.history >= 1, f"{where}.history", "moet >= 1 zijn")
+        if self.x_min_mm is not None and self.x_max_mm is not None:
+            _require(self.x_min_mm < self.x_max_mm, where, "x_min_mm moet kleiner zijn dan x_max_mm")
+
+
+@dataclass(frozen=True, slots=True)
+class ShuttleConfig:
+    # Pick-and-place cyclus (core/shuttle.py)
+    tick_hz: float = 100.0
+    x_speed: float = 0.7                    # duty tijdens het rijden
+    x_slow_speed: float = 0.15              # duty in de slow zone
+    x_slow_zone_mm: float = 40.0
+    x_tolerance_mm: float = 1.5
+    x_settle_mm_s: float = 5.0              # aangekomen = binnen tolerance en trager dan dit
+    x_settle_window_s: float = 0.1          # venster waarover de snelheid gemeten wordt
+    x_settle_dwell_s: float = 0.1           # zo lang moet de wagen stil binnen tolerance staan
+    x_timeout_s: float = 30.0
+    y_extend_mm: float = 100.0              # uitschuiven: L = -y_extend_mm, R = +y_extend_mm
+    y_speed_mm_s: Optional[float] = None    # None = topsnelheid van de stepper
+    y_tolerance_mm: float = 0.5
+    y_clear_mm: float = 10.0                # X mag rijden zodra |Y| hieronder is
+    y_timeout_s: float = 15.0
+    pipeline: bool = True                   # X al starten bij |Y| < y_clear_mm
+    grip_sensor: Optional[str] = None       # input die pakken/loslaten bevestigt
+    grip_s: float = 0.3                     # zonder grip_sensor: vaste pak-/lostijd
+    grip_timeout_s: float = 2.0
+    stats_jobs: int = 50                    # jobs voor de fase-statistiek
+
+    def _check(self, where):
+        for key in ("tick_hz", "x_slow_zone_mm", "x_tolerance_mm", "x_settle_mm_s", "x_settle_window_s",
+                    "x_timeout_s", "y_extend_mm", "y_tolerance_mm", "y_timeout_s", "grip_timeout_s"):
+            _require(getattr(self, key) > 0, f"{where}.{key}", "moet > 0 zijn")
+        for key in ("x_speed", "x_slow_speed"):
+            _require(0 < getattr(self, key) <= 1, f"{where}.{key}", "moet in (0, 1] liggen")
+        if self.y_speed_mm_s is not None:
+            _require(self.y_speed_mm_s > 0, f"{where}.y_speed_mm_s", "moet > 0 zijn")
+        _require(0 <= self.y_clear_mm < self.y_extend_mm, f"{where}.y_clear_mm",
+                 "moet in [0, y_extend_mm) liggen")
+        _require(self.grip_s >= 0, f"{where}.grip_s", "moet >= 0 zijn")
+        _require(self.x_settle_dwell_s >= 0, f"{where}.x_settle_dwell_s", "moet >= 0 zijn")
+        _require(self.stats_jobs >= 1, f"{where}.stats_jobs", "moet >= 1 zijn")
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    path: str
+    hardware_backend: str
+    gpio: Mapping[str, GPIODeviceConfig]
+    steppers: Mapping[str, StepperConfig]
+    encoders: Mapping[str, EncoderConfig]
+    x_axis: XAxisConfig
+    hmi: HMIConfig = HMIConfig()
+    stations: StationsConfig = StationsConfig()
+    store: StoreConfig = StoreConfig()
+    safety: SafetyConfig = SafetyConfig()
+    shuttle: ShuttleConfig = ShuttleConfig()
+    version: int = 1
+
+
+# ---------- parsen + valideren ----------
+def _coerce(value, hint, where):
+    if typing.get_origin(hint) is typing.Union:
+        args = [a for a in typing.get_args(hint) if a is not type(None)]
+        if value is None:
+            return None
+        hint = args[0]
+
+    if is_dataclass(hint):
+        return _build(hint, value, where)
+    if hint is bool:
+        _require(isinstance(value, bool), where, f"verwacht true/false, kreeg {value!r}")
+        return value
+    if hint is int:
+        _require(isinstance(value, int) and not isinstance(value, bool), where,
+                 f"verwacht een geheel getal, kreeg {value!r}")
+        return value
+    if hint is float:
+        _require(isinstance(value, (int, float)) and not isinstance(value, bool), where,
+                 f"verwacht een getal, kreeg {value!r}")
+        return float(value)
+    if hint is str:
+        _require(isinstance(value, str), where, f"verwacht tekst, kreeg {value!r}")
+        return value
+    raise TypeError(f"{where}: type {hint} niet ondersteund")
+
+
+def _build(cls, raw, where, **given):
+    raw = {} if raw is None else raw
+    _require(isinstance(raw, dict), where, "verwacht een mapping")
+
+    hints = typing.get_type_hints(cls)
+    names = {f.name for f in fields(cls)}
+    unknown = sorted(set(raw) - names - set(given))
+    _require(not unknown, where, f"onbekende sleutel(s) {unknown}")
+
+    kwargs = dict(given)
+    for f in fields(cls):
+        if f.name in given:
+            continue
+        if f.name not in raw:
+            _require(f.default is not MISSING, f"{where}.{f.name}", "ontbreekt")
+            continue
+        kwargs[f.name] = _coerce(raw[f.name], hints[f.name], f"{where}.{f.name}")
+
+    obj = cls(**kwargs)
+    obj._check(where)
+    return obj
+
+
+def _build_named(cls, raw, where):
+    raw = {} if raw is None else raw
+    _require(isinstance(raw, dict), where, "verwacht een mapping")
+    return MappingProxyType({str(name): _build(cls, item, f"{where}.{name}", name=str(name))
+                             for name, item in raw.items()})
+
+
+def _cross_check(cfg):
+    """Pin-conflicten tussen gpio en steppers, en verwijzingen naar inputs."""
+    used = {}
+    owners = [(f"gpio.{name}.pin", dev.pin) for name, dev in cfg.gpio.items()]
+    for name, st in cfg.steppers.items():
+        owners += [(f"steppers.{name}.{key}", pin) for key, pin in st.pins.items()]
+
+    for where, pin in owners:
+        _require(pin not in used, where, f"GPIO {pin} wordt ook gebruikt door {used.get(pin)}")
+        used[pin] = where
+
+    sensor = cfg.x_axis.homing.sensor
+    dev = cfg.gpio.get(sensor)
+    _require(dev is not None and dev.type == "button", "x_axis.homing.sensor",
+             f"'{sensor}' is geen input (type button) in gpio")
+
+    grip = cfg.shuttle.grip_sensor
+    if grip is not None:
+        dev = cfg.gpio.get(grip)
+        _require(dev is not None and dev.type == "button", "shuttle.grip_sensor",
+                 f"'{grip}' is geen input (type button) in gpio")
+
+
+def parse_config(raw, path="config.yaml", version=1):
+    """Valideer een ingelezen YAML-dict en bouw er een AppConfig van."""
+    raw = {} if raw is None else raw
+    _require(isinstance(raw, dict), path, "verwacht een mapping op het hoogste niveau")
+    known = {"hardware", "gpio", "steppers", "encoder", "x_axis", "hmi", "stations", "store",
+             "safety", "shuttle"}
+    unknown = sorted(set(raw) - known)
+    _require(not unknown, path, f"onbekende sectie(s) {unknown}")
+
+    hardware = raw.get("hardware") or {}
+    _require(isinstance(hardware, dict), "hardware", "verwacht een mapping")
+    unknown = sorted(set(hardware) - {"backend"})
+    _require(not unknown, "hardware", f"onbekende sleutel(s) {unknown}")
+    backend = str(hardware.get("backend", "real")).lower().strip()
+    _require(backend in VALID_BACKENDS, "hardware.backend",
+             f"onbekende backend '{backend}' (kies uit {VALID_BACKENDS})")
+
+    cfg = AppConfig(
+        path=path,
+        hardware_backend=backend,
+        gpio=_build_named(GPIODeviceConfig, raw.get("gpio"), "gpio"),
+        steppers=_build_named(StepperConfig, raw.get("steppers"), "steppers"),
+        encoders=_build_named(EncoderConfig, raw.get("encoder"), "encoder"),
+        x_axis=_build(XAxisConfig, raw.get("x_axis"), "x_axis"),
+        hmi=_build(HMIConfig, raw.get("hmi"), "hmi"),
+        stations=_build(StationsConfig, raw.get("stations"), "stations"),
+        store=_build(StoreConfig, raw.get("store"), "store"),
+        safety=_build(SafetyConfig, raw.get("safety"), "safety"),
+        shuttle=_build(ShuttleConfig, raw.get("shuttle"), "shuttle"),
+        version=version,
+    )
+    _cross_check(cfg)
+    return cfg
+
+
+def load_config(path="config.yaml", version=1):
+    """Lees en valideer config.yaml; ook lees- en YAML-fouten worden ConfigError."""
+    try:
+        with open(path, "r") as f:
+            raw = yaml.safe_load(f)
+    except OSError as e:
+        raise ConfigError(f"{path}: niet te lezen ({e.strerror or e})") from e
+    except yaml.YAMLError as e:
+        raise ConfigError(f"{path}: ongeldige YAML ({e})") from e
+    return parse_config(raw, path=path, version=version)
+
+
+def _flatten(obj, prefix=""):
+    out = {}
+    if isinstance(obj, Mapping):
+        items = obj.items()
+    elif is_dataclass(obj):
+        items = ((f.name, getattr(obj, f.name)) for f in fields(obj))
+    else:
+        return {prefix: obj}
+    for key, value in items:
+        out.update(_flatten(value, f"{prefix}.{key}" if prefix else key))
+    return out
+
+
+def diff_config(old, new):
+    """Gewijzigde sleutels (dotted pad -> (oud, nieuw)), zonder path/version."""
+    a, b = _flatten(old), _flatten(new)
+    return {key: (a.get(key), b.get(key))
+            for key in sorted(set(a) | set(b))
+            if key not in ("path", "version") and a.get(key) != b.get(key)}
+
+
+def is_tunable(key):
+    return any(fnmatch.fnmatchcase(key, pattern) for pattern in TUNABLE)
+
+
+def tunable_values(config):
+    """Huidige waarden van alle live aanpasbare parameters (dotted pad -> waarde)."""
+    return {key: value for key, value in _flatten(config).items() if is_tunable(key)}
+
+
+# ---------- gedeelde store ----------
+class ConfigStore:
+    def __init__(self, path="config.yaml"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._config = load_config(path)
+        self._subscribers = []
+
+    @property
+    def current(self):
+        return self._config
+
+    def subscribe(self, callback):
+        """callback(new_config) na elke geslaagde reload."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def reload(self):
+        """
+        Lees config.yaml opnieuw in. Alleen TUNABLE-parameters mogen
+        veranderen, anders ConfigRestartRequired; een onleesbare of ongeldige
+        config geeft ConfigError. In beide gevallen blijft de oude config actief.
+        Geeft {"version": ..., "changed": {pad: [oud, nieuw]}} terug.
+        """
+        with self._lock:
+            old = self._config
+            new = load_config(self.path, version=old.version + 1)
+            changed = diff_config(old, new)
+            frozen = [key for key in changed if not is_tunable(key)]
+            if frozen:
+                raise ConfigRestartRequired(f"herstart nodig voor: {', '.join(frozen)}")
+            if not changed:
+                return {"version": old.version, "changed": {}}
+
+            self._config = new
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(new)
+            except Exception as e:
+                print("[config] fout bij toepassen reload:", e)
+        return {"version": new.version, "changed": {k: list(v) for k, v in changed.items()}}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_config_store(path="config.yaml"):
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ConfigStore(path)
+        return store
+
+
+def get_config(path="config.yaml"):
+    """Gedeelde, gevalideerde config (wordt per bestand één keer geparsed)."""
+    return get_config_store(path).current
+
+
+def reload_config(path="config.yaml"):
+    return get_config_store(path).reload()
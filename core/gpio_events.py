@@ -0,0 +1,174 @@
+# core/gpio_events.py
+"""
+Flank-events voor alle inputs (type `button`) uit config.yaml.
+
+In plaats van is_active() te pollen hangt de GPIOManager aan elke input een
+InputEdges. De gpiozero-callbacks (when_activated/when_deactivated) zetten
+direct bij binnenkomst een tijdstempel (time.perf_counter) en de flank gaat
+in een ringbuffer per input. Zonder flanken kost een input dus niets.
+
+Debounce per input (`debounce_ms` in config.yaml): een flank binnen de
+debounce-tijd na de vorige geaccepteerde flank wordt genegeerd; na afloop
+van die tijd wordt het niveau opnieuw gelezen, zodat een stuiter die op het
+andere niveau eindigt toch als (laatste) flank wordt vastgelegd.
+
+Gebruik:
+  edges = gpio.edges("sensor_1")
+  edge = edges.wait(active=True, timeout=5.0)      # blokkeren tot flank
+  unsubscribe = edges.subscribe(lambda e: ...)     # callback per flank
+  edges.since(seq)                                 # flanken na volgnummer
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Edge:
+    name: str
+    seq: int            # oplopend volgnummer per input (1, 2, ...)
+    active: bool        # True = input werd actief
+    ts: float           # time.perf_counter() bij binnenkomst van de flank
+
+
+class InputEdges:
+    def __init__(self, name, device, debounce_ms=0.0, buffer_size=256):
+        self.name = name
+        self.device = device
+        self.debounce_s = float(debounce_ms) * 1e-3
+
+        self._cond = threading.Condition()
+        self._edges = deque(maxlen=int(buffer_size))
+        self._seq = 0
+        self._level = bool(device.is_active)
+        self._last_ts = float("-inf")
+        self._last_raw = None           # (active, ts) van de laatste ruwe flank
+        self._recheck = None
+        self._subscribers = []
+        self._stats = {"raw": 0, "accepted": 0, "bounced": 0, "dropped": 0}
+
+        device.when_activated = lambda: self._on_raw(True)
+        device.when_deactivated = lambda: self._on_raw(False)
+
+    # ---------- callback kant ----------
+    def _on_raw(self, active):
+        ts = time.perf_counter()
+        with self._cond:
+            self._stats["raw"] += 1
+            self._last_raw = (active, ts)
+            if ts - self._last_ts < self.debounce_s:
+                self._stats["bounced"] += 1
+                self._schedule_recheck_locked()
+                return
+            edge = self._accept_locked(active, ts)
+        self._notify(edge)
+
+    def _accept_locked(self, active, ts):
+        if active == self._level:
+            return None
+        self._level = active
+        self._last_ts = ts
+        self._seq += 1
+        if len(self._edges) == self._edges.maxlen:
+            self._stats["dropped"] += 1
+        edge = Edge(self.name, self._seq, active, ts)
+        self._edges.append(edge)
+        self._stats["accepted"] += 1
+        self._cond.notify_all()
+        return edge
+
+    def _schedule_recheck_locked(self):
+        if self._recheck is not None:
+            return
+        delay = max(0.0, self._last_ts + self.debounce_s - time.perf_counter())
+        self._recheck = threading.Timer(delay, self._settle)
+        self._recheck.daemon = True
+        self._recheck.start()
+
+    def _settle(self):
+        """Na de debounce-tijd: stabiel niveau ≠ laatst geaccepteerd -> flank."""
+        level = bool(self.device.is_active)
+        with self._cond:
+            self._recheck = None
+            edge = None
+            if level != self._level:
+                active, ts = self._last_raw
+                edge = self._accept_locked(level, ts if active == level else time.perf_counter())
+        self._notify(edge)
+
+    def _notify(self, edge):
+        if edge is None:
+            return
+        with self._cond:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(edge)
+            except Exception as e:
+                print(f"[gpio_events] subscriber {self.name} fout:", e)
+
+    # ---------- API ----------
+    @property
+    def level(self):
+        """Laatst geaccepteerd (gedebounced) niveau."""
+        with self._cond:
+            return self._level
+
+    @property
+    def seq(self):
+        with self._cond:
+            return self._seq
+
+    def last(self):
+        with self._cond:
+            return self._edges[-1] if self._edges else None
+
+    def since(self, seq=0):
+        """Alle flanken in de buffer met volgnummer > seq."""
+        with self._cond:
+            return [e for e in self._edges if e.seq > seq]
+
+    def wait(self, active=None, timeout=None, after=None):
+        """
+        Blokkeer tot een flank na volgnummer `after` (standaard: nu), optioneel
+        alleen naar `active`. Geeft de Edge terug, of None bij timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            after = self._seq if after is None else after
+            while True:
+                for edge in self._edges:
+                    if edge.seq > after and (active is None or edge.active == active):
+                        return edge
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def subscribe(self, callback):
+        """callback(edge) per geaccepteerde flank. Geeft een unsubscribe-functie terug."""
+        with self._cond:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._cond:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def stats(self):
+        with self._cond:
+            out = dict(self._stats)
+            out.update(level=self._level, seq=self._seq, buffered=len(self._edges),
+                       debounce_ms=self.debounce_s * 1e3)
+        return out
+
+    def close(self):
+        with self._cond:
+            if self._recheck is not None:
+                self._recheck.cancel()
+                self._recheck = None
+            self._subscribers.clear()
+        self.device.when_activated = None
+        self.device.when_deactivated = None
@@ -1,72 +1,201 @@
-import yaml
+import threading
+import time
+from collections import deque
+
 from gpiozero import LED, Button, OutputDevice, PWMOutputDevice
 
+from core.config import get_config_store
+from core.gpio_events import InputEdges
+from core.hardware_backend import get_hardware_backend, is_simulated, use_mock_pin_factory
+
 
 class GPIOManager:
-    def __init__(self, config_path="config.yaml"):
+    def __init__(self, config_path="config.yaml", backend=None):
         self.devices = {}
-        self.config = self._load_config(config_path)
-        self._validate_config()
+        self.inputs = {}        # naam -> InputEdges (flank-events per button)
+        # Gevalideerde config (core/config.py): naam -> GPIODeviceConfig
+        store = get_config_store(config_path)
+        self.config = store.current.gpio
+
+        # real | mock | sim (zie core/hardware_backend.py)
+        self.backend = backend or get_hardware_backend(config_path)
+        self.simulated = is_simulated(self.backend)
+        if self.simulated:
+            use_mock_pin_factory()
+
+        # Zonder hardware: elke pin-wissel opnemen als (perf_counter, naam, waarde)
+        self.transitions = deque(maxlen=100000) if self.simulated else None
+
+        # Laatst geschreven waarde per output (voor apply(): alleen wijzigingen schrijven)
+        self._lock = threading.RLock()
+        self._state = {}
+        self.state_version = 0
+        self._stats = {
+            "writes": 0,            # echte pin-writes
+            "skipped": 0,           # writes overgeslagen (waarde ongewijzigd)
+            "transactions": 0,      # apply()-aanroepen
+            "latency_total_s": 0.0,
+            "latency_max_s": 0.0,
+        }
+
         self._init_devices()
+        store.subscribe(self._apply_tuning)
 
     # ---------- CONFIG ----------
-    def _load_config(self, path):
-        with open(path, "r") as f:
-            return yaml.safe_load(f)["gpio"]
-
-    def _validate_config(self):
-        used_pins = set()
-        valid_types = {"led", "output", "pwm", "button"}
-
-        for name, cfg in self.config.items():
-            pin = cfg["pin"]
-            t = cfg["type"]
-
-            if pin in used_pins:
-                raise ValueError(f"GPIO {pin} wordt dubbel gebruikt")
-
-            if t not in valid_types:
-                raise ValueError(f"Onbekend type '{t}' bij {name}")
-
-            used_pins.add(pin)
+    def _apply_tuning(self, config):
+        """Hot reload: debounce van de inputs bijwerken."""
+        self.config = config.gpio
+        for name, inp in self.inputs.items():
+            inp.debounce_s = config.gpio[name].debounce_ms * 1e-3
 
     # ---------- INIT ----------
     def _init_devices(self):
         for name, cfg in self.config.items():
-            t = cfg["type"]
-            pin = cfg["pin"]
+            t = cfg.type
+            pin = cfg.pin
 
             if t == "led":
                 self.devices[name] = LED(pin, initial_value=False)
+                self._state[name] = 0
 
             elif t == "output":
                 self.devices[name] = OutputDevice(
                     pin,
-                    active_high=cfg.get("active_high", True),
+                    active_high=cfg.active_high,
                     initial_value=False
                 )
+                self._state[name] = 0
 
             elif t == "pwm":
                 self.devices[name] = PWMOutputDevice(
                     pin,
-                    frequency=cfg.get("frequency", 1000)
+                    frequency=cfg.frequency
                 )
+                self._state[name] = 0.0
 
             elif t == "button":
                 self.devices[name] = Button(
                     pin,
-                    pull_up=cfg.get("pull_up", True)
+                    pull_up=cfg.pull_up
+                )
+                # Debounce gebeurt in InputEdges (bounce_time van gpiozero
+                # gooit flanken weg en kan een verkeerd eindniveau geven)
+                self.inputs[name] = InputEdges(
+                    name,
+                    self.devices[name],
+                    debounce_ms=cfg.debounce_ms,
+                    buffer_size=cfg.edge_buffer,
                 )
 
     # ---------- API ----------
     def on(self, name):
-        self.devices[name].on()
+        self.apply({name: 1})
 
     def off(self, name):
-        self.devices[name].off()
+        self.apply({name: 0})
 
     def set_value(self, name, value):
-        self.devices[name].value = value
+        self.apply({name: value})
+
+    def apply(self, states, order=None):
+        """
+        Zet meerdere outputs in één transactie (atomair t.o.v. andere threads).
+        states: {naam: waarde}; led/output: 0/1 (of bool), pwm: 0.0..1.0.
+
+        - Alleen waarden die echt veranderen worden geschreven.
+        - Volgorde: eerst alles wat omlaag gaat, daarna wat omhoog gaat, zodat
+          er tussendoor nooit méér aan staat dan vóór of ná de transactie
+          (bv. nooit beide PWM-kanalen tegelijk actief bij omkeren).
+          Met `order` (lijst namen) kan een vaste volgorde worden opgegeven.
+        Geeft het aantal echte writes terug.
+        """
+        t0 = time.perf_counter()
+        with self._lock:
+            state = self._state
+            changes = []
+            for name, value in states.items():
+                value = float(value) if isinstance(state.get(name), float) else int(bool(value))
+                if state.get(name) == value:
+                    continue
+                changes.append((name, value))
+
+            if order is None:
+                changes.sort(key=lambda c: c[1] > state.get(c[0], 0))
+            else:
+                rank = {n: i for i, n in enumerate(order)}
+                changes.sort(key=lambda c: rank.get(c[0], len(rank)))
+
+            for name, value in changes:
+                self.devices[name].value = value
+                state[name] = value
+                if self.transitions is not None:
+                    self.transitions.append((time.perf_counter(), name, value))
+
+            if changes:
+                self.state_version += 1
+
+            dt = time.perf_counter() - t0
+            stats = self._stats
+            stats["writes"] += len(changes)
+            stats["skipped"] += len(states) - len(changes)
+            stats["transactions"] += 1
+            stats["latency_total_s"] += dt
+            if dt > stats["latency_max_s"]:
+                stats["latency_max_s"] = dt
+        return len(changes)
+
+    def drive_input(self, name, active):
+        """
+        Alleen mock/sim: stuur een input (button) aan alsof de sensor
+        schakelt. Houdt rekening met pull_up (actief = LOW).
+        """
+        if not self.simulated:
+            raise RuntimeError("drive_input() kan alleen met de mock/sim backend")
+
+        pin = self.devices[name].pin
+        active_low = self.config[name].pull_up
+        if bool(active) != active_low:
+            pin.drive_high()
+        else:
+            pin.drive_low()
+        with self._lock:
+            self.transitions.append((time.perf_counter(), name, int(bool(active))))
+
+    def get_transitions(self, name=None):
+        """Opgenomen pin-wissels (mock/sim), optioneel gefilterd op naam."""
+        if self.transitions is None:
+            return []
+        with self._lock:
+            events = list(self.transitions)
+        if name is None:
+            return events
+        return [e for e in events if e[1] == name]
+
+    def get_state(self, name):
+        """Laatst geschreven waarde van een output."""
+        with self._lock:
+            return self._state.get(name)
+
+    def write_stats(self):
+        """Write-tellers en latency van apply() (in us)."""
+        with self._lock:
+            s = dict(self._stats)
+        n = s.pop("transactions")
+        total = s.pop("latency_total_s")
+        s["transactions"] = n
+        s["latency_mean_us"] = (total / n) * 1e6 if n else 0.0
+        s["latency_max_us"] = s.pop("latency_max_s") * 1e6
+        return s
+
+    def edges(self, name):
+        """Flank-events van een input (zie core/gpio_events.py)."""
+        try:
+            return self.inputs[name]
+        except KeyError:
+            raise ValueError(f"'{name}' is geen input (type button)") from None
+
+    def edge_stats(self):
+        return {name: inp.stats() for name, inp in self.inputs.items()}
 
     def is_pressed(self, name):
         return self.devices[name].is_pressed
@@ -76,5 +205,7 @@ class GPIOManager:
 
     # ---------- SHUTDOWN ----------
     def shutdown(self):
+        for inp in self.inputs.values():
+            inp.close()
         for dev in self.devices.values():
             dev.close()
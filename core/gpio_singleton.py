@@ -1,5 +1,62 @@
 # core/gpio_singleton.py
+import os
+import threading
+
 from core.gpio_manager import GPIOManager
 
-# Eén gedeelde GPIOManager voor de hele applicatie
-gpio = GPIOManager("config.yaml")
\ No newline at end of file
+# Eén gedeelde GPIOManager voor de hele applicatie. Wordt pas bij het eerste
+# gebruik aangemaakt (get_gpio() of een attribuut van `gpio`), zodat een
+# import geen GPIO-devices opent.
+DEFAULT_CONFIG = "config.yaml"
+
+_gpio = None
+_gpio_path = None          # absoluut pad van de config waarmee _gpio is gemaakt
+_gpio_lock = threading.Lock()
+
+
+def get_gpio(config_path=None):
+    """Geeft de gedeelde GPIOManager.
+
+    Zonder config_path wordt het pad van de bestaande manager gebruikt (of
+    config.yaml als er nog geen is). Een ander pad dan waarmee de manager al
+    gemaakt is geeft een ValueError: de pinnen zijn dan al volgens die config
+    geclaimd.
+    """
+    global _gpio, _gpio_path
+    path = os.path.abspath(config_path) if config_path is not None else None
+    gpio, current = _gpio, _gpio_path
+    if gpio is None or (path is not None and path != current):
+        with _gpio_lock:
+            if _gpio is None:
+                _gpio_path = path or os.path.abspath(DEFAULT_CONFIG)
+                _gpio = GPIOManager(_gpio_path)
+            elif path is not None and path != _gpio_path:
+                raise ValueError(
+                    f"GPIOManager is al gemaakt met {_gpio_path}, niet met {path}")
+            gpio = _gpio
+    return gpio
+
+
+def gpio_config_path():
+    """Pad van de config waarmee de gedeelde GPIOManager is gemaakt (None als die er nog niet is)."""
+    return _gpio_path
+
+
+def close_gpio():
+    """Sluit de gedeelde GPIOManager af; een volgende get_gpio() maakt een nieuwe."""
+    global _gpio, _gpio_path
+    with _gpio_lock:
+        gpio, _gpio, _gpio_path = _gpio, None, None
+    if gpio is not None:
+        gpio.shutdown()
+
+
+class _LazyGPIO:
+    """Proxy naar de gedeelde GPIOManager; maakt hem aan bij eerste gebruik."""
+
+    def __getattr__(self, name):
+        # Zonder pad: de proxy volgt de config waarmee de manager al bestaat
+        return getattr(get_gpio(), name)
+
+
+gpio = _LazyGPIO()
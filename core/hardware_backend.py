@@ -0,0 +1,47 @@
+# core/hardware_backend.py
+"""
+Keuze van de hardware-backend voor de hele applicatie.
+
+  real - echte Raspberry Pi (gpiozero default pin factory, RPi.GPIO/libgpiod)
+  mock - geen hardware: gpiozero MockFactory + FakeStepBackend; alle
+         pin-wissels worden met tijdstempel opgenomen
+  sim  - als mock, plus een gesimuleerde wagen (encoder, homing-sensor)
+
+Volgorde: omgevingsvariabele TRANSPORT_HW_BACKEND, anders `hardware.backend`
+in config.yaml, anders "real".
+"""
+import os
+
+ENV_VAR = "TRANSPORT_HW_BACKEND"
+VALID_BACKENDS = ("real", "mock", "sim")
+
+
+def get_hardware_backend(config_path="config.yaml"):
+    kind = os.environ.get(ENV_VAR)
+
+    if not kind:
+        from core.config import get_config
+
+        try:
+            kind = get_config(config_path).hardware_backend
+        except FileNotFoundError:
+            kind = "real"
+
+    kind = str(kind).lower().strip()
+    if kind not in VALID_BACKENDS:
+        raise ValueError(f"Onbekende hardware backend '{kind}' (kies uit {VALID_BACKENDS})")
+    return kind
+
+
+def is_simulated(kind):
+    return kind in ("mock", "sim")
+
+
+def use_mock_pin_factory():
+    """Zet gpiozero op de mock pin factory (met PWM-ondersteuning)."""
+    from gpiozero import Device
+    from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+    if not isinstance(Device.pin_factory, MockFactory):
+        Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+    return Device.pin_factory
@@ -5,14 +5,15 @@ from typing import Optional
 
 from hardware.encoder import read_encoder_angle_deg
 from hardware.motor_controller import TransportMotor
-from core.homing import is_home_sensor_xaxis_active
-
-MM_PER_REV = 90.19
+from hardware.motor_ramp import RampedMotor, make_x_motor
+from core.config import get_config
 
 
 def load_station_positions(csv_path: Path | str | None = None) -> dict[int, float]:
     if csv_path is None:
-        csv_path = Path(__file__).resolve().parents[1] / "data" / "stations.csv"
+        # Stations uit de store (core/store.py); een CSV alleen als die expliciet gegeven is
+        from core.stations import load_stations
+        return {sid: float(st.positie) for sid, st in load_stations().items()}
     csv_path = Path(csv_path)
 
     positions: dict[int, float] = {}
@@ -26,7 +27,9 @@ def load_station_positions(csv_path: Path | str | None = None) -> dict[int, floa
 
 
 class EncoderTracker:
-    def __init__(self):
+    def __init__(self, mm_per_rev: float | None = None):
+        # mm per omwenteling: x_axis.mm_per_rev in config.yaml (zelfde als de HMI)
+        self.mm_per_rev = get_config().x_axis.mm_per_rev if mm_per_rev is None else float(mm_per_rev)
         self.last_angle: Optional[float] = None
         self.angle_abs: float = 0.0
 
@@ -37,7 +40,7 @@ class EncoderTracker:
 
         if self.last_angle is None:
             self.last_angle = angle
-            return (self.angle_abs / 360.0) * MM_PER_REV
+            return (self.angle_abs / 360.0) * self.mm_per_rev
 
         d = angle - self.last_angle
 
@@ -49,23 +52,56 @@ class EncoderTracker:
         self.angle_abs += d
         self.last_angle = angle
 
-        return (self.angle_abs / 360.0) * MM_PER_REV
+        return (self.angle_abs / 360.0) * self.mm_per_rev
 
     def reset_zero(self):
         self.last_angle = None
         self.angle_abs = 0.0
 
 
+class ReaderEncoderTracker:
+    """
+    Zelfde API als EncoderTracker, maar op de Arduino-reader + EncoderState
+    van de HMI (positie t.o.v. home, zoals /api/encoder).
+    """
+
+    def __init__(self, reader, encoder_state):
+        self.reader = reader
+        self.encoder_state = encoder_state
+
+    def _raw(self) -> Optional[float]:
+        data = self.reader.get_latest()
+        if not data.get("ok") or data.get("angle_deg") is None:
+            return None
+        return float(data["angle_deg"])
+
+    def update_mm(self) -> Optional[float]:
+        raw = self._raw()
+        if raw is None:
+            return None
+        return self.encoder_state.get_position_mm(raw)
+
+    def reset_zero(self):
+        raw = self._raw()
+        if raw is None:
+            raise RuntimeError("Geen encodermeting voor reset_zero")
+        self.encoder_state.set_home_offset(raw)
+
+
 class LinearAxisController:
     def __init__(
         self,
-        motor: TransportMotor | None = None,
-        encoder: EncoderTracker | None = None,
-        home_sensor=is_home_sensor_xaxis_active,
+        motor: TransportMotor | RampedMotor | None = None,
+        encoder: EncoderTracker | ReaderEncoderTracker | None = None,
+        homing=None,
+        forward_increases: bool = True,
     ):
-        self.motor = motor or TransportMotor()
+        self.motor = motor or make_x_motor()
         self.encoder = encoder or EncoderTracker()
-        self.home_sensor = home_sensor
+        # hardware/homing2.HomingController: de enige homing-routine
+        self.homing = homing
+        # forward() laat de positie toenemen (HMI: homing forward = naar 0, dus False)
+        self.forward_increases = forward_increases
 
     # -----------------------------
     # Basis functies
@@ -78,46 +114,28 @@ class LinearAxisController:
     # Homing
     # -----------------------------
 
-    def home(
-        self,
-        fast_speed: float = 0.6,
-        slow_speed: float = 0.2,
-        timeout_s: float = 20.0,
-    ) -> bool:
-
-        start = time.monotonic()
-
-        # FASE 1: zoek homing sensor (snel)
-        self.motor.backward(fast_speed)
-        while not self.home_sensor():
-            if time.monotonic() - start > timeout_s:
-                self.motor.stop(brake=True)
+    def home(self, timeout_s: float = 60.0, poll_s: float = 0.05) -> bool:
+        """
+        Homing via de HomingController (hardware/homing2.py): snel naderen,
+        terugrijden, langzaam opnieuw raken en home op de sensorflank.
+        Blokkeert tot de run klaar is; False bij een fout, annulering of timeout.
+        """
+        if self.homing is None:
+            raise RuntimeError("Geen HomingController opgegeven (zie HMIRuntime)")
+        if not self.homing.start():
+            raise RuntimeError("Homing loopt al")
+
+        deadline = time.monotonic() + timeout_s
+        while self.homing.status()["running"]:
+            if time.monotonic() > deadline:
+                # De controller stopt de motor zelf bij het afbreken
+                self.homing.cancel()
+                while self.homing.status()["running"]:
+                    time.sleep(poll_s)
                 return False
-            time.sleep(0.01)
-
-        self.motor.stop(brake=True)
-        time.sleep(0.2)
-
-        # FASE 2: loskomen
-        self.encoder.reset_zero()
-        self.motor.forward(slow_speed)
-
-        while self.home_sensor():
-            time.sleep(0.01)
-
-        self.motor.stop(brake=True)
-        time.sleep(0.2)
-
-        # FASE 3: langzaam opnieuw raken
-        self.motor.backward(slow_speed)
-        while not self.home_sensor():
-            time.sleep(0.01)
-
-        self.motor.stop(brake=True)
-
-        # Definitieve nulpositie
-        self.encoder.reset_zero()
-        return True
+            time.sleep(poll_s)
+        result = self.homing.status()["last_result"] or {}
+        return bool(result.get("success"))
 
     # -----------------------------
     # Positioneren
@@ -144,53 +162,44 @@ class LinearAxisController:
                 time.sleep(0.05)
                 continue
 
-            error = target_mm - pos
-
-            if abs(error) <= tolerance_mm:
-                self.motor.stop(brake=False)
+            if self.drive_towards(target_mm, pos, speed=speed, tolerance_mm=tolerance_mm,
+                                  slow_zone_mm=slow_zone_mm):
                 return True
 
-            # Snelheid afbouwen dichtbij doel
-            cmd_speed = speed
-            if abs(error) < slow_zone_mm:
-                cmd_speed = min(speed, 0.25)
-
-            if error > 0:
-                self.motor.forward(cmd_speed)
-            else:
-                self.motor.backward(cmd_speed)
-
             if time.monotonic() - start > timeout_s:
                 self.motor.stop(brake=True)
                 return False
 
             time.sleep(0.05)
 
-    # -----------------------------
-    # Stations
-    # -----------------------------
-
-    def move_between_station_ids(
+    def drive_towards(
         self,
-        pickup_id: int,
-        dropoff_id: int,
+        target_mm: float,
+        pos: float,
         speed: float = 0.6,
-    ) -> None:
-
-        positions = load_station_positions()
-
-        if pickup_id not in positions:
-            raise KeyError(f"Pickup station {pickup_id} niet gevonden")
-        if dropoff_id not in positions:
-            raise KeyError(f"Dropoff station {dropoff_id} niet gevonden")
-
-        p_from = positions[pickup_id]
-        p_to = positions[dropoff_id]
-
-        if not self.goto_position_mm(p_from, speed=speed):
-            raise RuntimeError("Timeout bij rijden naar pickup")
-
-        time.sleep(0.5)
-
-        if not self.goto_position_mm(p_to, speed=speed):
-            raise RuntimeError("Timeout bij rijden naar dropoff")
+        tolerance_mm: float = 2.0,
+        slow_zone_mm: float = 10.0,
+        slow_speed: float = 0.25,
+        brake: bool = False,
+    ) -> bool:
+        """
+        Eén regelstap richting target_mm (niet-blokkerend, voor eigen loops
+        zoals core/shuttle.py). True als pos binnen tolerance ligt; de motor
+        is dan gestopt.
+        """
+        error = target_mm - pos
+
+        if abs(error) <= tolerance_mm:
+            self.motor.stop(brake=brake)
+            return True
+
+        # Snelheid afbouwen dichtbij doel
+        cmd_speed = speed
+        if abs(error) < slow_zone_mm:
+            cmd_speed = min(speed, slow_speed)
+
+        if (error > 0) == self.forward_increases:
+            self.motor.forward(cmd_speed)
+        else:
+            self.motor.backward(cmd_speed)
+        return False
@@ -0,0 +1,432 @@
+# core/shuttle.py
+"""
+Shuttle: volledige pick-and-place cyclus als state machine boven op de
+as-controllers (X: LinearAxisController, Y: TB6600Stepper).
+
+Eén job = pickup-station -> dropoff-station, in vaste fasen:
+
+  travel_pickup    X naar het pickup-station
+  extend_pickup    Y uitschuiven naar de kant van het station (L = -, R = +)
+  grab             pakken
+  retract_pickup   Y intrekken
+  travel_dropoff   X naar het dropoff-station
+  extend_dropoff   Y uitschuiven
+  release          loslaten
+  retract_dropoff  Y intrekken
+
+Overgangen zijn bevestigd in plaats van vaste sleeps:
+  - X is aangekomen als de encoderpositie binnen x_tolerance_mm ligt én de
+    snelheid (gemeten over x_settle_window_s) al x_settle_dwell_s onder
+    x_settle_mm_s is;
+  - Y is uitgeschoven als de stepper stilstaat op het doel (y_tolerance_mm);
+  - pakken/loslaten wacht op grip_sensor (indien ingesteld), anders grip_s.
+
+Pipelining (pipeline: true): een retract-fase is klaar zodra |Y| kleiner is
+dan y_clear_mm; X vertrekt dan terwijl Y het laatste stuk intrekt (ook naar
+het pickup-station van de volgende job). Tijdens travel wordt elke tick
+gecontroleerd dat Y binnen y_clear_mm blijft en niet naar buiten beweegt.
+Een extend-fase start pas als Y helemaal stilstaat.
+
+Per job worden de fase-tijden vastgelegd (en als job + moves in de store);
+stats() geeft per fase gemiddelde/p95/max over de laatste stats_jobs jobs.
+
+  shuttle = Shuttle(x_axis, stepper, store=get_store()).start()
+  job_id = shuttle.submit(pickup=1, dropoff=3)
+  shuttle.job(job_id), shuttle.status(), shuttle.cancel()
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from core.stations import Station, load_stations
+
+PHASES = ("travel_pickup", "extend_pickup", "grab", "retract_pickup",
+          "travel_dropoff", "extend_dropoff", "release", "retract_dropoff")
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+
+class ShuttleError(RuntimeError):
+    """Cyclus afgebroken (timeout, safety-trip, Y niet vrij, ...)."""
+
+
+@dataclass
+class ShuttleJob:
+    id: int
+    pickup: int
+    dropoff: int
+    state: str = "queued"
+    phase: Optional[str] = None
+    phases: dict = field(default_factory=dict)      # fase -> duur (s)
+    overlap_s: float = 0.0                          # X rijdt terwijl Y nog intrekt
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id, "pickup": self.pickup, "dropoff": self.dropoff, "state": self.state,
+            "phase": self.phase, "phases_s": {k: round(v, 3) for k, v in self.phases.items()},
+            "overlap_s": round(self.overlap_s, 3), "error": self.error,
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "cycle_s": None if self.finished is None or self.started is None
+            else round(self.finished - self.started, 3),
+        }
+
+
+class Shuttle:
+    def __init__(self, x_axis, stepper, cfg, *, gpio=None, store=None, safety=None,
+                 is_homed=None, history=100):
+        """
+        x_axis:   LinearAxisController (drive_towards + current_position_mm)
+        stepper:  TB6600Stepper (move_to_mm, position_mm, is_moving, stop)
+        cfg:      ShuttleConfig (core/config.py); apply_tuning() vervangt hem
+        is_homed: callable; zonder home-referentie worden jobs geweigerd
+        """
+        self.x = x_axis
+        self.stepper = stepper
+        self.cfg = cfg
+        self.gpio = gpio
+        self.store = store
+        self.safety = safety
+        self.is_homed = is_homed
+
+        self._cond = threading.Condition()
+        self._queue: deque[ShuttleJob] = deque()
+        self._jobs: dict[int, ShuttleJob] = {}
+        self._history = int(history)
+        self._ids = itertools.count(1)
+        self._current: Optional[ShuttleJob] = None
+        self._cancel = threading.Event()
+        self._closed = False
+        self._durations = {name: deque(maxlen=cfg.stats_jobs) for name in PHASES}
+        self._cycles = deque(maxlen=cfg.stats_jobs)
+        self._counts = {state: 0 for state in JOB_STATES if state not in ("queued", "running")}
+
+        # Y intrekken loopt door na een (gepipelinede) retract-fase
+        self._y_retract_t = None
+
+        self._thread = None
+
+    def apply_tuning(self, cfg):
+        """Hot reload (shuttle.*): geldt vanaf de volgende job; stats_jobs direct."""
+        with self._cond:
+            self.cfg = cfg
+            if cfg.stats_jobs != self._cycles.maxlen:
+                # Nieuwe venstergrootte, met behoud van de laatste metingen
+                self._durations = {name: deque(d, maxlen=cfg.stats_jobs)
+                                   for name, d in self._durations.items()}
+                self._cycles = deque(self._cycles, maxlen=cfg.stats_jobs)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="shuttle", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    # ---------- jobs ----------
+    @property
+    def busy(self) -> bool:
+        """True zolang er een job loopt of wacht (handbediening is dan geblokkeerd)."""
+        with self._cond:
+            return self._current is not None or bool(self._queue)
+
+    def submit(self, pickup: int, dropoff: int) -> int:
+        """Zet een job in de wachtrij; ValueError bij onbekende stations of zonder home."""
+        stations = load_stations()
+        for sid in (pickup, dropoff):
+            if sid not in stations:
+                raise ValueError(f"Station {sid} niet gevonden")
+        if pickup == dropoff:
+            raise ValueError("pickup en dropoff zijn hetzelfde station")
+        if self.is_homed is not None and not self.is_homed():
+            raise ValueError("X-as is niet gehomed")
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Shuttle is gestopt")
+            if self.store is not None:
+                job_id = self.store.create_job(source=pickup, target=dropoff)
+            else:
+                job_id = next(self._ids)
+            job = ShuttleJob(job_id, int(pickup), int(dropoff))
+            self._jobs[job_id] = job
+            while len(self._jobs) > self._history:
+                self._jobs.pop(next(iter(self._jobs)))
+            self._queue.append(job)
+            self._cond.notify()
+        return job_id
+
+    def cancel(self) -> int:
+        """Breek de lopende job af en gooi de wachtrij leeg. Geeft het aantal jobs terug."""
+        with self._cond:
+            dropped = list(self._queue)
+            self._queue.clear()
+            running = self._current is not None
+            if running:
+                self._cancel.set()
+        for job in dropped:
+            self._finish(job, "cancelled", "geannuleerd")
+        return len(dropped) + int(running)
+
+    def job(self, job_id: int) -> Optional[dict]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.as_dict()
+
+    # ---------- uitvoeren ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._queue.popleft()
+                self._current = job
+                self._cancel.clear()
+                cfg = self.cfg
+
+            try:
+                self._execute(job, cfg)
+                self._finish(job, "done", None)
+            except Exception as e:
+                self._stop_axes()
+                state = "cancelled" if self._cancel.is_set() else "failed"
+                if state == "failed":
+                    print(f"Error in shuttle (job {job.id}, {job.phase}):", e)
+                self._finish(job, state, str(e))
+            finally:
+                with self._cond:
+                    self._current = None
+
+    def _finish(self, job, state, error):
+        job.state = state
+        job.error = error
+        job.finished = time.time()
+        with self._cond:
+            self._counts[state] += 1
+            if state == "done":
+                for name, d in job.phases.items():
+                    self._durations[name].append(d)
+                self._cycles.append(job.finished - job.started)
+        if self.store is not None:
+            try:
+                self.store.update_job(job.id, state=state, finished_at=job.finished, error=error)
+            except Exception as e:
+                print("Error in shuttle (store):", e)
+
+    def _stop_axes(self):
+        try:
+            self.x.motor.stop(brake=True)
+        except Exception as e:
+            print("Error in shuttle (X stop):", e)
+        try:
+            self.stepper.stop()
+        except Exception as e:
+            print("Error in shuttle (Y stop):", e)
+
+    def _execute(self, job, cfg):
+        stations = load_stations()
+        pickup, dropoff = stations.get(job.pickup), stations.get(job.dropoff)
+        if pickup is None or dropoff is None:
+            raise ShuttleError("Station verwijderd na het plannen van de job")
+
+        job.state = "running"
+        job.started = time.time()
+        if self.store is not None:
+            self.store.update_job(job.id, state="running", started_at=job.started)
+        trips = None if self.safety is None else self.safety.trip_count()
+
+        plan = (
+            ("travel_pickup", self._travel, pickup),
+            ("extend_pickup", self._extend, pickup),
+            ("grab", self._grip, True),
+            ("retract_pickup", self._retract, pickup),
+            ("travel_dropoff", self._travel, dropoff),
+            ("extend_dropoff", self._extend, dropoff),
+            ("release", self._grip, False),
+            ("retract_dropoff", self._retract, dropoff),
+        )
+        period = 1.0 / cfg.tick_hz
+        for name, phase, arg in plan:
+            job.phase = name
+            t0 = time.monotonic()
+            poll = phase(job, cfg, arg)         # enter; geeft de poll-functie terug
+            while not poll():
+                if self._cancel.is_set():
+                    raise ShuttleError("Job geannuleerd")
+                if trips is not None and self.safety.trip_count() != trips:
+                    raise ShuttleError("Safety-trip tijdens de cyclus")
+                time.sleep(period)
+            job.phases[name] = time.monotonic() - t0
+        job.phase = None
+
+    # ---------- fasen: enter -> poll() ----------
+    def _deadline(self, timeout_s, what):
+        deadline = time.monotonic() + timeout_s
+
+        def check():
+            if time.monotonic() > deadline:
+                raise ShuttleError(f"Timeout ({timeout_s:.0f} s) bij {what}")
+        return check
+
+    def _y_clear(self, cfg):
+        return abs(self.stepper.position_mm) <= cfg.y_clear_mm
+
+    def _track_retract(self, job):
+        """Houd bij hoe lang Y na een gepipelinede retract nog doorloopt (overlap)."""
+        if self._y_retract_t is not None and not self.stepper.is_moving:
+            job.overlap_s += time.monotonic() - self._y_retract_t
+            self._y_retract_t = None
+
+    def _travel(self, job, cfg, station: Station):
+        target = float(station.positie)
+        timeout = self._deadline(cfg.x_timeout_s, f"rijden naar station {station.id}")
+        t_start, start_mm = time.time(), self.x.current_position_mm()
+        # (t, pos) over minstens x_settle_window_s: opeenvolgende ticks geven vaak dezelfde meting
+        samples = deque()
+        state = {"stopped": False, "settled_since": None}
+
+        def speed_mm_s(now, pos):
+            samples.append((now, pos))
+            while len(samples) > 1 and now - samples[1][0] >= cfg.x_settle_window_s:
+                samples.popleft()
+            t0, p0 = samples[0]
+            if now - t0 < cfg.x_settle_window_s:
+                return float("inf")         # venster nog niet gevuld
+            return abs(pos - p0) / (now - t0)
+
+        def poll():
+            timeout()
+            self._track_retract(job)
+            # Y moet binnen de vrije zone blijven zolang X rijdt
+            if not self._y_clear(cfg):
+                raise ShuttleError(f"Y niet vrij ({self.stepper.position_mm:.1f} mm) tijdens rijden")
+            pos = self.x.current_position_mm()
+            if pos is None:
+                return False
+            now = time.monotonic()
+            speed = speed_mm_s(now, pos)
+
+            if state["stopped"] and abs(target - pos) <= cfg.x_tolerance_mm:
+                in_pos = True       # al gestopt: wachten tot de wagen stilstaat
+            else:
+                in_pos = self.x.drive_towards(target, pos, speed=cfg.x_speed,
+                                              tolerance_mm=cfg.x_tolerance_mm,
+                                              slow_zone_mm=cfg.x_slow_zone_mm,
+                                              slow_speed=cfg.x_slow_speed, brake=True)
+            state["stopped"] = in_pos
+
+            # Aangekomen: binnen tolerance én stil, en dat gedurende x_settle_dwell_s
+            if not (in_pos and speed <= cfg.x_settle_mm_s):
+                state["settled_since"] = None
+                return False
+            if state["settled_since"] is None:
+                state["settled_since"] = now
+            if now - state["settled_since"] < cfg.x_settle_dwell_s:
+                return False
+            self._record_move(job, "x", t_start, start_mm, target, pos, True)
+            return True
+        return poll
+
+    def _extend(self, job, cfg, station: Station):
+        target = -cfg.y_extend_mm if station.richting == "L" else cfg.y_extend_mm
+        timeout = self._deadline(cfg.y_timeout_s, f"uitschuiven bij station {station.id}")
+        state = {"issued": False, "t": time.time(), "start": self.stepper.position_mm}
+
+        def poll():
+            timeout()
+            self._track_retract(job)
+            if not state["issued"]:
+                # Pas uitschuiven als Y helemaal stilstaat (intrekken kan nog lopen)
+                if self.stepper.is_moving:
+                    return False
+                state.update(issued=True, t=time.time(), start=self.stepper.position_mm)
+                self.stepper.move_to_mm(target, speed_mm_s=cfg.y_speed_mm_s)
+                return False
+            y = self.stepper.position_mm
+            if not self.stepper.is_moving and abs(y - target) <= cfg.y_tolerance_mm:
+                self._record_move(job, "y", state["t"], state["start"], target, y, True)
+                return True
+            return False
+        return poll
+
+    def _retract(self, job, cfg, station: Station):
+        timeout = self._deadline(cfg.y_timeout_s, f"intrekken bij station {station.id}")
+        t_start, start = time.time(), self.stepper.position_mm
+        self.stepper.move_to_mm(0.0, speed_mm_s=cfg.y_speed_mm_s)
+
+        def poll():
+            timeout()
+            y = self.stepper.position_mm
+            if cfg.pipeline and self._y_clear(cfg):
+                # X mag al vertrekken; Y trekt het laatste stuk in
+                if self.stepper.is_moving:
+                    self._y_retract_t = time.monotonic()
+                self._record_move(job, "y", t_start, start, 0.0, y, True)
+                return True
+            if not self.stepper.is_moving and abs(y) <= cfg.y_tolerance_mm:
+                self._record_move(job, "y", t_start, start, 0.0, y, True)
+                return True
+            return False
+        return poll
+
+    def _grip(self, job, cfg, grab: bool):
+        what = "pakken" if grab else "loslaten"
+        if cfg.grip_sensor is None or self.gpio is None:
+            until = time.monotonic() + cfg.grip_s
+            return lambda: time.monotonic() >= until
+
+        timeout = self._deadline(cfg.grip_timeout_s, what)
+        edges = self.gpio.edges(cfg.grip_sensor)
+
+        def poll():
+            timeout()
+            # Sensor actief = product in de grijper
+            return bool(edges.level) == grab
+        return poll
+
+    def _record_move(self, job, axis, started_at, start_mm, target_mm, end_mm, success):
+        if self.store is None:
+            return
+        self.store.record_move(axis=axis, job_id=job.id, started_at=started_at,
+                               duration_s=time.time() - started_at, start_mm=start_mm,
+                               target_mm=target_mm, end_mm=end_mm, success=success)
+
+    # ---------- status ----------
+    def status(self) -> dict:
+        with self._cond:
+            current = None if self._current is None else self._current.as_dict()
+            queued = [job.id for job in self._queue]
+            counts = dict(self._counts)
+        return {"busy": current is not None or bool(queued), "current": current,
+                "queued": queued, "jobs": counts, "stats": self.stats()}
+
+    def stats(self) -> dict:
+        """Per fase en per cyclus: gemiddelde, p95 en max (s) over de laatste jobs."""
+        def summary(values):
+            a = np.array(values)
+            return {"n": int(a.size), "mean_s": round(float(a.mean()), 3),
+                    "p95_s": round(float(np.percentile(a, 95)), 3),
+                    "max_s": round(float(a.max()), 3)}
+
+        with self._cond:
+            phases = {name: summary(d) for name, d in self._durations.items() if d}
+            cycle = summary(self._cycles) if self._cycles else None
+        return {"phases": phases, "cycle": cycle}
@@ -0,0 +1,115 @@
+# core/stations.py
+"""
+Stations van de baan (id, naam, positie in mm, richting L/R).
+
+De stations staan in de SQLite-store (core/store.py); data/stations.csv
+wordt alleen nog gebruikt voor import (lege database) en export.
+
+Elke schrijfactie controleert de volledige lijst zoals die erna is
+(check_stations): richting L/R, positie binnen stations.min_mm/max_mm en
+minimaal stations.min_spacing_mm tussen twee stations (config.yaml).
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable
+
+STATIONS_FILE = "data/stations.csv"
+CSV_HEADER = ["id", "naam", "positie", "richting"]
+
+
+@dataclass
+class Station:
+    id: int
+    naam: str
+    positie: int
+    richting: str  # "L" or "R"
+
+    def __post_init__(self):
+        if self.richting.upper() not in ("L", "R"):
+            raise ValueError("Richting moet 'L' of 'R' zijn.")
+        self.richting = self.richting.upper()
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "naam": self.naam, "positie": self.positie, "richting": self.richting}
+
+
+class StationError(ValueError):
+    """Een of meer ongeldige stations; `errors` bevat alle meldingen."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+def station_from_dict(data, where="station", station_id=None) -> Station:
+    """Station uit JSON/CSV-velden; StationError met alle fouten van dit station."""
+    if not isinstance(data, dict):
+        raise StationError([f"{where}: verwacht een object"])
+    data = dict(data)
+    if station_id is not None:
+        data.setdefault("id", station_id)
+
+    errors = []
+    values = {}
+    for key, conv in (("id", int), ("positie", lambda v: int(round(float(v))))):
+        try:
+            values[key] = conv(data[key])
+        except KeyError:
+            errors.append(f"{where}.{key}: ontbreekt")
+        except (TypeError, ValueError):
+            errors.append(f"{where}.{key}: ongeldig getal {data[key]!r}")
+    naam = str(data.get("naam", "")).strip()
+    if not naam:
+        errors.append(f"{where}.naam: mag niet leeg zijn")
+    richting = str(data.get("richting", "")).strip().upper()
+    if richting not in ("L", "R"):
+        errors.append(f"{where}.richting: moet 'L' of 'R' zijn")
+    if station_id is not None and "id" in values and values["id"] != int(station_id):
+        errors.append(f"{where}.id: komt niet overeen met de URL ({station_id})")
+    if errors:
+        raise StationError(errors)
+    return Station(id=values["id"], naam=naam, positie=values["positie"], richting=richting)
+
+
+def check_stations(stations: Iterable[Station], rules=None) -> None:
+    """
+    Controleer een volledige stationslijst in één keer (StationError met
+    alle fouten). rules: StationsConfig; standaard uit config.yaml.
+    """
+    if rules is None:
+        from core.config import get_config
+        rules = get_config().stations
+
+    stations = sorted(stations, key=lambda s: (s.positie, s.id))
+    errors = []
+    for st in stations:
+        if st.positie < rules.min_mm:
+            errors.append(f"station {st.id}: positie {st.positie} < min_mm {rules.min_mm:g}")
+        if rules.max_mm is not None and st.positie > rules.max_mm:
+            errors.append(f"station {st.id}: positie {st.positie} > max_mm {rules.max_mm:g}")
+    for a, b in zip(stations, stations[1:]):
+        if b.positie - a.positie < rules.min_spacing_mm:
+            errors.append(f"stations {a.id} en {b.id}: {b.positie - a.positie} mm uit elkaar "
+                          f"(minimaal {rules.min_spacing_mm:g})")
+    if errors:
+        raise StationError(errors)
+
+
+def _store():
+    from core.store import get_store
+    return get_store()
+
+
+def load_stations() -> Dict[int, Station]:
+    """Alle stations als dict {id: Station}."""
+    return _store().stations()
+
+
+def add_station(station: Station) -> bool:
+    """Voegt een nieuw station toe. ID moet uniek zijn (anders ValueError)."""
+    _store().add_station(station, check=check_stations)
+    return True
+
+
+def remove_station(station_id: int) -> bool:
+    """Verwijdert een station op ID. Retourneert True als succesvol."""
+    return _store().remove_station(station_id)
@@ -0,0 +1,419 @@
+# core/store.py
+"""
+Opslag van stations, transportjobs en move-historie in SQLite (WAL-mode).
+
+Eén databasebestand (store.path in config.yaml) in plaats van CSV's die bij
+elke wijziging volledig herschreven worden:
+
+  stations  - id, naam, positie, richting (+ stations_version in meta)
+  jobs      - transportopdracht van station naar station, met status
+  moves     - resultaat per beweging (as, start/doel/eind, duur, succes)
+
+WAL + synchronous=NORMAL: een commit is één append aan de WAL (geen
+herschrijven van het bestand) en lezers blokkeren schrijvers niet. Move-
+records worden gebufferd en per batch (batch_size of flush_interval_s) in
+één transactie geschreven; meerdere schrijfacties samen kan met
+`with store.transaction():`.
+
+CSV blijft voor compatibiliteit: import_stations_csv() en
+export_stations_csv() (export via tijdelijk bestand + os.replace, dus nooit
+half geschreven).
+
+  store = get_store()
+  store.upsert_stations([Station(1, "Invoer", 50, "L")])
+  job = store.create_job(source=1, target=3)
+  store.record_move(axis="x", job_id=job, start_mm=50, target_mm=350, end_mm=349.6,
+                    duration_s=4.2, success=True)
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from core.stations import CSV_HEADER, Station
+
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key         TEXT PRIMARY KEY,
+    value
+);
+
+CREATE TABLE IF NOT EXISTS stations (
+    id          INTEGER PRIMARY KEY,
+    naam        TEXT NOT NULL,
+    positie     INTEGER NOT NULL,
+    richting    TEXT NOT NULL CHECK (richting IN ('L', 'R')),
+    updated_at  REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    source      INTEGER,
+    target      INTEGER,
+    state       TEXT NOT NULL DEFAULT 'queued',
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at);
+
+CREATE TABLE IF NOT EXISTS moves (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id      INTEGER REFERENCES jobs (id) ON DELETE SET NULL,
+    axis        TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    duration_s  REAL,
+    start_mm    REAL,
+    target_mm   REAL,
+    end_mm      REAL,
+    success     INTEGER NOT NULL,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS moves_job ON moves (job_id);
+CREATE INDEX IF NOT EXISTS moves_axis_time ON moves (axis, started_at);
+CREATE INDEX IF NOT EXISTS moves_time ON moves (started_at);
+"""
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+_JOB_FIELDS = ("source", "target", "state", "started_at", "finished_at", "error")
+_MOVE_FIELDS = ("job_id", "axis", "started_at", "duration_s", "start_mm", "target_mm",
+                "end_mm", "success", "error")
+
+
+class TransportStore:
+    def __init__(self, path="data/transport.db", *, batch_size=50, flush_interval_s=1.0):
+        self.path = path
+        self.batch_size = int(batch_size)
+        self.flush_interval_s = float(flush_interval_s)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Eén verbinding, gedeeld door de Flask-threads (achter een lock)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._depth = 0
+        self._migrate()
+
+        self._pending = []          # gebufferde move-records
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="store-flush", daemon=True)
+        self._flusher.start()
+
+    @classmethod
+    def from_config(cls, cfg) -> "TransportStore":
+        """Bouw uit de `store` sectie (core/config.py StoreConfig)."""
+        return cls(cfg.path, batch_size=cfg.batch_size, flush_interval_s=cfg.flush_interval_s)
+
+    def _migrate(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path}: schema v{version} is nieuwer dan deze code "
+                               f"(v{SCHEMA_VERSION})")
+        # v2 schreef stations_version als kaal getal; sinds v3 JSON zoals alle meta
+        upgrade = ("UPDATE meta SET value = CAST(value AS TEXT) "
+                   "WHERE key = 'stations_version' AND typeof(value) = 'integer';")
+        # executescript() commit zelf eerst; daarom een eigen BEGIN/COMMIT
+        self._db.executescript(f"BEGIN; {_SCHEMA} {upgrade} "
+                               f"PRAGMA user_version={SCHEMA_VERSION}; COMMIT;")
+
+    # ---------- transacties ----------
+    @contextmanager
+    def transaction(self):
+        """
+        Alles binnen het blok in één transactie (geneste blokken doen mee
+        met de buitenste). Bij een exception wordt alles teruggedraaid.
+        """
+        with self._lock:
+            outer = self._depth == 0
+            if outer:
+                self._db.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._db
+            except BaseException:
+                self._depth -= 1
+                if outer:
+                    self._db.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if outer:
+                self._db.execute("COMMIT")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # ---------- stations ----------
+    @staticmethod
+    def _station(row) -> Station:
+        return Station(id=row["id"], naam=row["naam"], positie=row["positie"], richting=row["richting"])
+
+    def stations(self) -> dict[int, Station]:
+        """Alle stations als {id: Station}, gesorteerd op id."""
+        rows = self._query("SELECT id, naam, positie, richting FROM stations ORDER BY id")
+        return {row["id"]: self._station(row) for row in rows}
+
+    def station(self, station_id: int) -> Optional[Station]:
+        rows = self._query("SELECT id, naam, positie, richting FROM stations WHERE id = ?",
+                           (int(station_id),))
+        return self._station(rows[0]) if rows else None
+
+    def stations_version(self) -> int:
+        """Versie van de stationslijst; +1 per geslaagde schrijfactie (caches)."""
+        return int(self.get_meta("stations_version", 0))
+
+    # ---------- meta (kleine JSON-waarden) ----------
+    def get_meta(self, key: str, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return json.loads(rows[0]["value"]) if rows else default
+
+    def set_meta(self, key: str, value) -> None:
+        """Eén waarde (JSON) opslaan; één autocommit-insert, goedkoop in WAL-mode."""
+        with self._lock:
+            self._db.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                             "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                             (key, json.dumps(value)))
+
+    def write_stations(self, upsert: Iterable[Station] = (), remove: Iterable[int] = (),
+                       replace=False, check=None) -> int:
+        """
+        Stations toevoegen/bijwerken en verwijderen in één transactie.
+        replace=True: de lijst wordt precies `upsert`. check(stations) krijgt
+        de lijst zoals die na het schrijven is en mag een exception gooien;
+        dan wordt niets geschreven. Geeft de nieuwe stations_version terug.
+        """
+        upsert = list(upsert)
+        remove = [int(sid) for sid in remove]
+        now = time.time()
+        with self.transaction() as db:
+            result = {} if replace else self.stations()
+            for sid in remove:
+                result.pop(sid, None)
+            for st in upsert:
+                result[st.id] = st
+            if check is not None:
+                check(list(result.values()))
+
+            if replace:
+                db.execute("DELETE FROM stations")
+            db.executemany("DELETE FROM stations WHERE id = ?", [(sid,) for sid in remove])
+            db.executemany(
+                "INSERT INTO stations (id, naam, positie, richting, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET naam = excluded.naam, positie = excluded.positie, "
+                "richting = excluded.richting, updated_at = excluded.updated_at",
+                [(st.id, st.naam, st.positie, st.richting, now) for st in upsert])
+            version = self.stations_version() + 1
+            self.set_meta("stations_version", version)
+            return version
+
+    def add_station(self, station: Station, check=None) -> int:
+        """Nieuw station; ValueError als het id al bestaat."""
+        with self.transaction():
+            if self.station(station.id) is not None:
+                raise ValueError(f"Station-ID {station.id} bestaat al.")
+            return self.write_stations(upsert=[station], check=check)
+
+    def upsert_stations(self, stations: Iterable[Station], check=None) -> int:
+        """Stations toevoegen of bijwerken, allemaal in één transactie."""
+        return self.write_stations(upsert=stations, check=check)
+
+    def remove_station(self, station_id: int) -> bool:
+        with self.transaction():
+            if self.station(station_id) is None:
+                return False
+            self.write_stations(remove=[station_id])
+        return True
+
+    def import_stations_csv(self, path, replace=False, check=None, skip_errors=False) -> int:
+        """
+        Stations uit een CSV (id,naam,positie,richting) in één transactie.
+        replace=True: eerst alle bestaande stations weg. Foute regels geven
+        ValueError met het regelnummer (er wordt dan niets geschreven), of
+        worden met skip_errors=True gemeld en overgeslagen.
+        """
+        stations = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    stations.append(Station(id=int(row["id"]), naam=row["naam"].strip(),
+                                            positie=int(float(row["positie"])),
+                                            richting=row["richting"].strip()))
+                except Exception as e:
+                    if not skip_errors:
+                        raise ValueError(f"{path} regel {line}: {e}") from None
+                    print(f"[store] {path} regel {line} overgeslagen: {e}")
+
+        self.write_stations(upsert=stations, replace=replace, check=check)
+        return len(stations)
+
+    def export_stations_csv(self, path) -> int:
+        """Alle stations naar CSV; atomisch (tijdelijk bestand + os.replace)."""
+        stations = self.stations()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_HEADER)
+            writer.writeheader()
+            for st in stations.values():
+                writer.writerow({"id": st.id, "naam": st.naam, "positie": st.positie,
+                                 "richting": st.richting})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return len(stations)
+
+    # ---------- jobs ----------
+    def create_job(self, source=None, target=None, state="queued") -> int:
+        if state not in JOB_STATES:
+            raise ValueError(f"Onbekende job-status '{state}'")
+        with self.transaction() as db:
+            cur = db.execute("INSERT INTO jobs (source, target, state, created_at) VALUES (?, ?, ?, ?)",
+                             (source, target, state, time.time()))
+        return cur.lastrowid
+
+    def update_job(self, job_id: int, **fields) -> bool:
+        """Velden van één job bijwerken (source, target, state, started_at, finished_at, error)."""
+        unknown = set(fields) - set(_JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Onbekende job-velden {sorted(unknown)}")
+        if "state" in fields and fields["state"] not in JOB_STATES:
+            raise ValueError(f"Onbekende job-status '{fields['state']}'")
+        if not fields:
+            return False
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self.transaction() as db:
+            cur = db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), int(job_id)))
+        return cur.rowcount > 0
+
+    def job(self, job_id: int) -> Optional[dict]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (int(job_id),))
+        return dict(rows[0]) if rows else None
+
+    def jobs(self, state=None, since=None, limit=100) -> list[dict]:
+        """Nieuwste eerst; filter op status en/of created_at >= since."""
+        where, params = [], []
+        if state is not None:
+            where.append("state = ?")
+            params.append(state)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(float(since))
+        sql = "SELECT * FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        return [dict(r) for r in self._query(sql, (*params, int(limit)))]
+
+    # ---------- moves ----------
+    def record_move(self, *, axis, success, started_at=None, duration_s=None, job_id=None,
+                    start_mm=None, target_mm=None, end_mm=None, error=None) -> None:
+        """
+        Resultaat van een beweging bufferen; wordt per batch geschreven
+        (batch_size records of na flush_interval_s).
+        """
+        row = (job_id, axis, time.time() if started_at is None else started_at, duration_s,
+               start_mm, target_mm, end_mm, int(bool(success)), error)
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+        else:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Gebufferde move-records in één transactie wegschrijven."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            if not rows or self._db is None:
+                return 0
+            placeholders = ", ".join("?" * len(_MOVE_FIELDS))
+            with self.transaction() as db:
+                db.executemany(f"INSERT INTO moves ({', '.join(_MOVE_FIELDS)}) VALUES ({placeholders})",
+                               rows)
+        return len(rows)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            # Verzamelen tot het interval om is (of de batch vol is)
+            time.sleep(self.flush_interval_s)
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                print("[store] flush mislukt:", e)
+
+    def moves(self, job_id=None, axis=None, since=None, until=None, limit=1000) -> list[dict]:
+        """Move-historie, nieuwste eerst (index op job_id en (axis, started_at))."""
+        self.flush()
+        where, params = [], []
+        for column, op, value in (("job_id", "=", job_id), ("axis", "=", axis),
+                                  ("started_at", ">=", since), ("started_at", "<", until)):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                params.append(value)
+        sql = "SELECT * FROM moves"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY started_at DESC LIMIT ?"
+        rows = self._query(sql, (*params, int(limit)))
+        return [dict(r, success=bool(r["success"])) for r in rows]
+
+    # ---------- afsluiten ----------
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.close()
+            self._db = None
+
+
+# --- Gedeelde store (1x verbinding voor de hele app) ---
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(config_path="config.yaml") -> TransportStore:
+    """
+    Gedeelde store volgens `store` in config.yaml. Is de database nieuw
+    (geen stations) en bestaat store.stations_csv, dan wordt die geïmporteerd
+    (foute regels worden overgeslagen; lukt de import niet, dan blijft de
+    tabel leeg).
+    """
+    from core.config import get_config
+
+    cfg = get_config(config_path).store
+    key = os.path.abspath(cfg.path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = TransportStore.from_config(cfg)
+            if not store.stations() and cfg.stations_csv and os.path.exists(cfg.stations_csv):
+                # Een kapotte legacy-CSV mag het opstarten niet blokkeren
+                try:
+                    n = store.import_stations_csv(cfg.stations_csv, skip_errors=True)
+                    print(f"[store] {n} stations geïmporteerd uit {cfg.stations_csv}")
+                except (OSError, ValueError) as e:
+                    print("Error in store (import stations_csv), start zonder stations:", e)
+        return store
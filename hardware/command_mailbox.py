@@ -0,0 +1,169 @@
+# hardware/command_mailbox.py
+"""
+Latest-wins mailbox voor handbediening (X-motor, Y-stepper).
+
+Per as is er één slot. Een nieuw commando vervangt het commando dat nog in
+het slot wacht (dat wordt `superseded` en nooit uitgevoerd). Eén
+actuator-thread leegt de slots in volgorde van binnenkomst en roept per as
+de geregistreerde handler aan. Flask-threads doen zelf geen GPIO-writes:
+post() komt direct terug met een command-id.
+
+Een handler kan CommandRejected gooien (bv. homing loopt); elke andere
+exception telt als `failed`. Per commando blijft de status opvraagbaar
+(laatste `history` commando's), per as zijn er tellers en de
+post-to-apply latency.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+STATES = ("pending", "applied", "superseded", "cancelled", "rejected", "failed")
+
+
+class CommandRejected(RuntimeError):
+    """Commando bewust niet uitgevoerd (geen fout van de hardware)."""
+
+
+@dataclass
+class MailboxCommand:
+    id: int
+    axis: str
+    action: str
+    params: dict = field(default_factory=dict)
+    posted: float = field(default_factory=time.perf_counter)
+    state: str = "pending"
+    error: Optional[str] = None
+    latency_ms: Optional[float] = None      # van post() tot uitgevoerd
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "axis": self.axis, "action": self.action, "params": self.params,
+                "state": self.state, "error": self.error, "latency_ms": self.latency_ms}
+
+
+class CommandMailbox:
+    def __init__(self, history: int = 256, latency_samples: int = 256):
+        self._cond = threading.Condition()
+        self._handlers: dict[str, Callable[[MailboxCommand], None]] = {}
+        self._slots: dict[str, MailboxCommand] = {}
+        self._history: OrderedDict[int, MailboxCommand] = OrderedDict()
+        self._history_size = int(history)
+        self._latency_samples = int(latency_samples)
+        self._ids = itertools.count(1)
+        self._counts: dict[str, dict] = {}
+        self._latencies: dict[str, deque] = {}
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="manual-actuator", daemon=True)
+        self._thread.start()
+
+    def register(self, axis: str, handler: Callable[[MailboxCommand], None]) -> None:
+        """Handler die de commando's van een as uitvoert (in de actuator-thread)."""
+        with self._cond:
+            self._handlers[axis] = handler
+            self._counts.setdefault(axis, {"posted": 0, **{s: 0 for s in STATES if s != "pending"}})
+            self._latencies.setdefault(axis, deque(maxlen=self._latency_samples))
+
+    def has_axis(self, axis: str) -> bool:
+        with self._cond:
+            return axis in self._handlers
+
+    # ---------- producer kant ----------
+    def post(self, axis: str, action: str, **params) -> int:
+        """Zet een commando in het slot van de as; geeft het command-id terug."""
+        with self._cond:
+            if axis not in self._handlers:
+                raise ValueError(f"Geen handler voor as '{axis}'")
+            if self._closed:
+                raise RuntimeError("Mailbox is gesloten")
+
+            cmd = MailboxCommand(next(self._ids), axis, action, params)
+            old = self._slots.get(axis)
+            if old is not None:
+                old.state = "superseded"
+                self._counts[axis]["superseded"] += 1
+            self._slots[axis] = cmd
+            self._counts[axis]["posted"] += 1
+
+            self._history[cmd.id] = cmd
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+            self._cond.notify()
+            return cmd.id
+
+    def cancel(self, axis: str) -> bool:
+        """Gooi het wachtende commando van een as weg (bv. vóór een stop)."""
+        with self._cond:
+            cmd = self._slots.pop(axis, None)
+            if cmd is None:
+                return False
+            cmd.state = "cancelled"
+            self._counts[axis]["cancelled"] += 1
+            return True
+
+    # ---------- actuator ----------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._slots:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Oudste eerst, zodat geen as een andere kan uithongeren
+                cmd = min(self._slots.values(), key=lambda c: c.id)
+                del self._slots[cmd.axis]
+                handler = self._handlers[cmd.axis]
+
+            state, error = "applied", None
+            try:
+                handler(cmd)
+            except CommandRejected as e:
+                state, error = "rejected", str(e)
+            except Exception as e:
+                print(f"Error in mailbox ({cmd.axis} {cmd.action}):", e)
+                state, error = "failed", str(e)
+            latency = time.perf_counter() - cmd.posted
+
+            with self._cond:
+                cmd.state = state
+                cmd.error = error
+                cmd.latency_ms = latency * 1e3
+                self._counts[cmd.axis][state] += 1
+                if state == "applied":
+                    self._latencies[cmd.axis].append(latency)
+
+    # ---------- status ----------
+    def status(self, cmd_id: int) -> Optional[dict]:
+        with self._cond:
+            cmd = self._history.get(cmd_id)
+            return None if cmd is None else cmd.as_dict()
+
+    def stats(self) -> dict:
+        """Per as: tellers per status, wachtend commando en latency (ms)."""
+        out = {}
+        with self._cond:
+            for axis, counts in self._counts.items():
+                lat = np.array(self._latencies[axis]) * 1e3
+                s = dict(counts)
+                s["pending"] = 1 if axis in self._slots else 0
+                if lat.size:
+                    s.update(latency_mean_ms=float(lat.mean()),
+                             latency_p95_ms=float(np.percentile(lat, 95)),
+                             latency_max_ms=float(lat.max()))
+                out[axis] = s
+        return out
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            for cmd in self._slots.values():
+                cmd.state = "cancelled"
+            self._slots.clear()
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
@@ -80,6 +80,26 @@ class EncoderState:
         with self._lock:
             return self._home_cont_deg is not None
 
+    # ---------- Checkpoint (hardware/home_persist.py) ----------
+    def snapshot(self) -> dict:
+        """Unwrap- en home-toestand om te bewaren; restore() zet hem terug."""
+        with self._lock:
+            return {
+                "turns": self._turns,
+                "last_raw": self._last_raw,
+                "home_cont_deg": self._home_cont_deg,
+                "mm_per_rev": self.mm_per_rev,
+                "direction_sign": self.direction_sign,
+            }
+
+    def restore(self, snap: dict):
+        """Zet turns, laatste ruwe hoek en home terug (zonder controle: dat doet de aanroeper)."""
+        with self._lock:
+            self._turns = int(snap["turns"])
+            self._last_raw = None if snap["last_raw"] is None else float(snap["last_raw"])
+            home = snap.get("home_cont_deg")
+            self._home_cont_deg = None if home is None else float(home)
+
     # ---------- Output ----------
     def get_position_mm(self, raw_angle_deg: float, clamp_min_zero: bool = False) -> float:
         
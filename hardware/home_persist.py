@@ -0,0 +1,235 @@
+# hardware/home_persist.py
+"""
+Home-referentie van de X-as bewaren over herstarts.
+
+De encoder (AS5600) meet alleen de hoek binnen één omwenteling; de positie
+in mm hangt af van het aantal omwentelingen (turns) en de home-offset uit
+de laatste homing. HomeCheckpointer bewaart die toestand (turns, laatste
+ruwe hoek, home-offset, tijdstip) in de store (meta-tabel) en zet hem bij
+het opstarten terug, zodat niet na elke herstart opnieuw gehomed hoeft te
+worden.
+
+Checkpoints:
+  - elke checkpoint_s, maar alleen als er iets veranderd is (één kleine
+    insert in de WAL);
+  - bij afsluiten (close) een laatste checkpoint met clean=True.
+
+Bij het opstarten wordt de checkpoint alleen gebruikt als hij plausibel is:
+  - er was een home-referentie, met dezelfde mm_per_rev / direction_sign;
+  - de checkpoint is niet ouder dan max_age_s (indien ingesteld);
+  - de wagen stond stil: clean afgesloten, of de laatste twee checkpoints
+    hadden dezelfde hoek (na een crash tijdens rijden kloppen de turns niet);
+  - de huidige ruwe hoek ligt binnen raw_tolerance_deg van de bewaarde;
+  - (sensor_check) de homing-sensor is niet actief verder dan
+    sensor_window_mm van home, en wel actief net voorbij de home-flank.
+
+Anders blijft de as ongehomed en is een volledige homing-run nodig.
+"""
+import threading
+import time
+
+STORE_KEY = "home_x"
+
+
+def _angle_diff(a, b):
+    """Kleinste verschil tussen twee hoeken in graden (-180..180]."""
+    d = (float(a) - float(b)) % 360.0
+    return d - 360.0 if d > 180.0 else d
+
+
+class HomeCheckpointer:
+    def __init__(self, encoder_state, reader, store, gpio=None, sensor_name=None,
+                 key=STORE_KEY, checkpoint_s=1.0, raw_tolerance_deg=3.0, max_age_s=None,
+                 sensor_check=True, sensor_window_mm=10.0, wait_s=3.0):
+        self.encoder_state = encoder_state
+        self.reader = reader
+        self.store = store
+        self.gpio = gpio
+        self.sensor_name = sensor_name
+        self.key = key
+        self.checkpoint_s = float(checkpoint_s)
+        self.raw_tolerance_deg = float(raw_tolerance_deg)
+        self.max_age_s = max_age_s
+        self.sensor_check = bool(sensor_check)
+        self.sensor_window_mm = float(sensor_window_mm)
+        self.wait_s = float(wait_s)       # max wachten op de eerste geldige meting
+
+        self._lock = threading.Lock()
+        self._last = None                 # laatst geschreven toestand
+        self._restore = {"state": "pending", "reason": None}
+        self._stats = {"checkpoints": 0, "skipped": 0, "errors": 0, "write_ms_max": 0.0}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, cfg, encoder_state, reader, store, gpio=None, sensor_name=None):
+        """Bouw uit x_axis.home_persist (core/config.py HomePersistConfig)."""
+        return cls(encoder_state, reader, store, gpio=gpio, sensor_name=sensor_name,
+                   checkpoint_s=cfg.checkpoint_s, raw_tolerance_deg=cfg.raw_tolerance_deg,
+                   max_age_s=cfg.max_age_s, sensor_check=cfg.sensor_check,
+                   sensor_window_mm=cfg.sensor_window_mm)
+
+    def start(self):
+        """Herstel (zodra de encoder een meting heeft) en start de checkpoints."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="home-checkpoint", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop de checkpoints en schrijf een laatste (clean) checkpoint."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        with self._lock:
+            restored = self._restore["state"] != "pending"
+        if restored:
+            self.checkpoint(clean=True)
+
+    # ---------- encoder ----------
+    def _raw_angle(self):
+        data = self.reader.get_latest()
+        if data.get("ok") and data.get("angle_deg") is not None:
+            return float(data["angle_deg"])
+        return None
+
+    def _wait_raw(self):
+        deadline = time.monotonic() + self.wait_s
+        while not self._stop.is_set():
+            raw = self._raw_angle()
+            if raw is not None or time.monotonic() >= deadline:
+                return raw
+            self._stop.wait(0.05)
+        return None
+
+    # ---------- herstellen ----------
+    def _check(self, snap, raw):
+        """Reden waarom de checkpoint niet bruikbaar is, of None als hij klopt."""
+        es = self.encoder_state
+        if snap is None:
+            return "geen checkpoint"
+        if snap.get("home_cont_deg") is None:
+            return "niet gehomed bij afsluiten"
+        if (snap.get("mm_per_rev") != es.mm_per_rev
+                or snap.get("direction_sign") != es.direction_sign):
+            return "mm_per_rev/direction_sign gewijzigd"
+        if self.max_age_s is not None and time.time() - snap["ts"] > self.max_age_s:
+            return f"checkpoint ouder dan {self.max_age_s:.0f} s"
+        if not snap.get("clean") and not snap.get("stationary"):
+            return "niet netjes afgesloten tijdens beweging"
+        if raw is None:
+            return "geen encodermeting"
+        if snap.get("last_raw") is None:
+            return "geen ruwe hoek in checkpoint"
+        jump = _angle_diff(raw, snap["last_raw"])
+        if abs(jump) > self.raw_tolerance_deg:
+            return f"encoderhoek verschoven ({jump:+.1f}°)"
+        return None
+
+    def _sensor_mismatch(self, mm):
+        if not self.sensor_check or self.gpio is None or self.sensor_name is None:
+            return None
+        active = bool(self.gpio.edges(self.sensor_name).level)
+        if active and mm > self.sensor_window_mm:
+            return f"homing-sensor actief op {mm:.1f} mm"
+        if not active and -self.sensor_window_mm <= mm < -1.0:
+            # Voorbij de home-flank staat de wagen op de sensor
+            return f"homing-sensor niet actief op {mm:.1f} mm"
+        return None
+
+    def restore(self):
+        """
+        Probeer de bewaarde home-referentie terug te zetten. Geeft de uitkomst
+        terug (ook via status()): state 'restored' of 'rehome' met een reden.
+        """
+        t0 = time.perf_counter()
+        try:
+            snap = self.store.get_meta(self.key)
+        except Exception as e:
+            print("Error in home_persist (lezen):", e)
+            snap = None
+        raw = self._wait_raw()
+        reason = self._check(snap, raw)
+
+        es = self.encoder_state
+        result = {"state": "rehome", "reason": reason}
+        if reason is None:
+            # Turns zo kiezen dat de hoek aansluit op de bewaarde continue hoek
+            es.restore(dict(snap, last_raw=raw,
+                            turns=snap["turns"] + self._turn_correction(snap["last_raw"], raw)))
+            mm = es.get_position_mm(raw)
+            reason = self._sensor_mismatch(mm)
+            if reason is None:
+                result = {"state": "restored", "reason": None, "position_mm": round(mm, 2),
+                          "age_s": round(time.time() - snap["ts"], 1)}
+            else:
+                es.clear_home()
+                result = {"state": "rehome", "reason": reason}
+        result["duration_ms"] = (time.perf_counter() - t0) * 1e3
+
+        with self._lock:
+            self._restore = result
+        if result["state"] == "restored":
+            print(f"[home] referentie hersteld: {result['position_mm']} mm "
+                  f"(checkpoint {result['age_s']} s oud)")
+        else:
+            print(f"[home] volledige homing nodig: {result['reason']}")
+        return result
+
+    @staticmethod
+    def _turn_correction(last_raw, raw):
+        # Kleine beweging over de 0/360-grens tijdens het uitstaan
+        if raw - last_raw > 180:
+            return -1
+        if raw - last_raw < -180:
+            return 1
+        return 0
+
+    # ---------- checkpoints ----------
+    def checkpoint(self, clean=False):
+        """Schrijf de toestand als die veranderd is (clean=True: altijd)."""
+        raw = self._raw_angle()
+        if raw is not None:
+            # Unwrap bijwerken met de laatste meting
+            self.encoder_state.get_position_mm(raw)
+        snap = self.encoder_state.snapshot()
+
+        with self._lock:
+            last = self._last
+        moved = last is None or last["last_raw"] is None or snap["last_raw"] is None or \
+            abs(_angle_diff(snap["last_raw"], last["last_raw"])) > 0.5 or \
+            snap["turns"] != last["turns"]
+        changed = moved or snap["home_cont_deg"] != last["home_cont_deg"]
+        if not changed and not clean and last.get("stationary"):
+            with self._lock:
+                self._stats["skipped"] += 1
+            return False
+
+        snap.update(ts=time.time(), clean=bool(clean), stationary=not moved)
+        t0 = time.perf_counter()
+        try:
+            self.store.set_meta(self.key, snap)
+        except Exception as e:
+            print("Error in home_persist (schrijven):", e)
+            with self._lock:
+                self._stats["errors"] += 1
+            return False
+        write_ms = (time.perf_counter() - t0) * 1e3
+        with self._lock:
+            self._last = snap
+            self._stats["checkpoints"] += 1
+            self._stats["write_ms_max"] = max(self._stats["write_ms_max"], write_ms)
+        return True
+
+    def _run(self):
+        self.restore()
+        while not self._stop.wait(self.checkpoint_s):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                print("Error in home_persist:", e)
+
+    def status(self):
+        with self._lock:
+            return {"restore": dict(self._restore), **self._stats}
@@ -1,6 +1,36 @@
 # hardware/homing2.py
-import time
+"""
+Homing van de X-as naar de inductiesensor.
+
+Met two_phase (standaard) in drie stappen:
+  1. snel naderen met `speed` tot de sensorflank;
+  2. terugrijden met `backoff_speed` tot backoff_mm voorbij de flank;
+  3. langzaam opnieuw naderen met `slow_speed`; op die flank wordt home gezet.
+Zonder two_phase wordt home gezet op de flank van de (enige) nadering.
+
+Home wordt vastgelegd op het moment van de flank, niet na het uitrollen:
+de encoderhoek van de eerste meting na de flank wordt met de gemeten
+snelheid teruggerekend naar het tijdstip van de flank.
+
+Spreiding: bij een homing terwijl de as al gehomed was, wordt de nieuwe
+flank ook in het oude assenstelsel gemeten (ideaal 0 mm). Over de laatste
+stats_runs runs geeft stats() gemiddelde en standaardafwijking, plus de
+duur per fase.
+"""
 import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PHASES = ("approach", "backoff", "retouch")
+
+
+def _angle_diff(a, b):
+    """Kleinste verschil tussen twee hoeken in graden (-180..180]."""
+    d = (float(a) - float(b)) % 360.0
+    return d - 360.0 if d > 180.0 else d
+
 
 class HomingController:
     def __init__(self, motor, gpio, arduino_reader, encoder_state,
@@ -8,7 +38,12 @@ class HomingController:
                  direction="backward",
                  speed=0.4,
                  timeout_s=10.0,
-                 settle_s=0.15):
+                 settle_s=0.15,
+                 two_phase=True,
+                 backoff_speed=0.3,
+                 backoff_mm=5.0,
+                 slow_speed=0.15,
+                 stats_runs=20):
         self.motor = motor
         self.gpio = gpio
         self.reader = arduino_reader
@@ -19,6 +54,10 @@ class HomingController:
         self.speed = speed
         self.timeout_s = timeout_s
         self.settle_s = settle_s
+        self.two_phase = two_phase
+        self.backoff_speed = backoff_speed
+        self.backoff_mm = backoff_mm
+        self.slow_speed = slow_speed
 
         self._lock = threading.Lock()
         self._running = False
@@ -26,13 +65,48 @@ class HomingController:
 
         self._cancel_event = threading.Event()
 
+        # Spreiding (mm, in het vorige assenstelsel) en duur van de laatste runs
+        self._scatter = deque(maxlen=int(stats_runs))
+        self._durations = deque(maxlen=int(stats_runs))
+
+    def apply_tuning(self, cfg):
+        """Hot reload (x_axis.homing): geldt vanaf de volgende homing-run."""
+        self.speed = cfg.speed
+        self.timeout_s = cfg.timeout_s
+        self.settle_s = cfg.settle_s
+        self.two_phase = cfg.two_phase
+        self.backoff_speed = cfg.backoff_speed
+        self.backoff_mm = cfg.backoff_mm
+        self.slow_speed = cfg.slow_speed
+
     def status(self):
         with self._lock:
             return {
                 "running": self._running,
-                "last_result": self._last_result
+                "last_result": self._last_result,
+                "stats": self._stats_locked(),
             }
 
+    def _stats_locked(self):
+        out = {"runs": len(self._durations)}
+        if self._durations:
+            d = np.array(self._durations)
+            out.update(duration_mean_s=round(float(d.mean()), 3),
+                       duration_max_s=round(float(d.max()), 3))
+        if self._scatter:
+            x = np.array(self._scatter)
+            out.update(scatter_n=int(x.size),
+                       scatter_mean_mm=round(float(x.mean()), 3),
+                       scatter_std_mm=round(float(x.std(ddof=1)), 3) if x.size > 1 else None,
+                       scatter_min_mm=round(float(x.min()), 3),
+                       scatter_max_mm=round(float(x.max()), 3))
+        return out
+
+    def stats(self):
+        """Duur en spreiding van de home-positie over de laatste runs."""
+        with self._lock:
+            return self._stats_locked()
+
     def start(self):
         self._cancel_event.clear()
         with self._lock:
@@ -52,47 +126,154 @@ class HomingController:
             self._cancel_event.set()
             return True
 
-    def _run(self):
-        result = {"success": False, "error": None}
+    # ---------- bewegen ----------
+    def _drive(self, toward_sensor, speed):
+        forward = (self.direction == "forward") == toward_sensor
+        if forward:
+            self.motor.forward(speed)
+        else:
+            self.motor.backward(speed)
 
-        try:
-            # Start bewegen
-            if self.direction == "backward":
-                self.motor.backward(self.speed)
-            else:
-                self.motor.forward(self.speed)
+    def _sample(self):
+        data = self.reader.get_latest()
+        if not data.get("ok") or data.get("angle_deg") is None:
+            raise RuntimeError(data.get("error", "No encoder data during homing"))
+        return float(data["angle_deg"]), float(data["ts"])
 
-            start_t = time.time()
+    def _check_cancel(self, deadline, phase):
+        if self._cancel_event.is_set():
+            raise RuntimeError("Homing cancelled by user")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Homing timeout after {self.timeout_s}s ({phase})")
 
-            # Wacht tot sensor triggert, cancel, of timeout
-            while True:
-                if self._cancel_event.is_set():
-                    raise RuntimeError("Homing cancelled by user")
+    def _settle(self):
+        if self._cancel_event.wait(self.settle_s):
+            raise RuntimeError("Homing cancelled by user")
 
-                if self.gpio.is_active(self.sensor_name):
-                    break
+    def _wait_edge(self, edges, phase, speed):
+        """
+        Rij naar de sensor tot de flank (event, geen polling). Geeft de flank en
+        de geschatte encoderhoek op het moment van de flank terug (None als de
+        sensor al actief was).
+        """
+        deadline = time.monotonic() + self.timeout_s
+        after = edges.seq
+        self._drive(True, speed)
+        cur = None
+        while not edges.level:
+            self._check_cancel(deadline, phase)
+            edge = edges.wait(active=True, timeout=0.02, after=after)
+            if edge is not None:
+                return edge, self._latch(edge, cur)
+            cur = self._sample()
+        return None, None
 
-                if (time.time() - start_t) > self.timeout_s:
-                    raise TimeoutError(f"Homing timeout after {self.timeout_s}s")
+    def _latch(self, edge, cur):
+        """Encoderhoek teruggerekend naar het tijdstip van de flank."""
+        raw, ts = self._sample()
+        if cur is None or ts <= cur[1]:
+            return raw
+        # Snelheid (graden/s) uit de laatste meting vóór de flank en de meting erna
+        velocity = _angle_diff(raw, cur[0]) / (ts - cur[1])
+        edge_epoch = time.time() - (time.perf_counter() - edge.ts)
+        return (raw - velocity * max(0.0, ts - edge_epoch)) % 360.0
 
-                time.sleep(0.01)
+    def _brake_at_edge(self, edge):
+        """
+        Direct remmen op de flank: een RampedMotor slaat zijn rem-ramp over
+        (zoals de SafetySupervisor), anders schiet de wagen verder door. De
+        duty is 0 zodra stop() terugkomt, dus edge_to_stop_ms is de echte
+        tijd van flank tot de H-brug op rem staat.
+        """
+        if hasattr(self.motor, "state"):
+            self.motor.stop(brake=True, immediate=True)
+        else:
+            self.motor.stop(brake=True)
+        return None if edge is None else (time.perf_counter() - edge.ts) * 1e3
 
-            # Stop motor
-            self.motor.stop(brake=False)
+    def _backoff(self, edges, raw_edge):
+        """
+        Van de sensor af tot hij vrij is en de wagen backoff_mm voorbij de
+        flank staat (gemeten vanaf raw_edge, of vanaf het vrijkomen als de
+        wagen al op de sensor stond). Ook als de wagen bij het uitrollen
+        voorbij de sensor is geschoten, komt hij zo weer aan de goede kant.
+        """
+        deadline = time.monotonic() + self.timeout_s
+        mm_per_deg = self.encoder_state.direction_sign * self.encoder_state.mm_per_rev / 360.0
+        self._drive(False, self.backoff_speed)
 
-            # Even stabiliseren / bounce vermijden
-            time.sleep(self.settle_s)
+        last, _ = self._sample()
+        # Afstand van de flank, positief = van de sensor af
+        away_mm = None if raw_edge is None else _angle_diff(last, raw_edge) * mm_per_deg
+        while edges.level or away_mm is None or away_mm < self.backoff_mm:
+            self._check_cancel(deadline, "backoff")
+            self._cancel_event.wait(0.01)
+            raw, _ = self._sample()
+            if away_mm is None:
+                if not edges.level:
+                    away_mm = 0.0
+            else:
+                away_mm += _angle_diff(raw, last) * mm_per_deg
+            last = raw
 
-            # Lees huidige raw encoderwaarde en zet home
-            data = self.reader.get_latest()
-            if not data.get("ok") or data.get("angle_deg") is None:
-                raise RuntimeError(data.get("error", "No encoder data during homing"))
+    def _set_home(self, raw_edge):
+        """
+        Home op de flank zetten, direct na de stop (de wagen is nog vlak bij
+        de flank, dus de unwrap klopt). Geeft de spreiding terug: de nieuwe
+        flank in het oude assenstelsel (None als er nog geen home was).
+        """
+        scatter = None
+        if self.encoder_state.is_homed():
+            scatter = self.encoder_state.get_position_mm(raw_edge)
+        self.encoder_state.set_home_offset(raw_edge)
+        return scatter
 
-            raw_angle = float(data["angle_deg"])
-            self.encoder_state.set_home_offset(raw_angle)
+    def _run(self):
+        result = {"success": False, "error": None}
+        phases = {}
+        t_run = time.perf_counter()
 
+        try:
+            edges = self.gpio.edges(self.sensor_name)
+
+            t0 = time.perf_counter()
+            edge, raw_edge = self._wait_edge(edges, "approach", self.speed)
+            # Tussen de fasen actief afremmen: minder doorschieten dan uitrollen
+            edge_to_stop_ms = self._brake_at_edge(edge)
+            if edge_to_stop_ms is not None:
+                result["edge_to_stop_ms"] = edge_to_stop_ms
+            if not self.two_phase and edge is not None:
+                scatter = self._set_home(raw_edge)
+            self._settle()
+            phases["approach"] = time.perf_counter() - t0
+
+            if self.two_phase or edge is None:
+                # Ook als de wagen al op de sensor stond: eerst vrijrijden
+                t0 = time.perf_counter()
+                self._backoff(edges, raw_edge)
+                self.motor.stop(brake=True)
+                self._settle()
+                phases["backoff"] = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                edge, raw_edge = self._wait_edge(edges, "retouch", self.slow_speed)
+                edge_to_stop_ms = self._brake_at_edge(edge)
+                if edge is None:
+                    raise RuntimeError("Sensor niet vrijgekomen tijdens backoff")
+                result["edge_to_stop_ms"] = edge_to_stop_ms
+                scatter = self._set_home(raw_edge)
+                self._settle()
+                phases["retouch"] = time.perf_counter() - t0
+
+            self.motor.stop(brake=False)
             result["success"] = True
-            result["home_offset"] = raw_angle
+            result["home_offset"] = round(raw_edge, 3)
+            result["scatter_mm"] = None if scatter is None else round(scatter, 3)
+
+            with self._lock:
+                if scatter is not None:
+                    self._scatter.append(scatter)
+                self._durations.append(time.perf_counter() - t_run)
 
         except Exception as e:
             try:
@@ -103,6 +284,8 @@ class HomingController:
             result["cancelled"] = self._cancel_event.is_set()
 
         finally:
+            result["duration_s"] = round(time.perf_counter() - t_run, 3)
+            result["phases_s"] = {name: round(phases[name], 3) for name in PHASES if name in phases}
             with self._lock:
                 self._running = False
                 self._last_result = result
@@ -1,3 +1,6 @@
+import threading
+import time
+
 from core.gpio_singleton import gpio
 
 
@@ -9,6 +12,10 @@ class TransportMotor:
       motor_lpwm (pwm)
       motor_ren  (output)
       motor_len  (output)
+
+    Alle pinnen van één commando gaan in één GPIOManager.apply()-transactie.
+    Is het commando gelijk aan het vorige (en heeft niemand anders sindsdien
+    pinnen geschreven), dan wordt er helemaal niets geschreven.
     """
 
     def __init__(self,
@@ -21,11 +28,59 @@ class TransportMotor:
         self.ren_name = ren_name
         self.len_name = len_name
 
+        # State-diffing: laatste commando + GPIO state_version daarna
+        self._lock = threading.Lock()
+        self._last_cmd = None
+        self._last_version = None
+        self._stats = {"commands": 0, "skipped": 0, "writes": 0,
+                       "latency_total_s": 0.0, "latency_max_s": 0.0}
+
     @staticmethod
     def _clamp_speed(speed: float) -> float:
         """Beperk snelheid tot [0.0, 1.0]."""
         return max(0.0, min(1.0, float(speed)))
 
+    def _command(self, cmd, states) -> None:
+        """Pas een motorcommando toe, tenzij het identiek is aan het vorige."""
+        t0 = time.perf_counter()
+        with self._lock:
+            self._stats["commands"] += 1
+            if cmd == self._last_cmd and gpio.state_version == self._last_version:
+                self._stats["skipped"] += 1
+                return
+
+            writes = gpio.apply(states)
+            self._last_cmd = cmd
+            self._last_version = gpio.state_version
+
+            dt = time.perf_counter() - t0
+            self._stats["writes"] += writes
+            self._stats["latency_total_s"] += dt
+            if dt > self._stats["latency_max_s"]:
+                self._stats["latency_max_s"] = dt
+
+    def command_stats(self) -> dict:
+        """Commando's, overgeslagen commando's, pin-writes en latency (us)."""
+        with self._lock:
+            s = dict(self._stats)
+        applied = s["commands"] - s["skipped"]
+        total = s.pop("latency_total_s")
+        s["latency_mean_us"] = (total / applied) * 1e6 if applied else 0.0
+        s["latency_max_us"] = s.pop("latency_max_s") * 1e6
+        return s
+
+    def duty(self) -> float:
+        """Signed duty van het laatst toegepaste commando (+ = forward, 0 = coast/brake)."""
+        with self._lock:
+            cmd = self._last_cmd
+        if cmd is None:
+            return 0.0
+        if cmd[0] == "forward":
+            return cmd[1]
+        if cmd[0] == "backward":
+            return -cmd[1]
+        return 0.0
+
     def forward(self, speed: float = 1.0) -> None:
         """
         Laat de motor vooruit draaien.
@@ -35,12 +90,13 @@ class TransportMotor:
         speed = self._clamp_speed(speed)
 
         # *** BEIDE enables AAN ***
-        gpio.on(self.ren_name)
-        gpio.on(self.len_name)
-
         # Richting bepalen: vooruit = RPWM PWM, LPWM 0
-        gpio.set_value(self.lpwm_name, 0.0)
-        gpio.set_value(self.rpwm_name, speed)
+        self._command(("forward", speed), {
+            self.lpwm_name: 0.0,
+            self.ren_name: 1,
+            self.len_name: 1,
+            self.rpwm_name: speed,
+        })
 
     def backward(self, speed: float = 1.0) -> None:
         """
@@ -51,22 +107,25 @@ class TransportMotor:
         speed = self._clamp_speed(speed)
 
         # *** BEIDE enables AAN ***
-        gpio.on(self.ren_name)
-        gpio.on(self.len_name)
-
         # Richting bepalen: achteruit = LPWM PWM, RPWM 0
-        gpio.set_value(self.rpwm_name, 0.0)
-        gpio.set_value(self.lpwm_name, speed)
+        self._command(("backward", speed), {
+            self.rpwm_name: 0.0,
+            self.ren_name: 1,
+            self.len_name: 1,
+            self.lpwm_name: speed,
+        })
 
     def coast(self) -> None:
         """
         Motor laten 'uitrollen':
         beide enables UIT → H-brug in high-impedance (coast).
         """
-        gpio.off(self.ren_name)
-        gpio.off(self.len_name)
-        gpio.set_value(self.rpwm_name, 0.0)
-        gpio.set_value(self.lpwm_name, 0.0)
+        self._command(("coast",), {
+            self.ren_name: 0,
+            self.len_name: 0,
+            self.rpwm_name: 0.0,
+            self.lpwm_name: 0.0,
+        })
 
     def brake(self) -> None:
         """
@@ -74,10 +133,12 @@ class TransportMotor:
         beide enables AAN maar geen PWM → beide half-bridges actief.
         (IBT-2 remt hierdoor sterk)
         """
-        gpio.on(self.ren_name)
-        gpio.on(self.len_name)
-        gpio.set_value(self.rpwm_name, 0.0)
-        gpio.set_value(self.lpwm_name, 0.0)
+        self._command(("brake",), {
+            self.rpwm_name: 0.0,
+            self.lpwm_name: 0.0,
+            self.ren_name: 1,
+            self.len_name: 1,
+        })
 
     def stop(self, brake: bool = False) -> None:
         """
@@ -0,0 +1,250 @@
+# hardware/motor_ramp.py
+"""
+Slew-rate begrenzing voor de X-motor (tussenlaag vóór de PWM-pinnen).
+
+RampedMotor heeft dezelfde API als TransportMotor (forward/backward/stop/
+coast/brake) maar springt niet direct naar de gevraagde duty: een eigen
+tick-thread laat de duty met een maximale snelheid (duty per seconde) naar
+het doel lopen.
+
+  accel_per_s - optrekken (|duty| omhoog)
+  decel_per_s - afremmen naar een lagere duty, en bij omkeren eerst naar 0
+  brake_per_s - stop(brake=True): afremmen tot 0, pas dan de H-brug in brake
+
+De duty is signed (+ = forward, - = backward); omkeren loopt altijd via 0.
+stop(brake=False) / coast() schakelt de H-brug meteen uit (uitrollen geeft
+geen stroompiek), net als voorheen. immediate=True slaat de ramp over
+(noodstop).
+
+De tick draait alleen zolang er geramped wordt; bij een constante duty
+kost de laag niets. state() geeft doel, actuele duty en modus voor telemetrie,
+plus de command-to-write latency: van een nieuw doel tot de eerste pin-write.
+"""
+import threading
+import time
+
+
+class RampedMotor:
+    def __init__(self, motor, *,
+                 accel_per_s: float = 2.0,
+                 decel_per_s: float = 3.0,
+                 brake_per_s: float = 6.0,
+                 tick_hz: float = 200.0):
+        self.motor = motor
+        self.accel_per_s = float(accel_per_s)
+        self.decel_per_s = float(decel_per_s)
+        self.brake_per_s = float(brake_per_s)
+        self.period_s = 1.0 / float(tick_hz)
+
+        self._cond = threading.Condition()
+        self._target = 0.0
+        self._duty = 0.0
+        self._end = "coast"         # wat er bij duty 0 + doel 0 gebeurt: coast | brake
+        self._mode = "coast"        # accel | decel | cruise | braking | coast | brake
+        self._closed = False
+        self._stats = {"ticks": 0, "ramps": 0, "late_max_s": 0.0,
+                       "cmd_writes": 0, "cmd_latency_total_s": 0.0, "cmd_latency_max_s": 0.0}
+        self._cmd_t = None          # perf_counter van het laatste doel zonder write
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, motor, cfg) -> "RampedMotor":
+        """Bouw uit x_axis.motor_ramp (core/config.py MotorRampConfig)."""
+        return cls(motor, accel_per_s=cfg.accel_per_s, decel_per_s=cfg.decel_per_s,
+                   brake_per_s=cfg.brake_per_s, tick_hz=cfg.tick_hz)
+
+    def apply_tuning(self, cfg) -> None:
+        """Hot reload van de ramp-snelheden (geldt vanaf de volgende tick)."""
+        with self._cond:
+            self.accel_per_s = float(cfg.accel_per_s)
+            self.decel_per_s = float(cfg.decel_per_s)
+            self.brake_per_s = float(cfg.brake_per_s)
+
+    @staticmethod
+    def _clamp_speed(speed: float) -> float:
+        return max(0.0, min(1.0, float(speed)))
+
+    # ---------- commando's (zelfde API als TransportMotor) ----------
+    def forward(self, speed: float = 1.0) -> None:
+        self._set_target(self._clamp_speed(speed), "coast")
+
+    def backward(self, speed: float = 1.0) -> None:
+        self._set_target(-self._clamp_speed(speed), "coast")
+
+    def coast(self) -> None:
+        """H-brug direct uit (uitrollen)."""
+        with self._cond:
+            self._target = self._duty = 0.0
+            self._end = "coast"
+            self._mode = "coast"
+            self._cmd_t = None
+            self.motor.coast()
+
+    def brake(self, immediate: bool = False) -> None:
+        """
+        Begrensd remmen: duty met brake_per_s naar 0, daarna brake.
+        immediate=True: meteen brake (zoals TransportMotor.brake).
+        """
+        if immediate:
+            with self._cond:
+                self._target = self._duty = 0.0
+                self._end = "brake"
+                self._mode = "brake"
+                self._cmd_t = None
+                self.motor.brake()
+            return
+        self._set_target(0.0, "brake")
+
+    def stop(self, brake: bool = False, immediate: bool = False) -> None:
+        if brake:
+            self.brake(immediate=immediate)
+        else:
+            self.coast()
+
+    def _set_target(self, target: float, end: str) -> None:
+        with self._cond:
+            self._target = target
+            self._end = end
+            if self._duty != target or target == 0.0:
+                self._stats["ramps"] += 1
+                if self._cmd_t is None:
+                    self._cmd_t = time.perf_counter()
+                self._cond.notify()
+
+    # ---------- tick ----------
+    def _ramping_locked(self) -> bool:
+        if self._duty != self._target:
+            return True
+        # Doel 0 bereikt maar eindtoestand (coast/brake) nog niet geschreven
+        return self._target == 0.0 and self._mode != self._end
+
+    def _advance_locked(self, dt: float) -> None:
+        d, t = self._duty, self._target
+        same_dir = d == 0.0 or (t != 0.0 and (t > 0) == (d > 0))
+
+        if same_dir and abs(t) >= abs(d):
+            # optrekken (of vanuit stilstand)
+            step = self.accel_per_s * dt
+            goal = t
+            self._mode = "accel"
+        else:
+            # afremmen naar lagere duty; bij omkeren of stoppen eerst naar 0
+            rate = self.brake_per_s if (t == 0.0 and self._end == "brake") else self.decel_per_s
+            step = rate * dt
+            goal = t if same_dir else 0.0
+            self._mode = "braking" if self._end == "brake" and t == 0.0 else "decel"
+
+        if abs(goal - d) <= step:
+            d = goal
+        else:
+            d += step if goal > d else -step
+        self._duty = d
+
+        if d > 0.0:
+            self.motor.forward(d)
+        elif d < 0.0:
+            self.motor.backward(-d)
+        elif t == 0.0:
+            # Stilstand: eindtoestand schrijven
+            if self._end == "brake":
+                self.motor.brake()
+            else:
+                self.motor.coast()
+            self._mode = self._end
+        else:
+            # Omkeren: één tick door 0 (H-brug uit), daarna de andere kant op
+            self.motor.coast()
+        if d == t and d != 0.0:
+            self._mode = "cruise"
+
+        if self._cmd_t is not None:
+            lat = time.perf_counter() - self._cmd_t
+            self._cmd_t = None
+            stats = self._stats
+            stats["cmd_writes"] += 1
+            stats["cmd_latency_total_s"] += lat
+            if lat > stats["cmd_latency_max_s"]:
+                stats["cmd_latency_max_s"] = lat
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._ramping_locked():
+                    self._cond.wait()
+                if self._closed:
+                    return
+            last = time.perf_counter()
+            next_t = last + self.period_s
+
+            while True:
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                now = time.perf_counter()
+                with self._cond:
+                    if self._closed:
+                        return
+                    late = now - next_t
+                    if late > self._stats["late_max_s"]:
+                        self._stats["late_max_s"] = late
+                    self._stats["ticks"] += 1
+                    self._advance_locked(now - last)
+                    if not self._ramping_locked():
+                        break
+                last = now
+                next_t += self.period_s
+                if now - next_t > self.period_s:
+                    next_t = now + self.period_s    # te ver achter: niet inhalen
+
+    # ---------- telemetrie ----------
+    def duty(self) -> float:
+        """Signed duty die nu op de motor staat (niet het ramp-doel)."""
+        with self._cond:
+            return self._duty
+
+    def state(self) -> dict:
+        with self._cond:
+            return {
+                "target": self._target,
+                "duty": self._duty,
+                "mode": self._mode,
+                "accel_per_s": self.accel_per_s,
+                "decel_per_s": self.decel_per_s,
+                "brake_per_s": self.brake_per_s,
+                "ticks": self._stats["ticks"],
+                "ramps": self._stats["ramps"],
+                "tick_late_max_ms": self._stats["late_max_s"] * 1e3,
+                "cmd_writes": self._stats["cmd_writes"],
+                "cmd_latency_total_s": self._stats["cmd_latency_total_s"],
+                "cmd_latency_max_ms": self._stats["cmd_latency_max_s"] * 1e3,
+            }
+
+    def command_stats(self) -> dict:
+        return self.motor.command_stats()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+
+def make_x_motor(config_path="config.yaml"):
+    """
+    X-motor volgens x_axis.motor_ramp: RampedMotor om een TransportMotor
+    (met hot reload van de ramp-snelheden), of de kale TransportMotor.
+    """
+    from core.config import get_config_store
+    from hardware.motor_controller import TransportMotor
+
+    store = get_config_store(config_path)
+    ramp_cfg = store.current.x_axis.motor_ramp
+    motor = TransportMotor()
+    if not ramp_cfg.enabled:
+        return motor
+
+    ramped = RampedMotor.from_config(motor, ramp_cfg)
+    store.subscribe(lambda cfg: ramped.apply_tuning(cfg.x_axis.motor_ramp))
+    return ramped
@@ -0,0 +1,334 @@
+# hardware/pulse_engine.py
+"""
+Step-puls engine voor de TB6600.
+
+In plaats van per stap twee keer sleep() te doen, krijgt de engine een
+schema met absolute tijdstippen (deadlines). Per stap wordt grof geslapen
+tot vlak voor de deadline en de laatste fractie busy-waited. Omdat de
+deadlines absoluut zijn, stapelt sleep-jitter zich niet op (geen drift).
+Loopt de engine te ver achter (bv. GIL-pauze door Flask), dan wordt de rest
+van het schema opgeschoven i.p.v. een burst pulsen in te halen.
+
+De hardware zit achter een backend-interface:
+  RPiGPIOBackend  - RPi.GPIO (zoals voorheen)
+  GpiodBackend    - libgpiod (chip + lijnen uit config.yaml)
+  FakeStepBackend - neemt alle pin-wissels op met tijdstempel (dev/test)
+"""
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+import numpy as np
+
+from core.config import StepperConfig
+from core.hardware_backend import get_hardware_backend, is_simulated
+
+
+# ---------- backends ----------
+class StepBackend(ABC):
+    """
+    Interface voor de step/dir/ena-lijnen.
+    Niveaus zijn zoals de bestaande bedrading (common-anode, config
+    `signals_active_low: true`): ENA HIGH = enable, DIR LOW = forward,
+    PUL HIGH = puls. Met `signals_active_low: false` (common-cathode) zet
+    een backend alle pinnen precies omgekeerd.
+    """
+
+    @abstractmethod
+    def set_enable(self, on: bool) -> None:
+        ...
+
+    @abstractmethod
+    def set_direction(self, forward: bool) -> None:
+        ...
+
+    @abstractmethod
+    def step_high(self) -> None:
+        ...
+
+    @abstractmethod
+    def step_low(self) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class RPiGPIOBackend(StepBackend):
+    def __init__(self, pul_pin: int, dir_pin: int, ena_pin: int, *, bcm_mode: bool = True,
+                 active_low: bool = True):
+        import RPi.GPIO as GPIO
+
+        self._gpio = GPIO
+        self.pul = pul_pin
+        self.dir = dir_pin
+        self.ena = ena_pin
+        self._high, self._low = (GPIO.HIGH, GPIO.LOW) if active_low else (GPIO.LOW, GPIO.HIGH)
+
+        GPIO.setmode(GPIO.BCM if bcm_mode else GPIO.BOARD)
+        GPIO.setup(self.pul, GPIO.OUT, initial=self._low)
+        GPIO.setup(self.dir, GPIO.OUT, initial=self._low)
+        GPIO.setup(self.ena, GPIO.OUT, initial=self._low)
+
+    def set_enable(self, on: bool) -> None:
+        self._gpio.output(self.ena, self._high if on else self._low)
+
+    def set_direction(self, forward: bool) -> None:
+        self._gpio.output(self.dir, self._low if forward else self._high)
+
+    def step_high(self) -> None:
+        self._gpio.output(self.pul, self._high)
+
+    def step_low(self) -> None:
+        self._gpio.output(self.pul, self._low)
+
+    def close(self) -> None:
+        self._gpio.cleanup()
+
+
+class GpiodBackend(StepBackend):
+    """
+    libgpiod backend. Ondersteunt zowel de v2 API (gpiod.request_lines)
+    als de oudere v1 API (Chip.get_lines().request()).
+    """
+
+    def __init__(self, chip: str, step_pin: int, dir_pin: int, ena_pin: int,
+                 consumer: str = "tb6600", *, active_low: bool = True):
+        import gpiod
+
+        self.pins = (int(step_pin), int(dir_pin), int(ena_pin))
+        self.step_pin, self.dir_pin, self.ena_pin = self.pins
+
+        if hasattr(gpiod, "request_lines"):
+            from gpiod.line import Direction, Value
+
+            self._high, self._low = Value.ACTIVE, Value.INACTIVE
+            if not active_low:
+                self._high, self._low = self._low, self._high
+            self._req = gpiod.request_lines(
+                chip,
+                consumer=consumer,
+                config={
+                    self.pins: gpiod.LineSettings(direction=Direction.OUTPUT,
+                                                  output_value=self._low)
+                },
+            )
+            self._set = self._req.set_value
+            self._release = self._req.release
+        else:
+            self._high, self._low = (1, 0) if active_low else (0, 1)
+            self._chip = gpiod.Chip(chip)
+            lines = {p: self._chip.get_line(p) for p in self.pins}
+            for line in lines.values():
+                line.request(consumer=consumer, type=gpiod.LINE_REQ_DIR_OUT, default_vals=[self._low])
+            self._set = lambda pin, value: lines[pin].set_value(value)
+
+            def _release():
+                for line in lines.values():
+                    line.release()
+                self._chip.close()
+            self._release = _release
+
+    def set_enable(self, on: bool) -> None:
+        self._set(self.ena_pin, self._high if on else self._low)
+
+    def set_direction(self, forward: bool) -> None:
+        self._set(self.dir_pin, self._low if forward else self._high)
+
+    def step_high(self) -> None:
+        self._set(self.step_pin, self._high)
+
+    def step_low(self) -> None:
+        self._set(self.step_pin, self._low)
+
+    def close(self) -> None:
+        self._release()
+
+
+class FakeStepBackend(StepBackend):
+    """
+    Backend zonder hardware: neemt elke pin-wissel op als
+    (perf_counter, "ena"|"dir"|"pul", level), met het pinniveau zoals
+    een echte backend het zou zetten.
+    """
+
+    def __init__(self, *, active_low: bool = True):
+        self._lock = threading.Lock()
+        self.events: list[tuple[float, str, int]] = []
+        self._high, self._low = (1, 0) if active_low else (0, 1)
+
+    def _record(self, name: str, level: int) -> None:
+        with self._lock:
+            self.events.append((time.perf_counter(), name, level))
+
+    def set_enable(self, on: bool) -> None:
+        self._record("ena", self._high if on else self._low)
+
+    def set_direction(self, forward: bool) -> None:
+        self._record("dir", self._low if forward else self._high)
+
+    def step_high(self) -> None:
+        self._record("pul", self._high)
+
+    def step_low(self) -> None:
+        self._record("pul", self._low)
+
+    def step_times(self) -> np.ndarray:
+        """Tijdstippen van alle PUL-flanken naar het actieve niveau (step_high)."""
+        with self._lock:
+            return np.array([t for t, n, v in self.events if n == "pul" and v == self._high])
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events.clear()
+
+
+def make_step_backend(cfg: StepperConfig, *, pul_pin: int | None = None, dir_pin: int | None = None,
+                      ena_pin: int | None = None, app_backend: str | None = None) -> StepBackend:
+    """
+    Kies de backend op basis van de StepperConfig (`backend: rpi|gpiod|fake`).
+    Met de applicatie-backend mock/sim (core/hardware_backend.py) is het
+    altijd de FakeStepBackend.
+    Pinnen komen uit de config (step_pin/dir_pin/ena_pin), tenzij opgegeven;
+    `signals_active_low` bepaalt de pinniveaus van elke backend.
+    """
+    pul = cfg.step_pin if pul_pin is None else pul_pin
+    dir_ = cfg.dir_pin if dir_pin is None else dir_pin
+    ena = cfg.ena_pin if ena_pin is None else ena_pin
+
+    active_low = cfg.signals_active_low
+
+    if is_simulated(app_backend or get_hardware_backend()):
+        return FakeStepBackend(active_low=active_low)
+
+    kind = cfg.backend
+    if kind == "rpi":
+        return RPiGPIOBackend(pul, dir_, ena, active_low=active_low)
+    if kind == "gpiod":
+        return GpiodBackend(cfg.chip, pul, dir_, ena, active_low=active_low)
+    if kind == "fake":
+        return FakeStepBackend(active_low=active_low)
+    raise ValueError(f"Onbekende stepper backend '{kind}'")
+
+
+# ---------- engine ----------
+class PulseEngine:
+    """
+    Geeft pulsen op absolute deadlines.
+
+    min_pulse_us: breedte van de HIGH-puls (TB6600: >= 2.2 us, config: 8 us)
+    spin_us:      laatste stuk voor een deadline dat busy-waited wordt
+    max_late_us:  bij meer achterstand wordt het resterende schema opgeschoven
+    """
+
+    def __init__(self, backend: StepBackend, *, min_pulse_us: float = 8.0,
+                 spin_us: float = 300.0, max_late_us: float = 2000.0):
+        self.backend = backend
+        self.pulse_s = float(min_pulse_us) * 1e-6
+        self.spin_s = float(spin_us) * 1e-6
+        self.max_late_s = float(max_late_us) * 1e-6
+
+        # Signed stappenteller: wordt per gegeven puls bijgewerkt in run()
+        self.position = 0
+        self.next_deadline = 0.0
+
+        self._stats_lock = threading.Lock()
+        self._last_errors = np.empty(0, dtype=np.float64)
+        self._total_steps = 0
+        self._total_rebases = 0
+        self._worst_late_s = 0.0
+
+    def _wait_until(self, deadline: float) -> float:
+        now = time.perf_counter()
+        remaining = deadline - now
+        if remaining > self.spin_s:
+            time.sleep(remaining - self.spin_s)
+            now = time.perf_counter()
+        while now < deadline:
+            now = time.perf_counter()
+        return now
+
+    def wait_us(self, us: float) -> None:
+        """Korte busy-wait (setup-tijden van ENA/DIR), zonder sleep-granulariteit."""
+        self._wait_until(time.perf_counter() + us * 1e-6)
+
+    def run(self, intervals: np.ndarray,
+            should_stop: Optional[Callable[[], bool]] = None,
+            direction: int = +1, start: float | None = None) -> int:
+        """
+        Geef len(intervals) pulsen; intervals[i] is de tijd (s) van stap i
+        tot stap i+1. De eerste stap volgt direct, of op `start` (perf_counter)
+        zodat opeenvolgende chunks naadloos aansluiten via `next_deadline`.
+        direction (+1/-1) wordt per puls bij `position` opgeteld.
+        Geeft het aantal gegeven stappen terug (minder als should_stop() True werd).
+        """
+        n = len(intervals)
+        if n == 0:
+            return 0
+
+        offsets = np.concatenate(([0.0], np.cumsum(intervals[:-1])))
+        errors = np.empty(n, dtype=np.float64)
+        backend = self.backend
+        pulse_s = self.pulse_s
+        max_late_s = self.max_late_s
+        rebases = 0
+
+        t0 = time.perf_counter() if start is None else start
+        done = 0
+        for i, offset in enumerate(offsets.tolist()):
+            if should_stop is not None and should_stop():
+                break
+
+            deadline = t0 + offset
+            now = self._wait_until(deadline)
+            backend.step_high()
+            self.position += direction
+            late = now - deadline
+            errors[i] = late
+
+            # Te ver achter: schema opschuiven, niet inhalen
+            if late > max_late_s:
+                t0 += late
+                rebases += 1
+
+            end = now + pulse_s
+            while time.perf_counter() < end:
+                pass
+            backend.step_low()
+            done += 1
+
+        # Deadline van de volgende stap (voor een aansluitende chunk)
+        if done:
+            self.next_deadline = t0 + offsets[done - 1] + float(intervals[done - 1])
+
+        with self._stats_lock:
+            self._last_errors = errors[:done]
+            self._total_steps += done
+            self._total_rebases += rebases
+            if done:
+                self._worst_late_s = max(self._worst_late_s, float(errors[:done].max()))
+        return done
+
+    # ---------- timing statistieken ----------
+    def timing_stats(self) -> dict:
+        """
+        Timingfout van de laatste run (flank t.o.v. deadline, in us) plus totalen.
+        """
+        with self._stats_lock:
+            err = self._last_errors * 1e6
+            stats = {
+                "steps_total": self._total_steps,
+                "rebases_total": self._total_rebases,
+                "worst_late_us": self._worst_late_s * 1e6,
+                "last_steps": int(err.size),
+            }
+        if err.size:
+            stats.update(
+                last_mean_us=float(err.mean()),
+                last_max_us=float(err.max()),
+                last_p99_us=float(np.percentile(err, 99)),
+            )
+        return stats
@@ -0,0 +1,304 @@
+# hardware/safety.py
+"""
+Safety supervisor: een eigen thread die met een vaste frequentie (rate_hz)
+de X-as en Y-as bewaakt en bij een overtreding beide assen stopt.
+
+Bewaking (alleen zolang er duty op de X-motor staat, behalve Y-limiet):
+  stale     - encodermeting ouder dan max_sample_age_s (of reader ok=False)
+  limit     - X buiten [x_min_mm, x_max_mm] en nog verder naar buiten sturen
+              (alleen als de as gehomed is en er geen homing loopt)
+  stall     - toegepaste |duty| >= stall_duty maar minder dan stall_min_mm beweging in stall_s
+  watchdog  - handmatige X-jog zonder verversing binnen command_timeout_s
+              (de HMI stuurt het start-commando herhaald zolang de knop vast is)
+  y_limit   - Y voorbij de softe eindstops van de stepper (+ y_margin_mm)
+
+Een trip roept direct (in de supervisor-thread) motor.stop(brake=True,
+immediate) en stepper.stop(immediate=True) aan. Per trip wordt vastgelegd:
+reden, detail, detectietijd (van het moment dat de conditie waar werd tot de
+detectie, waar dat bekend is) en de duur van de stop-aanroepen. De
+reactietijd is dus begrensd door één periode + de lateness van de loop + de
+stop-duur; stats() geeft die drie (max) en de gerealiseerde bovengrens.
+
+  supervisor = SafetySupervisor(motor, reader, encoder_state, stepper=stepper).start()
+  supervisor.manual("forward")     # bij elk handmatig X-commando (stop: "stop")
+  supervisor.stats(), supervisor.trips()
+"""
+import threading
+import time
+from collections import deque
+
+REASONS = ("stale", "limit", "stall", "watchdog", "y_limit")
+
+
+def _angle_diff(a, b):
+    """Kleinste verschil tussen twee hoeken in graden (-180..180]."""
+    d = (float(a) - float(b)) % 360.0
+    return d - 360.0 if d > 180.0 else d
+
+
+class SafetySupervisor:
+    def __init__(self, motor, reader=None, encoder_state=None, stepper=None, homing=None, *,
+                 rate_hz=200.0, max_sample_age_s=0.25, x_min_mm=None, x_max_mm=None,
+                 toward_home="forward", stall_duty=0.2, stall_s=0.5, stall_min_mm=1.0,
+                 command_timeout_s=1.0, y_margin_mm=2.0, history=100):
+        self.motor = motor
+        self.reader = reader
+        self.encoder_state = encoder_state
+        self.stepper = stepper
+        self.homing = homing
+
+        self.period_s = 1.0 / float(rate_hz)
+        self.max_sample_age_s = float(max_sample_age_s)
+        self.x_min_mm = x_min_mm
+        self.x_max_mm = x_max_mm
+        # forward-duty rijdt naar home (mm neemt af) als toward_home == "forward"
+        self.toward_home = toward_home
+        self.stall_duty = float(stall_duty)
+        self.stall_s = float(stall_s)
+        self.stall_min_mm = float(stall_min_mm)
+        self.command_timeout_s = float(command_timeout_s)
+        self.y_margin_mm = float(y_margin_mm)
+
+        self._lock = threading.Lock()
+        self._trips = deque(maxlen=int(history))
+        self._counts = {reason: 0 for reason in REASONS}
+        self._stats = {"ticks": 0, "late_max_ms": 0.0, "check_max_ms": 0.0,
+                       "stop_max_ms": 0.0, "reaction_max_ms": 0.0}
+
+        # Handmatige jog (watchdog): tijdstip van het laatste start-commando
+        self._manual_t = None
+
+        # Stall: begin van het venster en afgelegde weg sinds dan
+        self._last_raw = None
+        self._stall_t0 = None
+        self._stall_mm = 0.0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, cfg, motor, reader=None, encoder_state=None, stepper=None,
+                    homing=None, toward_home="forward"):
+        """Bouw uit de `safety` sectie (core/config.py SafetyConfig)."""
+        return cls(motor, reader, encoder_state, stepper, homing,
+                   rate_hz=cfg.rate_hz, max_sample_age_s=cfg.max_sample_age_s,
+                   x_min_mm=cfg.x_min_mm, x_max_mm=cfg.x_max_mm, toward_home=toward_home,
+                   stall_duty=cfg.stall_duty, stall_s=cfg.stall_s,
+                   stall_min_mm=cfg.stall_min_mm, command_timeout_s=cfg.command_timeout_s,
+                   y_margin_mm=cfg.y_margin_mm, history=cfg.history)
+
+    def apply_tuning(self, cfg):
+        """Hot reload (safety.*): grenzen en tijden gelden vanaf de volgende tick."""
+        self.max_sample_age_s = cfg.max_sample_age_s
+        self.x_min_mm = cfg.x_min_mm
+        self.x_max_mm = cfg.x_max_mm
+        self.stall_duty = cfg.stall_duty
+        self.stall_s = cfg.stall_s
+        self.stall_min_mm = cfg.stall_min_mm
+        self.command_timeout_s = cfg.command_timeout_s
+        self.y_margin_mm = cfg.y_margin_mm
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="safety", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    # ---------- commando's ----------
+    def manual(self, action):
+        """Handmatig X-commando: forward/backward (ververst de watchdog) of stop."""
+        with self._lock:
+            self._manual_t = None if action == "stop" else time.monotonic()
+
+    def release(self):
+        """Geen handmatige jog meer (bv. homing of automatische beweging neemt over)."""
+        self.manual("stop")
+
+    # ---------- metingen ----------
+    def _duty(self):
+        """
+        (aangestuurd, toegepast): signed duty op de X-motor (+ = forward).
+        Aangestuurd telt het ramp-doel mee (watchdog/eindstops grijpen dan al
+        in tijdens het oplopen); stall kijkt alleen naar de toegepaste duty.
+        """
+        applied = self.motor.duty()
+        target = self.motor.state()["target"] if hasattr(self.motor, "state") else applied
+        return (target if abs(target) > abs(applied) else applied), applied
+
+    def _homing_active(self):
+        return self.homing is not None and self.homing.status()["running"]
+
+    # ---------- checks ----------
+    def _check_x(self, now, duty, applied):
+        """Geeft (reden, detail, tijdstip waarop de conditie waar werd) of None."""
+        if self.reader is None:
+            return None
+        data = self.reader.get_latest()
+        ts = data.get("ts")
+        if not data.get("ok") or data.get("angle_deg") is None or ts is None:
+            return "stale", f"geen geldige encodermeting ({data.get('error')})", None
+        age = time.time() - ts
+        if age > self.max_sample_age_s:
+            return "stale", f"encodermeting {age * 1e3:.0f} ms oud", \
+                now - (age - self.max_sample_age_s)
+
+        es = self.encoder_state
+        if es is None:
+            return None
+        raw = float(data["angle_deg"])
+        moved_mm = 0.0 if self._last_raw is None else \
+            abs(_angle_diff(raw, self._last_raw)) * es.mm_per_rev / 360.0
+        self._last_raw = raw
+
+        # Stall: toegepaste duty maar geen beweging binnen stall_s
+        if abs(applied) >= self.stall_duty:
+            if self._stall_t0 is None:
+                self._stall_t0, self._stall_mm = now, 0.0
+            self._stall_mm += moved_mm
+            if self._stall_mm >= self.stall_min_mm:
+                self._stall_t0, self._stall_mm = now, 0.0
+            elif now - self._stall_t0 > self.stall_s:
+                return "stall", (f"duty {applied:+.2f} maar {self._stall_mm:.2f} mm in "
+                                 f"{now - self._stall_t0:.2f} s"), self._stall_t0 + self.stall_s
+        else:
+            self._stall_t0 = None
+
+        # Softe eindstops: alleen gehomed, niet tijdens homing, en alleen naar buiten
+        if es.is_homed() and not self._homing_active():
+            mm = es.get_position_mm(raw)
+            toward_home = (duty > 0) == (self.toward_home == "forward")
+            if self.x_min_mm is not None and mm < self.x_min_mm and toward_home:
+                return "limit", f"X {mm:.1f} mm < min {self.x_min_mm} mm", None
+            if self.x_max_mm is not None and mm > self.x_max_mm and not toward_home:
+                return "limit", f"X {mm:.1f} mm > max {self.x_max_mm} mm", None
+        return None
+
+    def _check_watchdog(self, now):
+        with self._lock:
+            t = self._manual_t
+        if t is not None and self._homing_active():
+            # Homing heeft de motor overgenomen
+            self.release()
+            return None
+        if t is not None and now - t > self.command_timeout_s:
+            return "watchdog", f"handmatige jog {now - t:.2f} s niet ververst", \
+                t + self.command_timeout_s
+        return None
+
+    def _check_y(self):
+        st = self.stepper
+        if st is None or not st.is_moving:
+            return None
+        y = st.position_mm
+        if st.min_mm is not None and y < st.min_mm - self.y_margin_mm:
+            return "y_limit", f"Y {y:.1f} mm < min {st.min_mm} mm", None
+        if st.max_mm is not None and y > st.max_mm + self.y_margin_mm:
+            return "y_limit", f"Y {y:.1f} mm > max {st.max_mm} mm", None
+        return None
+
+    # ---------- trip ----------
+    def _stop_all(self):
+        try:
+            if hasattr(self.motor, "state"):
+                self.motor.stop(brake=True, immediate=True)     # RampedMotor: ramp overslaan
+            else:
+                self.motor.stop(brake=True)
+        except Exception as e:
+            print("Error in safety (motor stop):", e)
+        if self.stepper is not None:
+            try:
+                self.stepper.stop(immediate=True)
+            except Exception as e:
+                print("Error in safety (stepper stop):", e)
+
+    def _trip(self, reason, detail, t_condition, t_detect, duty):
+        if self.homing is not None:
+            self.homing.cancel()
+        self._stop_all()
+        t_done = time.monotonic()
+
+        detect_ms = None if t_condition is None else max(0.0, t_detect - t_condition) * 1e3
+        stop_ms = (t_done - t_detect) * 1e3
+        trip = {
+            "ts": time.time(),
+            "reason": reason,
+            "detail": detail,
+            "duty": round(duty, 3),
+            "detect_ms": None if detect_ms is None else round(detect_ms, 3),
+            "stop_ms": round(stop_ms, 3),
+            # Zonder bekend begin: hoogstens één periode tussen conditie en detectie
+            "reaction_ms": round((detect_ms if detect_ms is not None else self.period_s * 1e3)
+                                 + stop_ms, 3),
+        }
+        with self._lock:
+            self._manual_t = None
+            self._trips.append(trip)
+            self._counts[reason] += 1
+            self._stats["stop_max_ms"] = max(self._stats["stop_max_ms"], stop_ms)
+            self._stats["reaction_max_ms"] = max(self._stats["reaction_max_ms"], trip["reaction_ms"])
+        self._stall_t0 = None
+        print(f"[safety] TRIP {reason}: {detail} (reactie {trip['reaction_ms']:.1f} ms)")
+
+    # ---------- loop ----------
+    def tick(self):
+        """Eén controle-ronde (ook los aan te roepen, bv. in tests)."""
+        now = time.monotonic()
+        duty, applied = self._duty()
+        found = None
+        if duty != 0.0:
+            found = self._check_watchdog(now) or self._check_x(now, duty, applied)
+        else:
+            self._stall_t0 = None
+            self._last_raw = None
+        found = found or self._check_y()
+        if found is not None:
+            reason, detail, t_condition = found
+            self._trip(reason, detail, t_condition, time.monotonic(), duty)
+        return found
+
+    def _run(self):
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            late = time.monotonic() - next_t
+            t0 = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                print("Error in safety:", e)
+            check = time.monotonic() - t0
+            with self._lock:
+                self._stats["ticks"] += 1
+                self._stats["late_max_ms"] = max(self._stats["late_max_ms"], late * 1e3)
+                self._stats["check_max_ms"] = max(self._stats["check_max_ms"], check * 1e3)
+
+            next_t += self.period_s
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_t = time.monotonic()     # te ver achter: niet inhalen
+
+    # ---------- status ----------
+    def trips(self):
+        with self._lock:
+            return list(self._trips)
+
+    def trip_count(self):
+        """Totaal aantal trips (goedkoop; bv. om een lopende cyclus af te breken)."""
+        with self._lock:
+            return sum(self._counts.values())
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["trips"] = dict(self._counts)
+        out["period_ms"] = self.period_s * 1e3
+        # Gerealiseerde bovengrens: periode + grootste lateness + check + stop
+        out["reaction_bound_ms"] = out["period_ms"] + out["late_max_ms"] + out["check_max_ms"] \
+            + out["stop_max_ms"]
+        return out
@@ -29,6 +29,9 @@ class ArduinoSensorReader:
             "error": None,
         }
 
+        # Tellers voor /metrics
+        self._stats = {"lines": 0, "parse_errors": 0, "connects": 0, "errors": 0}
+
         self._stop = False
         self._thread = None
 
@@ -46,6 +49,43 @@ class ArduinoSensorReader:
         with self._lock:
             return dict(self._latest)
 
+    def stats(self):
+        """Regels, parse-fouten, (her)verbindingen en leeftijd van de laatste meting."""
+        with self._lock:
+            out = dict(self._stats)
+            ts = self._latest["ts"]
+            out["ok"] = self._latest["ok"]
+        out["age_s"] = None if ts is None else max(0.0, time.time() - ts)
+        return out
+
+    @staticmethod
+    def parse_line(line):
+        """'angle,pot' -> (angle_deg, pot_raw); ValueError bij een foute regel."""
+        angle_s, pot_s = line.split(",", 1)
+        return float(angle_s), int(pot_s)
+
+    def _handle_line(self, line):
+        """Eén ontvangen regel verwerken (meting of parse-fout)."""
+        try:
+            angle, pot = self.parse_line(line)
+        except ValueError:
+            with self._lock:
+                self._stats["lines"] += 1
+                self._stats["parse_errors"] += 1
+                self._latest.update(ok=False, last_line=line, error="Parse error")
+            return
+
+        with self._lock:
+            self._stats["lines"] += 1
+            self._latest.update(
+                angle_deg=angle,
+                pot_raw=pot,
+                ts=time.time(),
+                ok=True,
+                last_line=line,
+                error=None,
+            )
+
     def _find_port(self):
         ports = glob.glob("/dev/ttyACM*") + glob.glob("/dev/ttyUSB*")
         return ports[0] if ports else None
@@ -62,6 +102,7 @@ class ArduinoSensorReader:
             try:
                 with self._lock:
                     self._latest.update(port=port, error=None)
+                    self._stats["connects"] += 1
 
                 with serial.Serial(port, self.baudrate, timeout=1) as ser:
                     # Uno reset vaak bij openen van serial -> even wachten
@@ -74,30 +115,10 @@ class ArduinoSensorReader:
                         
                         # print(f"[ArduinoReader] RX: '{line}'")
 
-                        # verwacht "angle,pot"
-                        try:
-                            angle_s, pot_s = line.split(",", 1)
-                            angle = float(angle_s)
-                            pot = int(pot_s)
-
-                            with self._lock:
-                                self._latest.update(
-                                    angle_deg=angle,
-                                    pot_raw=pot,
-                                    ts=time.time(),
-                                    ok=True,
-                                    last_line=line,
-                                    error=None,
-                                )
-                        except Exception:
-                            with self._lock:
-                                self._latest.update(
-                                    ok=False,
-                                    last_line=line,
-                                    error="Parse error",
-                                )
+                        self._handle_line(line)
 
             except Exception as e:
                 with self._lock:
+                    self._stats["errors"] += 1
                     self._latest.update(ok=False, error=str(e))
                 time.sleep(1.0)
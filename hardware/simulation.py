@@ -0,0 +1,137 @@
+# hardware/simulation.py
+"""
+Gesimuleerde wagen voor de `sim` backend (zie core/hardware_backend.py).
+
+SimulatedCarriage leest de motor-outputs uit de GPIOManager (mock pins),
+integreert daaruit een X-positie en stuurt de homing-sensor aan.
+SimulatedArduinoReader levert dezelfde get_latest()-dict als de echte
+ArduinoSensorReader (encoderhoek + potmeter), berekend uit die positie.
+
+Richtingen zoals op de echte baan (zie HMI/app.py): motor "forward" rijdt
+naar de homing-sensor, de encoder telt dan af.
+"""
+import math
+import threading
+import time
+
+
+class SimulatedCarriage:
+    def __init__(self, gpio,
+                 rpwm_name="motor_rpwm", lpwm_name="motor_lpwm",
+                 ren_name="motor_ren", len_name="motor_len",
+                 sensor_name="sensor_1",
+                 max_speed_mm_s=150.0,
+                 time_constant_s=0.15,
+                 sensor_band_mm=(-10.0, 0.0),
+                 start_mm=250.0,
+                 rate_hz=500.0):
+        self.gpio = gpio
+        self.rpwm_name = rpwm_name
+        self.lpwm_name = lpwm_name
+        self.ren_name = ren_name
+        self.len_name = len_name
+        self.sensor_name = sensor_name
+
+        self.max_speed_mm_s = float(max_speed_mm_s)
+        self.time_constant_s = float(time_constant_s)
+        self.sensor_band_mm = sensor_band_mm
+        self.period_s = 1.0 / float(rate_hz)
+
+        self._lock = threading.Lock()
+        self._x_mm = float(start_mm)
+        self._v_mm_s = 0.0
+        self._sensor_active = None
+
+        self._stop = False
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop = True
+
+    def get_state(self):
+        with self._lock:
+            return {"x_mm": self._x_mm, "v_mm_s": self._v_mm_s}
+
+    def set_position_mm(self, x_mm):
+        with self._lock:
+            self._x_mm = float(x_mm)
+
+    def _target_velocity(self):
+        g = self.gpio
+        enabled = g.get_state(self.ren_name) and g.get_state(self.len_name)
+        if not enabled:
+            return None     # coast
+        # forward (RPWM) rijdt richting sensor = x neemt af
+        duty = float(g.get_state(self.lpwm_name) or 0.0) - float(g.get_state(self.rpwm_name) or 0.0)
+        return duty * self.max_speed_mm_s
+
+    def step(self, dt):
+        target = self._target_velocity()
+        with self._lock:
+            if target is None:
+                # uitrollen: trager afremmen dan actief sturen
+                tau = self.time_constant_s * 4.0
+                target = 0.0
+            else:
+                tau = self.time_constant_s
+            self._v_mm_s += (target - self._v_mm_s) * min(1.0, dt / tau)
+            self._x_mm += self._v_mm_s * dt
+            x = self._x_mm
+
+        lo, hi = self.sensor_band_mm
+        active = lo <= x <= hi
+        if active != self._sensor_active:
+            self._sensor_active = active
+            self.gpio.drive_input(self.sensor_name, active)
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop:
+            time.sleep(self.period_s)
+            now = time.perf_counter()
+            self.step(now - last)
+            last = now
+
+
+class SimulatedArduinoReader:
+    """Drop-in voor ArduinoSensorReader (start/stop/get_latest/stats)."""
+
+    def __init__(self, carriage, mm_per_rev=90.33, pot_raw=512):
+        self.carriage = carriage
+        self.mm_per_rev = float(mm_per_rev)
+        self.pot_raw = int(pot_raw)
+        self._lines = 0
+
+    def start(self):
+        self.carriage.start()
+
+    def stop(self):
+        self.carriage.stop()
+
+    def get_latest(self):
+        x = self.carriage.get_state()["x_mm"]
+        # encoder telt af als x toeneemt (direction_sign=-1 in de HMI)
+        angle = math.fmod(-x / self.mm_per_rev * 360.0, 360.0) % 360.0
+        line = f"{angle:.2f},{self.pot_raw}"
+        self._lines += 1
+        return {
+            "angle_deg": round(angle, 2),
+            "pot_raw": self.pot_raw,
+            "ts": time.time(),
+            "port": "sim",
+            "ok": True,
+            "last_line": line,
+            "error": None,
+        }
+
+    def stats(self):
+        # Elke get_latest() is een verse meting
+        return {"lines": self._lines, "parse_errors": 0, "connects": 1, "errors": 0,
+                "ok": True, "age_s": 0.0}
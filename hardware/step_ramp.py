@@ -0,0 +1,57 @@
+# hardware/step_ramp.py
+"""
+Trapezium-snelheidsprofielen voor de stappenmotor (AVR446-stijl).
+
+Alle functies werken in stappen en seconden:
+  rate  = stappen per seconde
+  accel = stappen per seconde²
+
+Het resultaat is een NumPy-array met per stap de tijd (s) tot de volgende
+stap. De tabel wordt per chunk vooraf berekend (profile_chunk), zodat de
+pulse-loop alleen nog hoeft te indexeren.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def profile_chunk(rate: float, cruise: float, accel: float, duration_s: float,
+                  remaining: int | None = None) -> tuple[np.ndarray, float]:
+    """
+    Interval-tabel voor ongeveer `duration_s` seconden beweging: de snelheid
+    loopt vanaf `rate` met `accel` naar `cruise` (beide >= 0). Met `remaining`
+    (stappen tot het doel) wordt bovendien op tijd afgeremd om precies op het
+    doel stil te staan. Zo kan de worker per chunk een nieuw doel oppakken.
+    Geeft (intervals, rate aan het eind) terug; leeg als er niets te doen is.
+    """
+    rate = max(float(rate), 0.0)
+    cruise = max(float(cruise), 0.0)
+    peak = max(rate, cruise)
+    if peak <= 0 or (remaining is not None and remaining <= 0):
+        return np.empty(0, dtype=np.float64), 0.0
+
+    # Aantal stappen: wat er bij de hoogste van de twee snelheden in de chunk past
+    steps = max(1, int(duration_s * peak))
+    if remaining is not None:
+        steps = min(steps, int(remaining))
+    n = np.arange(steps + 1, dtype=np.float64)
+
+    if cruise >= rate:
+        rates = np.minimum(np.sqrt(rate * rate + 2.0 * accel * n), cruise)
+    else:
+        rates = np.maximum(np.sqrt(np.maximum(rate * rate - 2.0 * accel * n, 0.0)), cruise)
+
+    if remaining is not None:
+        # Remcurve naar het doel (0 op de laatste stap)
+        rates = np.minimum(rates, np.sqrt(2.0 * accel * (remaining - n)))
+    elif cruise <= 0:
+        # Afremmen naar stilstand: de stap naar rate 0 valt weg, anders wordt
+        # het laatste interval onnodig lang
+        rates = rates[rates > 0]
+        if rates.size < 2:
+            return np.empty(0, dtype=np.float64), 0.0
+
+    # Eén stap vanuit stilstand naar stilstand: som 0, gebruik de startdelay
+    denom = rates[:-1] + rates[1:]
+    denom = np.where(denom > 0, denom, np.sqrt(2.0 * accel))
+    return 2.0 / denom, float(rates[-1])
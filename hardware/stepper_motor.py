@@ -2,114 +2,354 @@
 from __future__ import annotations
 
 import threading
-import queue
+import time
 from dataclasses import dataclass
-from time import sleep
-from typing import Optional
+from typing import Callable, Optional
 
-import RPi.GPIO as GPIO
+import numpy as np
+
+from core.config import StepperConfig, get_config
+from hardware.pulse_engine import PulseEngine, RPiGPIOBackend, StepBackend, make_step_backend
+from hardware.step_ramp import profile_chunk
+from hardware.stepper_scheduler import CommandScheduler, StepperCommand
+
+
+def load_stepper_config(name: str = "y_axis", config_path: str = "config.yaml") -> StepperConfig:
+    """Instellingen van één stepper uit de centrale config (sectie `steppers`)."""
+    try:
+        return get_config(config_path).steppers[name]
+    except KeyError:
+        raise ValueError(f"Geen stepper '{name}' in {config_path}") from None
 
 
 @dataclass
-class StepperCommand:
-    kind: str               # "move" | "stop"
-    forward: bool = True
-    steps: int = 0
-    delay_s: float = 0.001  # tijd tussen HIGH/LOW
+class _Goal:
+    kind: str                   # "pos" | "vel" | "stop"
+    target: int = 0             # pos: absolute doelpositie (stappen)
+    cruise: float = 0.0         # pos: kruissnelheid (stappen/s)
+    cmd: Optional[StepperCommand] = None
+    started: bool = False       # latency al geregistreerd
 
 
 class TB6600Stepper:
     """
-    TB6600 step/dir/ena driver via RPi.GPIO.
+    TB6600 step/dir/ena driver.
+
+    - Pinnen via een StepBackend (RPi.GPIO, libgpiod of fake); pulsen via de
+      PulseEngine op absolute deadlines i.p.v. sleep() per flank.
 
     - Non-blocking: Flask mag meteen teruggeven, beweging gebeurt in worker thread.
-    - Queue: commando's komen achter elkaar, geen overlap.
-    - stop(): wist wachtrij + stopt zo snel mogelijk (best-effort).
+    - Scheduler i.p.v. FIFO: move_to/jog nemen een lopende beweging over
+      (vloeiend afremmen/omkeren), relatieve moves in dezelfde richting worden
+      samengevoegd, stop heeft voorrang. Zie CommandScheduler.
+    - Moves volgen een trapezium-profiel (optrekken, kruisen, afremmen);
+      de interval-tabel wordt per chunk van CHUNK_S vooraf met NumPy berekend.
+    - stop(): wist wachtrij + remt af langs het profiel (immediate=True: direct).
+    - Positie: exacte signed stappenteller (bijgewerkt per puls, ook bij een
+      onderbroken move); position_mm / move_to_mm() / home() / set_position_mm().
+    - jog(): snelheidsmodus; snelheid live aanpasbaar, met keepalive (deadman):
+      zonder verversing binnen jog_keepalive_s remt de as zelf af.
     """
 
-    def __init__(self, pul_pin: int, dir_pin: int, ena_pin: int, *, bcm_mode: bool = True):
+    # Lengte van één chunk: bepaalt hoe snel een nieuw doel / nieuwe snelheid ingaat
+    CHUNK_S = 0.01
+
+    def __init__(self, pul_pin: int | None = None, dir_pin: int | None = None,
+                 ena_pin: int | None = None, *, bcm_mode: bool = True,
+                 backend: StepBackend | None = None,
+                 steps_per_mm: float = 400.0,
+                 max_speed_mm_s: float = 25.0,
+                 accel_mm_s2: float = 150.0,
+                 min_pulse_us: float = 8.0,
+                 min_mm: float | None = None,
+                 max_mm: float | None = None,
+                 setup_us: float = 10.0,
+                 jog_keepalive_s: float = 0.5):
         self.pul = pul_pin
         self.dir = dir_pin
         self.ena = ena_pin
 
-        if bcm_mode:
-            GPIO.setmode(GPIO.BCM)
-        else:
-            GPIO.setmode(GPIO.BOARD)
+        self.steps_per_mm = float(steps_per_mm)
+        self.max_rate = float(max_speed_mm_s) * self.steps_per_mm   # stappen/s
+        self.accel = float(accel_mm_s2) * self.steps_per_mm         # stappen/s²
+
+        # Softe eindstops voor absolute moves (None = geen grens)
+        self.min_mm = None if min_mm is None else float(min_mm)
+        self.max_mm = None if max_mm is None else float(max_mm)
+
+        if backend is None:
+            backend = RPiGPIOBackend(pul_pin, dir_pin, ena_pin, bcm_mode=bcm_mode)
+        self.backend = backend
+        self.engine = PulseEngine(backend, min_pulse_us=min_pulse_us)
 
-        GPIO.setup(self.pul, GPIO.OUT, initial=GPIO.LOW)
-        GPIO.setup(self.dir, GPIO.OUT, initial=GPIO.LOW)
-        GPIO.setup(self.ena, GPIO.OUT, initial=GPIO.LOW)
+        # ENA->DIR en DIR->PUL setup-tijd (TB6600: >= 5 us)
+        self.setup_us = float(setup_us)
+        self._enabled = False
+        self._forward: Optional[bool] = None
 
-        self._cmd_q: "queue.Queue[Optional[StepperCommand]]" = queue.Queue()
-        self._stop_flag = threading.Event()
+        # Jog (snelheidsmodus): doel in stappen/s (signed) + keepalive deadline
+        self.jog_keepalive_s = float(jog_keepalive_s)
+        self._jog_lock = threading.Lock()
+        self._jog_target = 0.0
+        self._jog_deadline = 0.0
+        self._jog_active = False
+
+        self._sched = CommandScheduler()
         self._running = True
+        self._busy = False          # worker voert een beweging uit (telemetrie)
 
         self._worker = threading.Thread(target=self._run, daemon=True)
         self._worker.start()
 
+    @classmethod
+    def from_config(cls, cfg: StepperConfig, *, backend: StepBackend | None = None) -> "TB6600Stepper":
+        """Bouw een stepper uit een StepperConfig (`steppers.<naam>` in config.yaml)."""
+        if backend is None:
+            backend = make_step_backend(cfg)
+        return cls(
+            cfg.step_pin, cfg.dir_pin, cfg.ena_pin,
+            backend=backend,
+            steps_per_mm=cfg.steps_per_mm,
+            max_speed_mm_s=cfg.max_speed_mm_s,
+            accel_mm_s2=cfg.accel_mm_s2,
+            min_pulse_us=cfg.min_pulse_us,
+            min_mm=cfg.min_mm,
+            max_mm=cfg.max_mm,
+            setup_us=cfg.setup_us,
+            jog_keepalive_s=cfg.jog_keepalive_s,
+        )
+
+    def apply_tuning(self, cfg: StepperConfig) -> None:
+        """
+        Hot reload van de afstelbare parameters (zie core/config.py TUNABLE).
+        De acceleratie en eindstops gelden vanaf de volgende chunk; een nieuwe
+        topsnelheid vanaf het volgende commando (of jog-keepalive).
+        """
+        self.max_rate = float(cfg.max_speed_mm_s) * self.steps_per_mm
+        self.accel = float(cfg.accel_mm_s2) * self.steps_per_mm
+        self.min_mm = cfg.min_mm
+        self.max_mm = cfg.max_mm
+        self.jog_keepalive_s = float(cfg.jog_keepalive_s)
+
     # ---------- low-level ----------
     def _enable(self):
-        GPIO.output(self.ena, GPIO.HIGH)
+        self.backend.set_enable(True)
+        self._enabled = True
 
     def _disable(self):
-        GPIO.output(self.ena, GPIO.LOW)
+        self.backend.set_enable(False)
+        self._enabled = False
 
     def _set_direction(self, forward: bool):
         # Jij had: DIR LOW = forward, DIR HIGH = backward
-        GPIO.output(self.dir, GPIO.LOW if forward else GPIO.HIGH)
+        self.backend.set_direction(forward)
+        self._forward = forward
+
+    def _prepare(self, forward: bool):
+        """
+        Enable + direction vóór de eerste puls. Alleen wat verandert wordt
+        geschreven, met een korte busy-wait als setup-tijd i.p.v. 2x 10 ms sleep.
+        """
+        if not self._enabled:
+            self._enable()
+            self.engine.wait_us(self.setup_us)
+        if self._forward is not forward:
+            self._set_direction(forward)
+            self.engine.wait_us(self.setup_us)
 
     # ---------- worker ----------
     def _run(self):
         while self._running:
-            cmd = self._cmd_q.get()
+            cmd = self._sched.get()
             if cmd is None:
                 break
 
-            try:
-                if cmd.kind == "stop":
-                    self._stop_flag.set()
-                    self._disable()
-                    continue
+            if cmd == "stop":
+                # Stop terwijl we stilstaan: alleen disable
+                self._disable()
+                continue
 
-                if cmd.kind == "move":
-                    self._execute_move(cmd.forward, cmd.steps, cmd.delay_s)
+            self._busy = True
+            try:
+                if cmd.kind == "home":
+                    self._execute_home(cmd.forward, cmd.steps, cmd.rate, cmd.sensor, cmd.home_mm)
+                else:
+                    self._execute_motion(cmd)
+            finally:
+                self._busy = False
+
+    def _goal_from(self, cmd: StepperCommand, current: Optional[_Goal] = None) -> _Goal:
+        """Vertaal een commando naar een doel; een relatieve move telt op bij `current`."""
+        if cmd.kind == "jog":
+            return _Goal("vel", cmd=cmd)
+        if cmd.kind == "move_to":
+            return _Goal("pos", target=cmd.target, cruise=cmd.rate, cmd=cmd)
+
+        # relatieve move: vanaf het lopende doel (samenvoegen) of de huidige positie
+        base = current.target if current is not None and current.kind == "pos" else self.engine.position
+        sign = +1 if cmd.forward else -1
+        return _Goal("pos", target=base + sign * cmd.steps, cruise=cmd.rate, cmd=cmd)
+
+    def _goal_direction(self, goal: _Goal) -> Optional[bool]:
+        """Richting van een positie-doel (voor samenvoegen van relatieve moves)."""
+        if goal.kind != "pos":
+            return None
+        d = goal.target - self.engine.position
+        if d == 0:
+            return None
+        return d > 0
+
+    def _jog_state(self) -> tuple[int, float]:
+        """(richting, snelheid) van de jog; 0 bij verlopen keepalive."""
+        with self._jog_lock:
+            if time.monotonic() > self._jog_deadline:
+                self._jog_target = 0.0
+            target = self._jog_target
+        return (target > 0) - (target < 0), abs(target)
+
+    def _limit_remaining(self, sign: int) -> Optional[int]:
+        """Stappen tot de softe eindstop in richting `sign` (None = geen grens)."""
+        if sign > 0 and self.max_mm is not None:
+            return max(0, int(self.max_mm * self.steps_per_mm) - self.engine.position)
+        if sign < 0 and self.min_mm is not None:
+            return max(0, self.engine.position - int(self.min_mm * self.steps_per_mm))
+        return None
+
+    def _end_jog(self, force: bool = False) -> bool:
+        """
+        Jog-modus verlaten. Zonder force: False als er net een nieuwe
+        jog-snelheid is gezet (dan blijft de jog lopen).
+        """
+        with self._jog_lock:
+            if not force and time.monotonic() <= self._jog_deadline and self._jog_target != 0:
+                return False
+            self._jog_active = False
+            self._jog_target = 0.0
+            return True
+
+    def _execute_motion(self, cmd: StepperCommand):
+        """
+        Eén doorlopende beweging. Per chunk van CHUNK_S:
+          1) stop (voorrang) -> doel wordt "afremmen tot stilstand"
+          2) move_to/jog nemen het doel over; relatieve moves in dezelfde
+             richting tellen op bij het doel (geen tussenstop)
+          3) profiel-chunk vanaf de huidige snelheid naar het (nieuwe) doel;
+             moet er omgekeerd worden, dan eerst afremmen naar 0 (zonder disable)
+        Staat de as stil op het doel, dan wordt het volgende wachtende
+        bewegingscommando direct opgepakt; anders eindigt de beweging.
+        """
+        abort = self._sched.abort_event.is_set
+        goal = self._goal_from(cmd)
+        rate = 0.0      # huidige snelheid (stappen/s, >= 0)
+        sign = 0        # huidige richting (+1/-1, 0 = stil)
+        start = None
+
+        while not abort():
+            if self._sched.take_stop():
+                if goal.kind == "vel":
+                    self._end_jog(force=True)
+                goal = _Goal("stop")
+            else:
+                nxt = self._sched.take_preempt(self._goal_direction(goal))
+                if nxt is not None:
+                    if goal.kind == "vel" and nxt.kind != "jog":
+                        self._end_jog(force=True)
+                    goal = self._goal_from(nxt, goal)
+
+            # Gewenste richting / snelheid / resterende stappen
+            remaining: Optional[int] = None
+            if goal.kind == "pos":
+                d = goal.target - self.engine.position
+                want_sign, cruise, remaining = (d > 0) - (d < 0), goal.cruise, abs(d)
+            elif goal.kind == "vel":
+                want_sign, cruise = self._jog_state()
+                if want_sign != 0:
+                    remaining = self._limit_remaining(want_sign)
+                    if remaining == 0:
+                        want_sign = 0
+            else:
+                want_sign, cruise = 0, 0.0
+
+            if rate <= 0:
+                start = None
+                if want_sign == 0:
+                    # Stilstand en niets meer te doen voor dit doel
+                    if goal.kind == "vel" and not self._end_jog():
+                        time.sleep(self.CHUNK_S)
+                        continue
+                    nxt = self._sched.take_next(("move", "move_to", "jog"))
+                    if nxt is None:
+                        break
+                    goal = self._goal_from(nxt)
                     continue
+                sign = want_sign
+
+            if want_sign != sign:
+                # Omkeren: eerst afremmen tot stilstand
+                cruise, remaining = 0.0, None
+            elif remaining is not None and rate * rate > 2.0 * self.accel * (remaining + 1):
+                # Doel ligt binnen de remweg: afremmen, daarna terug
+                cruise, remaining = 0.0, None
+
+            intervals, end_rate = profile_chunk(rate, cruise, self.accel, self.CHUNK_S, remaining)
+            if intervals.size == 0:
+                rate = 0.0
+                continue
+
+            self._prepare(sign > 0)
+            if start is not None and start < time.perf_counter() - self.CHUNK_S:
+                start = None
+            if not goal.started and goal.cmd is not None:
+                goal.started = True
+                self._sched.record_motion_start(goal.cmd)
+            self.engine.run(intervals, should_stop=abort, direction=sign, start=start)
+            start = self.engine.next_deadline
+            rate = end_rate
+
+        if goal.kind == "vel":
+            self._end_jog(force=True)
+        self._disable()
 
-            finally:
-                self._cmd_q.task_done()
+    def _execute_home(self, forward: bool, max_steps: int, rate: float,
+                      sensor: Callable[[], bool], home_mm: float):
+        """
+        Rijd met constante (lage) snelheid richting sensor tot sensor() True is,
+        en zet de stappenteller dan op home_mm. Geen sensor binnen max_steps of
+        een stop: positie blijft ongewijzigd.
+        """
+        # Eerst checken of we er al staan
+        if sensor():
+            self.set_position_mm(home_mm)
+            return
 
-    def _execute_move(self, forward: bool, steps: int, delay_s: float):
-        # reset stop flag voor deze move
-        self._stop_flag.clear()
+        intervals = np.full(max_steps, 1.0 / rate)
 
-        if steps <= 0:
-            return
+        self._prepare(forward)
 
-        # Enable + direction
-        self._enable()
-        sleep(0.01)
-        self._set_direction(forward)
-        sleep(0.01)
+        abort = self._sched.abort_event.is_set
+        stop = self._sched.stop_event.is_set
+        found = []
 
-        # Pulses (best-effort stop: check flag per step)
-        for _ in range(steps):
-            if self._stop_flag.is_set():
-                break
-            GPIO.output(self.pul, GPIO.HIGH)
-            sleep(delay_s)
-            GPIO.output(self.pul, GPIO.LOW)
-            sleep(delay_s)
+        def should_stop():
+            if sensor():
+                found.append(True)
+                return True
+            return abort() or stop()
 
-        # Disable na beweging
+        self.engine.run(intervals, should_stop=should_stop, direction=+1 if forward else -1)
         self._disable()
 
+        if found:
+            self.set_position_mm(home_mm)
+
     # ---------- public API ----------
     def move(self, *, direction: str, steps: int, delay_s: float):
         """
         direction: "forward" of "backward"
         steps: aantal pulses
-        delay_s: seconds tussen high/low
+        delay_s: seconds tussen high/low bij kruissnelheid (periode = 2 * delay_s).
+                 Wordt begrensd op max_speed_mm_s uit de config; het optrekken
+                 en afremmen gebeurt via het trapezium-profiel.
         """
         direction = (direction or "").lower().strip()
         if direction not in ("forward", "backward"):
@@ -124,49 +364,142 @@ class TB6600Stepper:
         if steps > 400000:
             steps = 400000
 
-        # Python is niet realtime; superkleine delays werken vaak niet goed
-        if delay_s < 0.0001:
-            delay_s = 0.0001
+        forward = (direction == "forward")
+        rate = self._rate_from_delay(delay_s)
+        self._sched.submit(StepperCommand(kind="move", forward=forward, steps=steps, rate=rate))
+
+    def jog(self, velocity_mm_s: float):
+        """
+        Snelheidsmodus: rijd met velocity_mm_s (signed, + = forward) tot een
+        nieuwe jog(), stop() of het verlopen van de keepalive. Herhaald
+        aanroepen ververst de keepalive en past de snelheid live aan;
+        jog(0) remt af. Begrensd op max_speed_mm_s en de softe eindstops.
+        """
+        rate = float(velocity_mm_s) * self.steps_per_mm
+        rate = max(-self.max_rate, min(self.max_rate, rate))
+
+        with self._jog_lock:
+            self._jog_target = rate
+            self._jog_deadline = time.monotonic() + self.jog_keepalive_s
+            if self._jog_active or rate == 0:
+                return
+            self._jog_active = True
+
+        self._sched.submit(StepperCommand(kind="jog"))
+
+    def jog_keepalive(self):
+        """Ververs alleen de deadman-timer van een lopende jog."""
+        with self._jog_lock:
+            self._jog_deadline = time.monotonic() + self.jog_keepalive_s
+
+    @property
+    def is_jogging(self) -> bool:
+        with self._jog_lock:
+            return self._jog_active
+
+    @property
+    def is_moving(self) -> bool:
+        """True zolang de worker een beweging (move/jog/home) uitvoert."""
+        return self._busy
+
+    def _rate_from_delay(self, delay_s: float) -> float:
+        # Snelheid uit delay; bovengrens is de mechanische topsnelheid
         if delay_s > 0.05:
             delay_s = 0.05
+        rate = 1.0 / (2.0 * delay_s) if delay_s > 0 else self.max_rate
+        return min(rate, self.max_rate)
+
+    # ---------- positie ----------
+    @property
+    def position_steps(self) -> int:
+        """Signed aantal gegeven stappen t.o.v. nul (forward = +)."""
+        return self.engine.position
+
+    @property
+    def position_mm(self) -> float:
+        return self.engine.position / self.steps_per_mm
+
+    def clamp_mm(self, position_mm: float) -> float:
+        """Begrens een doelpositie op de softe eindstops (min_mm/max_mm)."""
+        if self.min_mm is not None:
+            position_mm = max(self.min_mm, position_mm)
+        if self.max_mm is not None:
+            position_mm = min(self.max_mm, position_mm)
+        return position_mm
+
+    def move_to_mm(self, position_mm: float, *, speed_mm_s: float | None = None,
+                   delay_s: float | None = None):
+        """
+        Absolute move naar position_mm (begrensd op min_mm/max_mm).
+        Snelheid via speed_mm_s, of via delay_s zoals bij move(); standaard max.
+        """
+        if speed_mm_s is not None:
+            rate = min(float(speed_mm_s) * self.steps_per_mm, self.max_rate)
+        elif delay_s is not None:
+            rate = self._rate_from_delay(float(delay_s))
+        else:
+            rate = self.max_rate
 
-        forward = (direction == "forward")
-        self._cmd_q.put(StepperCommand(kind="move", forward=forward, steps=steps, delay_s=delay_s))
+        target = int(round(self.clamp_mm(float(position_mm)) * self.steps_per_mm))
+        self._sched.submit(StepperCommand(kind="move_to", target=target, rate=rate))
+
+    def set_position_mm(self, position_mm: float = 0.0):
+        """Zeroing-hook: verklaar de huidige positie tot position_mm."""
+        self.engine.position = int(round(float(position_mm) * self.steps_per_mm))
 
-    def stop(self):
+    def home(self, sensor: Callable[[], bool], *, direction: str = "backward",
+             speed_mm_s: float = 5.0, max_travel_mm: float = 500.0, home_mm: float = 0.0):
         """
-        Best-effort stop:
-        - zet stop_flag zodat lopende move z.s.m. stopt
+        Homing-hook: rijd (via de queue) richting `direction` tot sensor() True
+        geeft en zet de positie op home_mm. Stopt na max_travel_mm zonder sensor.
+        """
+        direction = (direction or "").lower().strip()
+        if direction not in ("forward", "backward"):
+            raise ValueError("direction must be 'forward' or 'backward'")
+
+        rate = min(float(speed_mm_s) * self.steps_per_mm, self.max_rate)
+        steps = int(float(max_travel_mm) * self.steps_per_mm)
+        self._sched.submit(StepperCommand(kind="home", forward=(direction == "forward"),
+                                          steps=steps, rate=rate, sensor=sensor,
+                                          home_mm=float(home_mm)))
+
+    def stop(self, immediate: bool = False):
+        """
+        Stop:
+        - stop met voorrang: lopende beweging remt af langs het profiel
+          (immediate=True: pulsen direct stoppen, zonder afremmen)
         - maak wachtrij leeg
-        - disable driver
+        - disable driver (na het afremmen)
         """
-        self._stop_flag.set()
+        with self._jog_lock:
+            self._jog_target = 0.0
 
-        # queue leegmaken
-        while True:
-            try:
-                item = self._cmd_q.get_nowait()
-                if item is None:
-                    # laat shutdown token niet weggooien
-                    self._cmd_q.put(None)
-                    break
-                self._cmd_q.task_done()
-            except queue.Empty:
-                break
+        flushed = self._sched.stop(immediate=immediate)
+        if any(c.kind == "jog" for c in flushed):
+            # jog is nooit gestart: volgende jog() moet opnieuw submitten
+            with self._jog_lock:
+                self._jog_active = False
 
-        # direct disable + stop command (voor zekerheid)
-        self._disable()
-        self._cmd_q.put(StepperCommand(kind="stop"))
+        # immediate: direct disable; anders doet de worker dat na het afremmen
+        if immediate:
+            self._disable()
+
+    def timing_stats(self) -> dict:
+        """Behaalde step-timing (zie PulseEngine.timing_stats)."""
+        return self.engine.timing_stats()
+
+    def command_metrics(self) -> dict:
+        """Queue-diepte, merges/preempts en command-to-motion latency."""
+        return self._sched.metrics()
 
     def shutdown(self):
         """
         Netjes afsluiten: stopt worker en doet GPIO cleanup.
         """
         self._running = False
-        self._stop_flag.set()
+        self._sched.close()
         self._disable()
-        self._cmd_q.put(None)
         try:
             self._worker.join(timeout=1.0)
         finally:
-            GPIO.cleanup()
+            self.backend.close()
@@ -0,0 +1,178 @@
+# hardware/stepper_scheduler.py
+"""
+Commando-scheduler voor de TB6600Stepper (vervangt de platte FIFO).
+
+- stop heeft voorrang: wist alles wat nog wacht en wordt als eerste gezien;
+  stop(immediate=True) zet ook abort_event, dat pas bij het uitgeven van het
+  volgende commando (onder de lock) gewist wordt, zodat een directe stop
+  nooit tussen get() en het begin van de beweging verloren gaat
+- preempt: move_to en jog nemen het doel van de lopende beweging over
+  (de worker remt dan vloeiend af / keert om, zonder stilstand-disable)
+- merge: opeenvolgende relatieve moves in dezelfde richting worden één move
+- metrics: queue-diepte en command-to-motion latency
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+
+# Commando's die de lopende beweging direct overnemen
+PREEMPTING = ("move_to", "jog")
+
+
+@dataclass
+class StepperCommand:
+    kind: str               # "move" | "move_to" | "home" | "jog"
+    forward: bool = True
+    steps: int = 0
+    rate: float = 500.0     # gewenste kruissnelheid (stappen/s)
+    target: int = 0         # move_to: absolute doelpositie (stappen)
+    sensor: Optional[Callable[[], bool]] = None  # home: True = home bereikt
+    home_mm: float = 0.0    # home: positie die de sensor voorstelt
+    submitted: float = field(default_factory=time.perf_counter)
+
+
+class CommandScheduler:
+    def __init__(self, latency_samples: int = 256):
+        self._cond = threading.Condition()
+        self._pending: deque[StepperCommand] = deque()
+        self._stop = False
+        self._closed = False
+
+        self.stop_event = threading.Event()
+        # Directe stop (pulsen meteen stoppen); geldt voor de lopende beweging
+        self.abort_event = threading.Event()
+
+        self._latencies: deque[float] = deque(maxlen=latency_samples)
+        self._counts = {"submitted": 0, "merged": 0, "preempted": 0, "stops": 0, "flushed": 0}
+        self._max_depth = 0
+
+    # ---------- producer kant ----------
+    def submit(self, cmd: StepperCommand) -> None:
+        with self._cond:
+            self._counts["submitted"] += 1
+            tail = self._pending[-1] if self._pending else None
+
+            if (cmd.kind == "move" and tail is not None and tail.kind == "move"
+                    and tail.forward == cmd.forward):
+                # Samenvoegen: één langere move, nieuwste snelheid
+                tail.steps += cmd.steps
+                tail.rate = cmd.rate
+                self._counts["merged"] += 1
+            elif cmd.kind in PREEMPTING:
+                # Nieuw doel: wat hiervoor nog wachtte aan moves is achterhaald
+                dropped = [c for c in self._pending if c.kind != "home"]
+                self._counts["flushed"] += len(dropped)
+                self._pending = deque(c for c in self._pending if c.kind == "home")
+                self._pending.append(cmd)
+            else:
+                self._pending.append(cmd)
+
+            self._max_depth = max(self._max_depth, len(self._pending))
+            self._cond.notify()
+
+    def stop(self, immediate: bool = False) -> list[StepperCommand]:
+        """
+        Stop met voorrang: wis de wachtrij (immediate: ook abort_event).
+        Geeft de gewiste commando's terug.
+        """
+        with self._cond:
+            flushed = list(self._pending)
+            self._pending.clear()
+            self._stop = True
+            self.stop_event.set()
+            if immediate:
+                self.abort_event.set()
+            self._counts["stops"] += 1
+            self._counts["flushed"] += len(flushed)
+            self._cond.notify()
+        return flushed
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self.abort_event.set()
+            self._cond.notify()
+
+    # ---------- worker kant ----------
+    def get(self) -> Optional[StepperCommand | str]:
+        """
+        Blokkeer tot er iets is. Geeft "stop", een commando, of None bij close().
+        """
+        with self._cond:
+            while not (self._closed or self._stop or self._pending):
+                self._cond.wait()
+            if self._closed:
+                return None
+            # Alles vóór dit punt is afgehandeld: een nieuwe directe stop
+            # (na deze lock) breekt het uitgegeven commando af
+            self.abort_event.clear()
+            if self._take_stop_locked():
+                return "stop"
+            return self._pending.popleft()
+
+    def take_stop(self) -> bool:
+        with self._cond:
+            return self._take_stop_locked()
+
+    def _take_stop_locked(self) -> bool:
+        if not self._stop:
+            return False
+        self._stop = False
+        self.stop_event.clear()
+        return True
+
+    def take_preempt(self, forward: Optional[bool]) -> Optional[StepperCommand]:
+        """
+        Voor de worker tijdens een beweging (per chunk): geef het eerste
+        wachtende commando terug als het de beweging mag overnemen
+        (move_to/jog) of erbij mag (relatieve move in richting `forward`).
+        """
+        with self._cond:
+            if not self._pending:
+                return None
+            head = self._pending[0]
+            if head.kind in PREEMPTING:
+                self._counts["preempted"] += 1
+                return self._pending.popleft()
+            if head.kind == "move" and forward is not None and head.forward == forward:
+                self._counts["merged"] += 1
+                return self._pending.popleft()
+            return None
+
+    def take_next(self, kinds: tuple[str, ...]) -> Optional[StepperCommand]:
+        """Niet-blokkerend: volgend commando als het van een van deze soorten is."""
+        with self._cond:
+            if self._pending and self._pending[0].kind in kinds:
+                return self._pending.popleft()
+            return None
+
+    def record_motion_start(self, cmd: StepperCommand) -> None:
+        """Command-to-motion latency: van submit tot de eerste chunk ervoor."""
+        with self._cond:
+            self._latencies.append(time.perf_counter() - cmd.submitted)
+
+    # ---------- metrics ----------
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            lat = np.array(self._latencies) * 1e3
+            out = dict(self._counts)
+            out.update(depth=len(self._pending), max_depth=self._max_depth)
+        if lat.size:
+            out.update(
+                latency_last_ms=float(lat[-1]),
+                latency_mean_ms=float(lat.mean()),
+                latency_p95_ms=float(np.percentile(lat, 95)),
+                latency_max_ms=float(lat.max()),
+            )
+        return out
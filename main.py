@@ -1,30 +1,64 @@
+import json
 import os
 import subprocess
 import time
-from core.gpio_singleton import gpio
+import urllib.error
+import urllib.request
 from time import sleep
 import signal
 import sys
-from HMI.app import app
-from threading import Thread
+from HMI.app import create_app
+from HMI.server import HMIServer
 
-def start_flask():
-    print("Transport HMI Server wordt gestart op http://localhost:5000")
-    app.run(debug=False, host='0.0.0.0', port=5000)
+READY_TIMEOUT_S = 30.0      # daarna toch de browser starten (HMI toont de fouten)
 
-flask_thread = Thread(target=start_flask, daemon=True)
-flask_thread.start()
+app = create_app()
+runtime = app.extensions["hmi_runtime"]
+
+# waitress (productie) of werkzeug, volgens hmi.server in config.yaml
+server = HMIServer.from_config(app, runtime.config.hmi)
+print(f"Transport HMI Server ({server.kind}) wordt gestart op {server.url}")
+server.start()
+
+READY_URL = f"{server.url}/api/ready"
 
 def cleanup(sig=None, frame=None):
     print("Shutting down…")
-    gpio.shutdown()
+    server.close()
+    runtime.shutdown()
     sys.exit(0)
 
 signal.signal(signal.SIGINT, cleanup)
 signal.signal(signal.SIGTERM, cleanup)
 
+def wait_until_ready(timeout_s=READY_TIMEOUT_S, poll_s=0.05):
+    """
+    Wacht tot de server antwoordt én de hardware-init klaar is (gelukt of
+    niet). Geeft de laatste /api/ready status terug, of None bij timeout.
+    """
+    t_end = time.monotonic() + timeout_s
+    while time.monotonic() < t_end:
+        try:
+            with urllib.request.urlopen(READY_URL, timeout=1.0) as resp:
+                status = json.load(resp)
+        except urllib.error.HTTPError as e:
+            status = json.load(e)       # 503: nog niet (volledig) klaar
+        except (urllib.error.URLError, OSError, ValueError):
+            status = None               # server luistert nog niet
+
+        if status is not None and status.get("done"):
+            return status
+        sleep(poll_s)
+    return None
+
 # ---- Browser openen ----
-time.sleep(2)  # wachten tot Flask server draait
+status = wait_until_ready()
+if status is None:
+    print(f"HMI niet klaar binnen {READY_TIMEOUT_S:.0f} s, browser wordt toch gestart")
+else:
+    timings = ", ".join(f"{name} {s['state']} {s['duration_ms'] or 0:.0f} ms"
+                        for name, s in status["subsystems"].items())
+    print(f"HMI klaar na {status['elapsed_ms']:.0f} ms ({timings})")
 
 # Forceer DISPLAY naar de desktop sessie
 if "DISPLAY" not in os.environ:
@@ -39,7 +73,7 @@ try:
         "--noerrdialogs",
         "--incognito",
         "--log-level=3",      # minder Chromium spam
-        "http://localhost:5000"
+        server.url
     ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 except Exception as e:
     print("Kon Chromium niet starten:", e)